@@ -4,13 +4,21 @@
  
  # Import built-in modules
 import argparse
+import concurrent.futures
+import glob
+import os
+import sys
 
 # Import third-party modules
 import pandas as pd
 import numpy as np
 
 # Import custom modules
-from pydbfilter import FilterTree, SdtFilter, DeadbandFilter, HysteresisFilter
+from pydbfilter import FilterTree, SdtFilter, DeadbandFilter, HysteresisFilter, TierFilter, RdpFilter, PlaFilter
+from pydbfilter import CompositeFilter, AdaptiveFilter
+from pydbfilter import Profiling
+from pydbfilter.CsvCache import CsvCache
+from pydbfilter.GorillaCodec import GorillaWriter
 
 # Authorship information
 __author__ = "James Bott"
@@ -22,18 +30,138 @@ __maintainer__ = "James Bott"
 __email__ = "https://github.com/bott-j"
 __status__ = "Development"
 
+# Filter class of each compression algorithm
+filterClasses = {
+    "sdt" : SdtFilter,
+    "deadband" : DeadbandFilter,
+    "hysteresis" : HysteresisFilter,
+    "rdp" : RdpFilter,
+    "pla" : PlaFilter
+    }
+
+def addRows(outputs, newData, row, tiered):
+    """ Adds a copy of the input row for each output point, to the output\
+        of each tier if tiered. """
+    for output, tierData in zip(outputs, newData if tiered else [newData]):
+        for data in tierData:
+            newRow = dict(row)
+            newRow["_time"] = data[0]
+            newRow["_value"] = data[1]
+            output += [newRow]
+    return
+
+def writeGorilla(filename, dfOutput):
+    """ Writes the output rows as Gorilla encoded blocks of each series, with\
+        the columns of each series number in a CSV file with a .series.csv\
+        suffix. """
+    seriesColumns = [column for column in dfOutput.columns if column not in ("_time", "_value", "_start", "_stop")]
+    if(len(dfOutput) > 0 and len(seriesColumns) > 0):
+        grouped = dfOutput.groupby(seriesColumns, sort = True, dropna = False)
+        seriesIds = grouped.ngroup().to_numpy()
+        dfSeries = grouped.size().reset_index()[seriesColumns]
+    else:
+        seriesIds = np.zeros(len(dfOutput), dtype = np.int64)
+        dfSeries = pd.DataFrame(index = range(0, 1 if len(dfOutput) > 0 else 0))
+    times = dfOutput["_time"].to_numpy(dtype = np.int64) if len(dfOutput) > 0 else np.zeros(0, dtype = np.int64)
+    values = dfOutput["_value"].to_numpy(dtype = np.float64) if len(dfOutput) > 0 else np.zeros(0)
+
+    # Points of each series in time order
+    order = np.lexsort((times, seriesIds))
+    offsets = np.searchsorted(seriesIds[order], np.arange(0, len(dfSeries) + 1))
+    with open(filename, "wb") as file:
+        writer = GorillaWriter(file)
+        for series in range(0, len(dfSeries)):
+            selected = order[offsets[series]:offsets[series + 1]]
+            writer.write(series, times[selected], values[selected])
+        writer.flush()
+    dfSeries.to_csv(filename + ".series.csv", index = False)
+
+    return
+
+def listInputs(infile) -> list:
+    """ Returns the CSV files of a directory or glob pattern, or the single\
+        file, ordered by the time of their first row. """
+    if(os.path.isdir(infile)):
+        filenames = glob.glob(os.path.join(infile, "*.csv"))
+    elif(glob.has_magic(infile)):
+        filenames = glob.glob(infile)
+    else:
+        return [infile]
+
+    # Exports are grouped by series in time order, so the first row starts the time range
+    firstTimes = dict()
+    for filename in filenames:
+        firstRow = pd.read_csv(filename, header=3, usecols=["_time"], nrows=1)
+        firstTimes[filename] = (pd.to_datetime(firstRow['_time']).iloc[0].value
+            if len(firstRow) > 0 else -np.iinfo(np.int64).max)
+    return sorted(filenames, key = lambda filename : (firstTimes[filename], filename))
+
+def readInput(infile, cache):
+    """ Returns the parsed CSV file, or its cache. """
+    if(cache):
+        with Profiling.stage("read.cache"):
+            return CsvCache(infile)
+
+    # Load CSV data
+    with Profiling.stage("read.csv"):
+        dfInput = pd.read_csv(infile, header=3)
+
+    # Convert time column to int64 nanoseconds once for all rows
+    with Profiling.stage("read.times"):
+        dfInput['_time'] = pd.to_datetime(dfInput['_time']).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    return dfInput
+
+def filterInput(data, measurements, allowedTags, outputs, tiered):
+    """ Filters the points of a parsed CSV file or cache, adding the output\
+        rows of each tier to the outputs. """
+
+    # Filter each series from the cache of the parsed input
+    if(isinstance(data, CsvCache)):
+        for series, row in enumerate(data.seriesRows()):
+            if(row['_measurement'] in measurements.keys()
+                and row['_field'] in measurements[row['_measurement']].keys()):
+                tags = [(tag, row[tag]) for tag in allowedTags if tag in data.columns]
+                filter = measurements[row['_measurement']][row['_field']].walk(sorted(tags))
+                times, values = data.seriesPoints(series)
+                Profiling.count("points.in", len(times))
+                newData = filter.filterPoints(list(zip(times.tolist(), values.tolist())))
+                addRows(outputs, newData, row, tiered)
+        return
+
+    # filter each point in list
+    for index, row in data.iterrows():
+
+        # Apply filter
+        if(row['_measurement'] in measurements.keys()
+            and row['_field'] in measurements[row['_measurement']].keys()):
+            
+            # Create list of tags associated with this data
+            tags = [(tag, row[tag]) for tag in allowedTags if tag in data.columns]
+
+            # Retrieve filter from tree datastructure by tag   
+            filter = measurements[row['_measurement']][row['_field']].walk(sorted(tags))
+
+            # Apply filter to data, with the output of each tier if tiered
+            Profiling.count("points.in")
+            newData = filter.filterPoint(row['_time'], float(row['_value']))
+            addRows(outputs, newData, row.to_dict(), tiered)
+
+    return
+
 # If run from command line
 if __name__ =="__main__":
 
     # Parse arguments
     parser = argparse.ArgumentParser(
-        description="Applies deadband filtering to influxdb CSV exports.")
+        description="Applies deadband filtering to influxdb CSV exports.",
+        fromfile_prefix_chars="@")
     parser.add_argument('infile',
         type=str,
-        help="Filename of input CSV file")
+        help="Filename of input CSV file, or a directory or glob pattern of CSV files filtered in time order")
     parser.add_argument('outfile', 
         type=str,
-        help="Filename of output CSV file")
+        help="Filename of output CSV file, or the directory of output files for several input files")
     parser.add_argument('--lastvalue', 
         action="store_true",
         help="Always save the last value in the input data to the output file")
@@ -50,70 +178,153 @@ if __name__ =="__main__":
     parser.add_argument('--method', 
         type=str,
         help="Compression algorithm",
-        choices=["sdt", "deadband", "hysteresis"],
+        choices=filterClasses.keys(),
         default="sdt")
+    parser.add_argument('--prefilter',
+        nargs=2,
+        metavar=("method", "threshold_scale"),
+        action="append",
+        default=[],
+        help="Filter points before the compression algorithm with this method and the threshold of each field scaled, such as a deadband dropping sensor jitter before SDT")
+    parser.add_argument('--adaptive',
+        nargs=3,
+        type=float,
+        metavar=("noise_scale", "min_scale", "max_scale"),
+        default=None,
+        help="Set the threshold of each series to this multiple of its estimated noise, between the threshold of the field scaled by the minimum and maximum scales")
+    parser.add_argument('--noisewindow',
+        type=int,
+        default=100,
+        help="Number of points over which the noise of each series is estimated with --adaptive")
+    parser.add_argument('--noiseestimator',
+        type=str,
+        help="Noise estimate of --adaptive, as an exponentially weighted variance or the median absolute deviation of each window of differences",
+        choices=AdaptiveFilter.estimators,
+        default="ewma")
+    parser.add_argument('--tier',
+        nargs=3,
+        metavar=("outfile", "threshold_scale", "interval_scale"),
+        action="append",
+        default=[],
+        help="Also write this file with the threshold and maximum interval of each field scaled")
+    parser.add_argument('--cache',
+        action="store_true",
+        help="Filter from a memory-mapped cache of the parsed input, built in infile.cache when missing or stale")
+    parser.add_argument('--format',
+        type=str,
+        help="Output file format, where gorilla writes the compressed points of each series with a .series.csv table of their columns",
+        choices=["csv", "gorilla"],
+        default="csv")
+    parser.add_argument('--profile',
+        action="store_true",
+        help="Print the wall time of each stage and filter method, points per second and peak memory to stderr")
+    parser.add_argument('--profiledump',
+        type=str,
+        metavar="prefix",
+        help="Also write cProfile statistics to prefix.pstats and a tracemalloc snapshot to prefix.tracemalloc")
     args = parser.parse_args()
+    for method, scale in args.prefilter:
+        if(method not in filterClasses.keys()):
+            parser.error("argument --prefilter: invalid method {0!r} (choose from {1})".format(method,
+                ", ".join(filterClasses.keys())))
+    if(args.adaptive is not None and not hasattr(filterClasses[args.method], "threshold")):
+        parser.error("argument --adaptive: method {0} does not have a threshold".format(args.method))
+
+    # Collect profiling events for the whole run
+    profile = Profiling.Profile(args.profiledump) if args.profile or args.profiledump is not None else None
+    if(profile is not None):
+        profile.start()
     
     # Setup initial filter structure
     measurements = dict()
-    if(args.method == "sdt"):
-        filter = SdtFilter
-    elif(args.method == "deadband"):
-        filter = DeadbandFilter
-    elif(args.method == "hysteresis"):
-        filter = HysteresisFilter
+    filter = filterClasses[args.method]
     for measurement, field, threshold, maxinterval in args.fields:
-        # Add the filter to the dictionary
-        measurements[measurement] = {field : FilterTree(filter, float(threshold), float(maxinterval))}
+        # Filter class and arguments of each tier, preceded by the prefilters
+        tiers = list()
+        for thresholdScale, intervalScale in [(1, 1)] + [(thresholdScale, intervalScale)
+            for outfile, thresholdScale, intervalScale in args.tier]:
+            tierThreshold = float(threshold)*float(thresholdScale)
+            tierInterval = float(maxinterval)*float(intervalScale)
+            tier = (filter, tierThreshold, tierInterval)
+            if(args.adaptive is not None):
+                tier = (AdaptiveFilter,) + tier + (*args.adaptive, args.noisewindow, args.noiseestimator)
+            if(len(args.prefilter) > 0):
+                tiers += [(CompositeFilter,
+                    *[(filterClasses[method], tierThreshold*float(scale), tierInterval) for method, scale in args.prefilter],
+                    tier)]
+            else:
+                tiers += [tier]
+
+        # Add the filter to the dictionary, with a filter for each tier
+        if(len(args.tier) > 0):
+            tree = FilterTree(TierFilter, *tiers)
+        else:
+            tree = FilterTree(*tiers[0])
+        measurements.setdefault(measurement, dict())[field] = tree
+
+    # Output file or directory of each tier
+    outfiles = [args.outfile] + [outfile for outfile, thresholdScale, intervalScale in args.tier]
     
     # Allowed tags
     allowedTags = args.tags
-    
-    # Load CSV data
-    dfInput = pd.read_csv(args.infile, header=3)
-    output = list()
 
-    # filter each point in list
-    for index, row in dfInput.iterrows():
+    # Input files in time order, with the output of each in a directory if several
+    infiles = listInputs(args.infile)
+    if(len(infiles) == 0):
+        parser.error("argument infile: no CSV files match {0!r}".format(args.infile))
+    sharded = infiles != [args.infile]
+    if(sharded):
+        for outfile in outfiles:
+            os.makedirs(outfile, exist_ok=True)
 
-        # Apply filter
-        if(row['_measurement'] in measurements.keys()
-            and row['_field'] in measurements[row['_measurement']].keys()):
-            
-            # Create list of tags associated with this data
-            tags = [(tag, row[tag]) for tag in allowedTags if tag in dfInput.columns]
+    # Filters carry their state from each file to the next, while the next\
+    # file is parsed in the background
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        nextInput = executor.submit(readInput, infiles[0], args.cache) if len(infiles) > 0 else None
+        for index, infile in enumerate(infiles):
+            data = nextInput.result()
+            if(index + 1 < len(infiles)):
+                nextInput = executor.submit(readInput, infiles[index + 1], args.cache)
 
-            # Retrieve filter from tree datastructure by tag   
-            filter = measurements[row['_measurement']][row['_field']].walk(sorted(tags))
+            outputs = [list() for outfile in outfiles]
+            with Profiling.stage("filter"):
+                filterInput(data, measurements, allowedTags, outputs, len(args.tier) > 0)
+            del data
+
+            # Force the last point to be stored for each fitler, after the last file,\
+            # and the points held by filters such as RDP which buffer their output
+            for measurement, fields in measurements.items():
+                for field, filter in fields.items():
+                    if((args.lastvalue or filter.holdsPoints) and index == len(infiles) - 1):
+                        flushed = filter.flushAll()
+                        for output, (keys, times, values) in zip(outputs, flushed if len(args.tier) > 0 else [flushed]):
+                            for tags, time, value in zip(keys, times, values):
+                                newRow = dict()
+                                newRow["table"] = 0
+                                newRow["_start"] = time
+                                newRow["_stop"] = time
+                                newRow["_time"] = time
+                                newRow["_measurement"] = measurement
+                                newRow["_field"] = field
+                                newRow["_value"] = value
+                                for (tagName, tagValue) in tags:
+                                    newRow[tagName] = tagValue
+                                output += [newRow]
+
+            for outfile, output in zip(outfiles, outputs):
+                Profiling.count("points.out", len(output))
+                with Profiling.stage("write"):
+                    # Convert to pandas dataframe    
+                    dfOutput = pd.DataFrame(data=output)
+
+                    # Save to output file, or the shard of the input file
+                    if(args.format == "gorilla"):
+                        writeGorilla(os.path.join(outfile, os.path.splitext(os.path.basename(infile))[0] + ".gorilla")
+                            if sharded else outfile, dfOutput)
+                    else:
+                        dfOutput.to_csv(os.path.join(outfile, os.path.basename(infile)) if sharded else outfile,
+                            index=False)
 
-            # Apply filter to data
-            newData = filter.filterPoint(np.float64(pd.to_datetime(row['_time']).to_numpy(np.int64)), np.float64(row['_value']))
-            for data in newData:
-                newRow = row.to_dict()
-                newRow["_time"] = data[0]
-                newRow["_value"] = data[1]
-                output += [newRow]
-
-    # Force the last point to be stored for each fitler
-    for measurement, fields in measurements.items():
-        for field, filter in fields.items():
-            if(args.lastvalue):
-                for (tags, filter) in [([], filter)] + filter.getAllChildren():
-                    for data in filter.flush():
-                        newRow = dict()
-                        newRow["table"] = 0
-                        newRow["_start"] = data[0]
-                        newRow["_stop"] = data[0]
-                        newRow["_time"] = data[0]
-                        newRow["_measurement"] = measurement
-                        newRow["_field"] = field
-                        newRow["_value"] = data[1]
-                        for (tagName, tagValue) in tags:
-                            newRow[tagName] = tagValue
-                        output += [newRow]
-
-    # Convert to pandas dataframe    
-    dfOutput = pd.DataFrame(data=output)
-
-    # Save to output CSV file
-    dfOutput.to_csv(args.outfile, index=False)
\ No newline at end of file
+    if(profile is not None):
+        profile.stop()
+        print(profile.report(), file=sys.stderr)
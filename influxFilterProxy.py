@@ -3,20 +3,38 @@
 
 # Import built-in modules
 import argparse
+import codecs
+import collections
+import copy
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import pickle
 import re
+import signal
+import socket
 import socketserver
+import struct
+import sys
 import threading
+import time
 import urllib.parse as urlparse
+import zlib
 
 # Import third-party modules
 import http.server
-from influxdb_client import InfluxDBClient
+from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
-import numpy as np
-import pandas as pd
+from influxdb_client.rest import ApiException
 
 # Import custom modules
-from pydbfilter import FilterTree, SdtFilter, DeadbandFilter, HysteresisFilter
+from pydbfilter import FilterTree, SdtFilter, DeadbandFilter, HysteresisFilter, ReorderFilter, TierFilter
+from pydbfilter import AdaptiveFilter, BoundedFilterTree
+from pydbfilter.Spool import Spool
+from pydbfilter import DecimationMethods
+from pydbfilter import Profiling
 
 # Authorship information
 __author__ = "James Bott"
@@ -29,29 +47,360 @@ __email__ = "https://github.com/bott-j"
 __status__ = "Development"
 
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    pass
+    """ Threaded server which tracks whether each connection has a request\
+        in progress, so that connections can be drained before a handover. """
+
+    # Connections wait in the listen backlog while another process takes over
+    request_queue_size = 1024
+
+    def __init__(self, *args, profile = None, **kwargs):
+        """ Class constructor. """
+        self.draining = False
+        self._profile = profile
+        self._connections = dict()
+        self._connectionsLock = threading.Lock()
+        super().__init__(*args, **kwargs)
+        return
+
+    def process_request_thread(self, request, client_address):
+        """ Tracks the connection while it is handled. """
+        with self._connectionsLock:
+            self._connections[request] = False
+        try:
+            if(self._profile is not None):
+                with self._profile.thread():
+                    super().process_request_thread(request, client_address)
+            else:
+                super().process_request_thread(request, client_address)
+        finally:
+            with self._connectionsLock:
+                self._connections.pop(request, None)
+        return
+
+    def setBusy(self, request, busy):
+        """ Records whether a connection has a request in progress. """
+        with self._connectionsLock:
+            if(request in self._connections.keys()):
+                self._connections[request] = busy
+        return
+
+    def drain(self, timeout):
+        """ Closes each connection after its next request, waiting up to the\
+            timeout for clients to send a request, after which idle\
+            connections are closed and requests in progress completed. """
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        while(True):
+            with self._connectionsLock:
+                expired = time.monotonic() > deadline
+                closing = [request for request, busy in self._connections.items() if expired and not busy]
+                remaining = len(self._connections)
+            for request in closing:
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            if(remaining == 0):
+                break
+            time.sleep(0.01)
+        return
+
+def serveHandover(path, server, measurements, spool, forwarder, drainTimeout):
+    """ Waits for a new process to connect to the Unix socket, then passes it\
+        the listening socket, drains the connections, closes the spool and\
+        sends the state of the filters and the tokens of the spooled\
+        batches. Interrupts the main thread once the new process has\
+        received the state. """
+    if(os.path.exists(path)):
+        os.remove(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previousMask = os.umask(0o077)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(previousMask)
+    listener.listen(1)
+    connection, address = listener.accept()
+    listener.close()
+
+    # New process accepts connections from the listening socket from now on
+    socket.send_fds(connection, [b"pydbfilter"], [server.socket.fileno()])
+    server.shutdown()
+    server.drain(drainTimeout)
+
+    # Spool is reopened by the new process
+    if(spool is not None):
+        forwarder.stop()
+        spool.close()
+
+    # Send the filters with no requests in progress, and the tokens held in memory
+    tokens = dict(forwarder.tokens) if forwarder is not None else dict()
+    state = zlib.compress(pickle.dumps((measurements, tokens), protocol = pickle.HIGHEST_PROTOCOL))
+    connection.sendall(struct.pack("<Q", len(state)) + state)
+    if(connection.recv(2) != b"ok"):
+        print("Handover was not acknowledged")
+    connection.close()
+    print("Handed over {0} bytes of filter state".format(len(state)))
+    os.kill(os.getpid(), signal.SIGINT)
+
+    return
+
+def takeOver(path) -> tuple:
+    """ Connects to the Unix socket of a running process, returning its\
+        listening socket, the state of its filters and the tokens of its\
+        spooled batches by token identifier. """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(path)
+    message, fds, flags, address = socket.recv_fds(connection, 16, 1)
+    if(message != b"pydbfilter" or len(fds) != 1):
+        raise ValueError("Handover did not pass a listening socket.")
+    listenSocket = socket.socket(fileno = fds[0])
+
+    # Read the length prefixed filter state
+    data = b""
+    while(len(data) < 8 or len(data) < 8 + struct.unpack("<Q", data[0:8])[0]):
+        block = connection.recv(1 << 20)
+        if(len(block) == 0):
+            raise ValueError("Handover ended before the filter state was received.")
+        data += block
+    measurements, tokens = pickle.loads(zlib.decompress(data[8:]))
+    connection.sendall(b"ok")
+    connection.close()
+
+    return listenSocket, measurements, tokens
+
+def keepFilterState(measurements, previousMeasurements):
+    """ Replaces the trees of the measurements with the trees taken over from\
+        a previous process, for the fields configured in both with the same\
+        filter class, arguments and tiers. The state of a field whose\
+        configuration has changed is discarded with a warning. """
+    for measurement, fields in previousMeasurements.items():
+        for field, tree in fields.items():
+            if(field not in measurements.get(measurement, dict()).keys()):
+                continue
+            newTree = measurements[measurement][field]
+            if((tree._className, tree._classArgs, tree._classKwargs)
+                != (newTree._className, newTree._classArgs, newTree._classKwargs)):
+                print("Discarding filter state of {0} {1}, as its configuration has changed".format(
+                    measurement, field))
+                continue
+            measurements[measurement][field] = tree
+    return
+
+def tokenId(token) -> str:
+    """ Returns the identifier of a token in the spool, a hash of the token\
+        so that the token itself is not written to disk. """
+    return hashlib.sha256(token.encode("UTF-8")).hexdigest()
+
+def encodeBatch(bucket, org, tokenId, points) -> bytes:
+    """ Encodes a batch of points for the spool, as a JSON line with the\
+        write destination and token identifier followed by the points in\
+        line protocol. """
+    header = json.dumps({"bucket" : bucket, "org" : org, "tokenId" : tokenId})
+    lines = [Point.from_dict(dict(point, time = round(point["time"]))).to_line_protocol() for point in points]
+    return (header + "\n" + "\n".join(lines)).encode("UTF-8")
+
+def decodeBatch(payload) -> tuple:
+    """ Returns the bucket, organisation, token identifier and line protocol\
+        of a batch encoded for the spool. """
+    header, lines = payload.decode("UTF-8").split("\n", 1)
+    header = json.loads(header)
+    return header["bucket"], header["org"], header["tokenId"], lines
+
+class SpoolForwarder():
+    """ Forwards the batches of a spool to the influx DB server on a pool of\
+        threads, retrying each batch with an increasing delay until it is\
+        written. Batches rejected by the server as invalid are discarded.\
+        Tokens are held in memory by their identifier in the spool, so a\
+        batch left by a previous run is set aside until a request with its\
+        token is received, and is discarded if none is received within the\
+        token timeout. """
+
+    # Statuses of batches which are discarded rather than retried
+    rejectedStatuses = (400, 413, 422)
+
+    def __init__(self, spool, url, concurrency = 4, retryInterval = 1.0, maxRetryInterval = 60.0,
+        tokenTimeout = 3600.0):
+        """ Class constructor. """
+        self._spool = spool
+        self._url = url
+        self._concurrency = concurrency
+        self._retryInterval = retryInterval
+        self._maxRetryInterval = maxRetryInterval
+        self._tokenTimeout = tokenTimeout
+        self._stopped = threading.Event()
+        self._threads = list()
+
+        # Token of each token identifier in the spool
+        self.tokens = dict()
+
+        # Batches set aside by token identifier until their token is known,\
+        # and batches whose token has since been received
+        self._lock = threading.Lock()
+        self._waiting = dict()
+        self._ready = collections.deque()
+
+        return
+
+    def addToken(self, token) -> str:
+        """ Adds the token of a request, returning its identifier. Batches\
+            waiting for the token are forwarded. """
+        identifier = tokenId(token)
+        if(identifier not in self.tokens.keys()):
+            with self._lock:
+                self.tokens[identifier] = token
+                for deadline, position, bucket, org, lines in self._waiting.pop(identifier, []):
+                    self._ready.append((position, bucket, org, token, lines))
+        return identifier
+
+    @property
+    def waiting(self) -> int:
+        """ Returns the number of batches waiting for their token. """
+        with self._lock:
+            return sum([len(batches) for batches in self._waiting.values()])
+
+    def start(self):
+        """ Starts the forwarding threads. """
+        for i in range(0, self._concurrency):
+            thread = threading.Thread(target = self._run)
+            thread.daemon = True
+            thread.start()
+            self._threads += [thread]
+        return
+
+    def stop(self):
+        """ Stops the forwarding threads, leaving unwritten batches in the\
+            spool. """
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = list()
+        return
+
+    def _expire(self):
+        """ Discards the batches which have waited for their token longer\
+            than the token timeout, so that the spool may advance. """
+        now = time.monotonic()
+        expired = list()
+        with self._lock:
+            for identifier, batches in list(self._waiting.items()):
+                expired += [batch for batch in batches if batch[0] <= now]
+                batches = [batch for batch in batches if batch[0] > now]
+                if(len(batches) > 0):
+                    self._waiting[identifier] = batches
+                else:
+                    del self._waiting[identifier]
+        for deadline, position, bucket, org, lines in expired:
+            print("Discarding batch for bucket {0}, no request with its token in {1} seconds".format(bucket,
+                self._tokenTimeout))
+            self._spool.acknowledge(position)
+        return
+
+    def _next(self):
+        """ Returns the position, bucket, organisation, token and lines of the\
+            next batch to forward, setting aside batches whose token is not\
+            known, or None if there is no batch. """
+        with self._lock:
+            if(len(self._ready) > 0):
+                return self._ready.popleft()
+
+        record = self._spool.next(timeout = 1.0)
+        if(record is None):
+            return None
+        position, payload = record
+        bucket, org, identifier, lines = decodeBatch(payload)
+        with self._lock:
+            token = self.tokens.get(identifier)
+            if(token is None):
+                self._waiting.setdefault(identifier, list()).append(
+                    (time.monotonic() + self._tokenTimeout, position, bucket, org, lines))
+                return None
+        return position, bucket, org, token, lines
+
+    def _forward(self, clients, position, bucket, org, token, lines):
+        """ Writes a batch, retrying until it is written, rejected or the\
+            forwarder is stopped. """
+        delay = self._retryInterval
+        while(not self._stopped.is_set()):
+            try:
+                if((token, org) not in clients.keys()):
+                    client = InfluxDBClient(url = self._url, token = token, org = org)
+                    clients[(token, org)] = (client, client.write_api(write_options = SYNCHRONOUS))
+                with Profiling.stage("spool.forward"):
+                    clients[(token, org)][1].write(bucket, org, lines)
+                self._spool.acknowledge(position)
+                break
+            except ApiException as error:
+                if(error.status in self.rejectedStatuses):
+                    print("Discarding batch rejected by server: {0}".format(error.status))
+                    self._spool.acknowledge(position)
+                    break
+                print("Forwarding failed with status {0}, retrying".format(error.status))
+            except Exception as error:
+                print("Forwarding failed, retrying: {0}".format(error))
+            self._stopped.wait(delay)
+            delay = min(delay*2, self._maxRetryInterval)
+        return
+
+    def _run(self):
+        """ Forwards batches until stopped, with a client for each token and\
+            organisation. """
+        clients = dict()
+        while(not self._stopped.is_set()):
+            self._expire()
+            batch = self._next()
+            if(batch is not None):
+                self._forward(clients, *batch)
+
+        for client, writeApi in clients.values():
+            client.close()
+
+        return
     
 class InfluxProxyHttpHandler(http.server.SimpleHTTPRequestHandler):
     # Class variables 
+    protocol_version = "HTTP/1.1"
     _linePattern : re.Pattern = re.compile('^([^,]+)(,([^ ]*))? ([^ ]+) ([0-9]+)$')
+    queryBlockSize : int = 1 << 20
  
-    def __init__(self, url, lastvalue, measurements, tags):
+    def __init__(self, url, lastvalue, measurements, tags, tierBuckets = [], spool = None,
+        queryMethod = None, queryPoints = 1000, queryFilters = {}, forwarder = None):
         """ Class constructor. """
         self._url = url
         self._lastvalue = lastvalue
         self._measurements = measurements
         self._tags = tags 
+        self._tierBuckets = tierBuckets
+        self._spool = spool
+        self._forwarder = forwarder
+        self._queryMethod = queryMethod
+        self._queryPoints = queryPoints
+        self._queryFilters = queryFilters
         self._client = None
         return
 
     def __call__(self, *args, **kwargs):
-        """ Call SimpleHTTPRequestHandler method. """
-        super().__init__(*args, **kwargs)
+        """ Call SimpleHTTPRequestHandler method on a copy of the handler,\
+            so that concurrent requests do not share request state. """
+        handler = copy.copy(self)
+        http.server.SimpleHTTPRequestHandler.__init__(handler, *args, **kwargs)
+        return
+
+    def parse_request(self) -> bool:
+        """ Marks the connection as busy once a request line is read. """
+        self.server.setBusy(self.request, True)
+        return super().parse_request()
+
+    def handle_one_request(self):
+        """ Marks the connection as idle after each request. """
+        super().handle_one_request()
+        self.server.setBusy(self.request, False)
         return
 
     def handle_line(self, line):
-        """ Handles a line of influx line protocol from the request. """
-        points = list()
+        """ Handles a line of influx line protocol from the request. Returns\
+            a list of points for the request bucket and each tier bucket. """
+        points = [list() for tier in range(0, 1 + len(self._tierBuckets))]
 
         # Attempt to match the line
         m = re.match(self._linePattern, line)
@@ -80,34 +429,148 @@ class InfluxProxyHttpHandler(http.server.SimpleHTTPRequestHandler):
                     # Retrieve filter from tree datastructure by tag   
                     filter = self._measurements[measurement][field].walk(sorted(tags.items()))
 
-                    # Apply filter to data
-                    newData = filter.filterPoint(np.float64(pd.to_datetime(int(timestamp)).to_numpy(np.int64)), np.float64(fields[field]))
-                    for data in newData:
-                        # Add the data to the queue to be forwarded to the real influxdb server
-                        points += [{
-                            "measurement" : measurement, 
-                            "tags" : tags, 
-                            "fields" : {field : data[1]}, 
-                            "time" : data[0]
-                            }]
+                    # Apply filter to data, with the output of each tier if tiered
+                    newData = filter.filterPoint(int(timestamp), float(fields[field]))
+                    for tierPoints, tierData in zip(points, newData if len(self._tierBuckets) > 0 else [newData]):
+                        for data in tierData:
+                            # Add the data to the queue to be forwarded to the real influxdb server
+                            tierPoints += [{
+                                "measurement" : measurement, 
+                                "tags" : tags, 
+                                "fields" : {field : data[1]}, 
+                                "time" : data[0]
+                                }]
 
         return points
 
+    def handle_arrow(self, content):
+        """ Handles an Arrow IPC stream of record batches with time, value,\
+            measurement, field and tag columns. Returns a list of points for\
+            the request bucket and each tier bucket. """
+        from pydbfilter import ArrowSupport
+
+        points = [list() for tier in range(0, 1 + len(self._tierBuckets))]
+        rows = 0
+        for batch in ArrowSupport.readBatches(content):
+            rows += batch.num_rows
+            for measurement, field, tags, newData in ArrowSupport.filterBatch(self._measurements, batch):
+                tags = dict(tags)
+                for tierPoints, tierData in zip(points, newData if len(self._tierBuckets) > 0 else [newData]):
+                    tierPoints += [{
+                        "measurement" : measurement,
+                        "tags" : tags,
+                        "fields" : {field : value},
+                        "time" : time
+                        } for time, value in tierData]
+        Profiling.count("rows.in", rows)
+
+        return points
+
+    def write_chunk(self, data):
+        """ Writes a chunk of a chunked response to the client. """
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        return
+
+    def do_query(self):
+        """ Forwards a query to the influx DB server and streams the response\
+            to the client, decimating each table of an annotated CSV response\
+            to the point budget given by the X-Decimation-Points header or\
+            the default of the proxy. The X-Decimation-Method header selects\
+            the method, where "none" passes the response through. """
+        method = self.headers.get("X-Decimation-Method", self._queryMethod)
+        points = int(self.headers.get("X-Decimation-Points", self._queryPoints))
+        content = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        # Forward the request, with the response uncompressed so that it can be decimated
+        url = urlparse.urlparse(self._url)
+        connection = (http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection)(
+            url.hostname, url.port)
+        headers = {name : value for name, value in self.headers.items()
+            if name.lower() not in ("host", "content-length", "accept-encoding", "connection")}
+        try:
+            with Profiling.stage("query.forward"):
+                connection.request("POST", self.path, content, headers)
+                response = connection.getresponse()
+        except OSError as error:
+            connection.close()
+            self.send_error(502, "Query failed: {0}".format(error))
+            return
+
+        # Decimate successful CSV responses with a known method
+        decimator = None
+        if(response.status == 200 and method not in (None, "none")
+            and response.getheader("Content-Type", "").startswith("text/csv")):
+            if(method not in DecimationMethods.methods):
+                connection.close()
+                self.send_error(400, "Unknown decimation method {0}".format(method))
+                return
+            from pydbfilter import Decimation
+            decimator = Decimation.CsvDecimator(lambda row : Decimation.createDecimator(row, method, points,
+                self._queryFilters))
+
+        # Response is streamed in chunks as it is read from the server
+        self.send_response(response.status)
+        for name, value in response.getheaders():
+            if(name.lower() not in ("content-length", "transfer-encoding", "connection", "date", "server")):
+                self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        if(self.server.draining):
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        # Reads are decimated in blocks of at least the block size, as each block has a fixed cost
+        textDecoder = codecs.getincrementaldecoder("UTF-8")()
+        blockSize = self.queryBlockSize if decimator is not None else 0
+        try:
+            blocks = list()
+            ended = False
+            while(not ended):
+                data = response.read1(1 << 20)
+                ended = len(data) == 0
+                blocks += [data]
+                if(sum([len(block) for block in blocks]) < blockSize and not ended):
+                    continue
+                data = b"".join(blocks)
+                blocks = list()
+                Profiling.count("query.bytes.in", len(data))
+                if(decimator is not None):
+                    with Profiling.stage("query.decimate"):
+                        text = decimator.feed(textDecoder.decode(data, ended))
+                        data = (text + (decimator.close() if ended else "")).encode("UTF-8")
+                Profiling.count("query.bytes.out", len(data))
+                if(len(data) > 0):
+                    self.write_chunk(data)
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError as error:
+            print("Query response failed: {0}".format(error))
+            self.close_connection = True
+        finally:
+            connection.close()
+
+        return
+
     def do_POST(self):
         """ Handles the HTTP post request from the client. """
-        points = list()
+        # Queries are forwarded to the server
+        if(urlparse.urlparse(self.path).path == "/api/v2/query"):
+            self.do_query()
+            return
 
-        # Create the client
-        if(self._client is None):
-            # Parse the query string
-            uri, queryString = self.path.split("?")
-            query = urlparse.parse_qs(queryString)
+        points = [list() for tier in range(0, 1 + len(self._tierBuckets))]
+
+        # Parse the query string
+        uri, queryString = self.path.split("?")
+        query = urlparse.parse_qs(queryString)
+        token = self.headers["Authorization"].split(" ")[1]
 
+        # Create the client
+        if(self._client is None and self._spool is None):
             # Create the influxdb client connection
             self._client = InfluxDBClient(
                 url=self._url, 
-                token=self.headers["Authorization"].split(" ")[1], 
-                org=query['org']
+                token=token, 
+                org=query['org'][0]
                 )
             self._writeApi = self._client.write_api(write_options=SYNCHRONOUS)
             
@@ -115,25 +578,73 @@ class InfluxProxyHttpHandler(http.server.SimpleHTTPRequestHandler):
         nContent = int(self.headers['Content-Length'])
         
         # Read the content
-        content = self.rfile.read(nContent).decode("UTF-8")
+        with Profiling.stage("request.read"):
+            content = self.rfile.read(nContent)
+            if(self.headers['Content-Encoding'] == 'gzip'):
+                content = gzip.decompress(content)
+
+        # Filter the columns of Arrow record batches without parsing text
+        if(uri == "/api/v2/write/arrow"):
+            try:
+                with Profiling.stage("request.filter"):
+                    points = self.handle_arrow(content)
+            except ImportError:
+                self.send_error(501, "Arrow requests require pyarrow")
+                points = None
+            except ValueError as error:
+                self.send_error(400, "Invalid Arrow request: {0}".format(error))
+                points = None
+            if(points is None):
+                if(self._client is not None):
+                    self._client.close()
+                    self._client = None
+                return
+        # Otherwise split by lines and handle each line
+        else:
+            with Profiling.stage("request.filter"):
+                lines = content.decode("UTF-8").split("\n")
+                for line in lines:
+                    for tierPoints, linePoints in zip(points, self.handle_line(line)):
+                        tierPoints += linePoints
+            Profiling.count("lines.in", len(lines))
+        Profiling.count("points.out", sum([len(tierPoints) for tierPoints in points]))
 
-        # Split by lines and handle each line
-        for line in content.split("\n"):
-            points += self.handle_line(line)
+        # Append the data of each tier to the spool, to be forwarded in the background
+        buckets = [query['bucket'][0]] + self._tierBuckets
+        if(self._spool is not None):
+            with Profiling.stage("spool.append"):
+                identifier = self._forwarder.addToken(token)
+                for index, (bucket, tierPoints) in enumerate(zip(buckets, points)):
+                    if(len(tierPoints) > 0
+                        and self._spool.append(encodeBatch(bucket, query['org'][0], identifier, tierPoints))):
+                        points[index] = []
 
-        # Send response headers to client
+        # Send response headers to client, closing the connection when draining
         self.send_response(200)
+        self.send_header("Content-Length", "0")
+        if(self.server.draining):
+            self.send_header("Connection", "close")
+            self.close_connection = True
         self.end_headers()
 
-        # Forward cached data to the real influxdb server
-        self._writeApi.write(
-            query['bucket'], 
-            query['org'], 
-            points
-            )
+        # Forward cached data to the real influxdb server, for each tier not\
+        # spooled, such as when the spool is full
+        for bucket, tierPoints in zip(buckets, points):
+            if(len(tierPoints) > 0):
+                if(self._client is None):
+                    self._client = InfluxDBClient(url=self._url, token=token, org=query['org'][0])
+                    self._writeApi = self._client.write_api(write_options=SYNCHRONOUS)
+                with Profiling.stage("forward.write"):
+                    self._writeApi.write(
+                        bucket, 
+                        query['org'][0], 
+                        tierPoints
+                        )
 
         # Close influxdb client connection
-        self._client.close()
+        if(self._client is not None):
+            self._client.close()
+            self._client = None
 
         return
 
@@ -142,7 +653,8 @@ if __name__ == "__main__":
 
     # Parse arguments
     parser = argparse.ArgumentParser(
-        description="Influx Database proxy server with deadband filtering.")
+        description="Influx Database proxy server with deadband filtering.",
+        fromfile_prefix_chars="@")
     parser.add_argument('host',
         type=str,
         help="IP address to bind server to.")
@@ -170,8 +682,106 @@ if __name__ == "__main__":
         help="Compression algorithm.",
         choices=["sdt", "deadband", "hysteresis"],
         default="sdt")
+    parser.add_argument('--reorderwindow',
+        type=float,
+        default=None,
+        help="Reorder points of each series arriving up to this many nanoseconds late")
+    parser.add_argument('--reordercapacity',
+        type=int,
+        default=1024,
+        help="Maximum number of points buffered for each series by the reorder window")
+    parser.add_argument('--latepolicy',
+        type=str,
+        help="Handling of points older than the reorder window",
+        choices=ReorderFilter.latePolicies,
+        default="drop")
+    parser.add_argument('--adaptive',
+        nargs=3,
+        type=float,
+        metavar=("noise_scale", "min_scale", "max_scale"),
+        default=None,
+        help="Set the threshold of each series to this multiple of its estimated noise, between the threshold of the field scaled by the minimum and maximum scales")
+    parser.add_argument('--noisewindow',
+        type=int,
+        default=100,
+        help="Number of points over which the noise of each series is estimated with --adaptive")
+    parser.add_argument('--noiseestimator',
+        type=str,
+        help="Noise estimate of --adaptive, as an exponentially weighted variance or the median absolute deviation of each window of differences",
+        choices=AdaptiveFilter.estimators,
+        default="ewma")
+    parser.add_argument('--maxseries',
+        type=int,
+        default=None,
+        help="Maximum number of series of each field held in memory, above which the least recently used are spilled to disk")
+    parser.add_argument('--spilldir',
+        type=str,
+        default=None,
+        help="Directory of the temporary files of series spilled with --maxseries, or the system temporary directory")
+    parser.add_argument('--tier',
+        nargs=3,
+        metavar=("bucket", "threshold_scale", "interval_scale"),
+        action="append",
+        default=[],
+        help="Also write to this bucket with the threshold and maximum interval of each field scaled")
+    parser.add_argument('--spool',
+        type=str,
+        default=None,
+        help="Directory of a disk spool holding filtered points until they are forwarded")
+    parser.add_argument('--spoolsize',
+        type=float,
+        default=1024,
+        help="Maximum size of the spool in MB, above which points are forwarded directly")
+    parser.add_argument('--spoolsegment',
+        type=float,
+        default=16,
+        help="Size of each spool segment file in MB")
+    parser.add_argument('--spoolsync',
+        action="store_true",
+        help="Flush each batch to disk before replying to the client")
+    parser.add_argument('--forwarders',
+        type=int,
+        default=4,
+        help="Number of concurrent writes forwarding the spool to the Influx server")
+    parser.add_argument('--tokentimeout',
+        type=float,
+        default=3600,
+        help="Seconds a spooled batch waits for a request with its token after a restart before it is discarded")
+    parser.add_argument('--handover',
+        type=str,
+        default=None,
+        help="Unix socket on which a new process may take over the listening socket and filter state")
+    parser.add_argument('--takeover',
+        type=str,
+        default=None,
+        help="Unix socket of a running process to take over the listening socket and filter state from")
+    parser.add_argument('--draintimeout',
+        type=float,
+        default=2,
+        help="Seconds to wait for clients to send a last request on each connection when handing over")
+    parser.add_argument('--querymethod',
+        type=str,
+        help="Decimation of each series of query responses, where sdt and deadband use the threshold and maximum interval of the field",
+        choices=DecimationMethods.methods,
+        default=None)
+    parser.add_argument('--querypoints',
+        type=int,
+        default=1000,
+        help="Default number of points of each series of a decimated query response, such as the width of a panel")
+    parser.add_argument('--profile',
+        action="store_true",
+        help="Print the wall time of each stage and filter method, points per second and peak memory to stderr on exit")
+    parser.add_argument('--profiledump',
+        type=str,
+        metavar="prefix",
+        help="Also write cProfile statistics to prefix.pstats and a tracemalloc snapshot to prefix.tracemalloc on exit")
     args = parser.parse_args()
 
+    # Collect profiling events until exit
+    profile = Profiling.Profile(args.profiledump) if args.profile or args.profiledump is not None else None
+    if(profile is not None):
+        profile.start()
+
     # Setup initial filter structure
     measurements = dict()
     if(args.method == "sdt"):
@@ -181,18 +791,78 @@ if __name__ == "__main__":
     elif(args.method == "hysteresis"):
         filter = HysteresisFilter
     for measurement, field, threshold, maxinterval in args.fields:
-        measurements[measurement] = {field : FilterTree(filter, float(threshold), float(maxinterval))}
+        # Filter class and arguments of the request bucket and each tier
+        tiers = [(filter, float(threshold)*float(thresholdScale), float(maxinterval)*float(intervalScale))
+            for bucket, thresholdScale, intervalScale in [(None, 1, 1)] + args.tier]
+        if(args.adaptive is not None):
+            tiers = [(AdaptiveFilter,) + tier + (*args.adaptive, args.noisewindow, args.noiseestimator) for tier in tiers]
+        if(args.reorderwindow is not None):
+            tiers = [(ReorderFilter,) + tier for tier in tiers]
+            kwargs = {
+                "reorderWindow" : args.reorderwindow, 
+                "reorderCapacity" : args.reordercapacity, 
+                "latePolicy" : args.latepolicy
+                }
+        else:
+            kwargs = {}
+
+        # Least recently used series are spilled to disk above the maximum number of series
+        if(args.maxseries is not None):
+            treeClass = BoundedFilterTree
+            kwargs.update(maxSeries = args.maxseries, spillDir = args.spilldir)
+        else:
+            treeClass = FilterTree
+
+        # Parsing and tree walk are shared by the tiers
+        if(len(args.tier) > 0):
+            tree = treeClass(TierFilter, *tiers, **kwargs)
+        else:
+            tree = treeClass(*tiers[0], **kwargs)
+        measurements.setdefault(measurement, dict())[field] = tree
+
+    # Take over the listening socket and the filters of configured fields from a running process,\
+    # keeping the filters of fields with the same method, parameters and tiers
+    listenSocket = None
+    previousTokens = dict()
+    if(args.takeover is not None):
+        listenSocket, previousMeasurements, previousTokens = takeOver(args.takeover)
+        keepFilterState(measurements, previousMeasurements)
+
+    # Open the spool and forward its batches, replaying any left by a previous run
+    spool = None
+    forwarder = None
+    if(args.spool is not None):
+        spool = Spool(args.spool, int(args.spoolsegment*(1 << 20)), int(args.spoolsize*(1 << 20)), args.spoolsync)
+        forwarder = SpoolForwarder(spool, args.server_url, args.forwarders, tokenTimeout = args.tokentimeout)
+        forwarder.tokens.update(previousTokens)
+        forwarder.start()
 
     try:
         # Create the server, binding to HOST on PORT
-        handler = InfluxProxyHttpHandler(args.server_url, args.lastvalue, measurements, args.tags)
-        server = ThreadedTCPServer((args.host, args.port), handler)
+        handler = InfluxProxyHttpHandler(args.server_url, args.lastvalue, measurements, args.tags,
+            [bucket for bucket, thresholdScale, intervalScale in args.tier], spool, args.querymethod, args.querypoints,
+            {(measurement, field) : (float(threshold), float(maxinterval))
+                for measurement, field, threshold, maxinterval in args.fields}, forwarder)
+        if(listenSocket is not None):
+            server = ThreadedTCPServer((args.host, args.port), handler, bind_and_activate=False, profile=profile)
+            server.socket.close()
+            server.socket = listenSocket
+            server.server_address = listenSocket.getsockname()
+        else:
+            server = ThreadedTCPServer((args.host, args.port), handler, profile=profile)
         server.allow_reuse_address = True 
         
         # create a thread for the server and start
         serverthread = threading.Thread(target = server.serve_forever)
         serverthread.daemon = True
         serverthread.start()
+
+        # Wait for a new process to take over, which interrupts the wait for input
+        if(args.handover is not None):
+            handoverThread = threading.Thread(target = serveHandover,
+                args = (args.handover, server, measurements, spool, forwarder, args.draintimeout))
+            handoverThread.daemon = True
+            handoverThread.start()
             
         # wait for user input
         input("Press enter or CTRL-C to exit\n")
@@ -205,4 +875,13 @@ if __name__ == "__main__":
         # Shutdown HTTP server
         server.shutdown()
         server.server_close()
-        serverthread.join()
\ No newline at end of file
+        serverthread.join()
+
+        # Stop forwarding, leaving unwritten batches in the spool for the next run
+        if(spool is not None):
+            forwarder.stop()
+            spool.close()
+
+        if(profile is not None):
+            profile.stop()
+            print(profile.report(), file=sys.stderr)
\ No newline at end of file
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""AdaptiveFilter.py: Scales the threshold of a filter with an online\
+ estimate of the noise of the series."""
+
+# Import built-in modules
+import math
+import statistics
+
+# Import custom modules
+from .SerialFilter import SerialFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class AdaptiveFilter(SerialFilter):
+    """ Holds a filter with a threshold, such as a deadband, hysteresis or SDT\
+        filter, and sets its threshold to a multiple of the noise of the\
+        series, bounded by a range around the configured threshold. The noise\
+        is estimated from the differences between consecutive values, which\
+        removes the level and slow trends of the series, either as an\
+        exponentially weighted variance or as the median absolute deviation\
+        of each window of differences. The threshold is updated each time the\
+        filter keeps a point, so each segment uses a single threshold.
+    """
+
+    # Methods of estimating the noise
+    estimators = ("ewma", "mad")
+
+    def __init__(self, className, threshold, maxInterval, noiseScale = 3.0, minScale = 0.1, maxScale = 10.0,
+        window = 100, estimator = "ewma"):
+        """ Class constructor. The filter starts with the configured threshold,\
+            which is replaced once a window of points has been received, and\
+            is bounded by the configured threshold scaled by the minimum and\
+            maximum scales. """
+
+        if(estimator not in self.estimators):
+            raise ValueError("Estimator must be one of {0}.".format(", ".join(self.estimators)))
+        if(minScale > maxScale):
+            raise ValueError("Minimum scale must not be greater than the maximum scale.")
+        if(window < 2):
+            raise ValueError("Window must be at least two points.")
+
+        # Parameters
+        self._component = className(threshold, maxInterval)
+        self._noiseScale = noiseScale
+        self._minThreshold = threshold*minScale
+        self._maxThreshold = threshold*maxScale
+        self._window = window
+        self._estimator = estimator
+
+        # Weight of each difference in the exponentially weighted estimate
+        self._alpha = 2.0/(window + 1)
+
+        # Last value, and the estimate of the mean and variance of the differences
+        self._lastValue = None
+        self._count = 0
+        self._mean = 0.0
+        self._variance = 0.0
+        self._differences = list()
+
+        # Standard deviation of the noise once estimated
+        self._noise = None
+
+        if(not hasattr(self._component, "threshold")):
+            raise ValueError("{0} does not have a threshold.".format(className.__name__))
+
+        return
+
+    @property
+    def generatesPoints(self) -> bool:
+        """ Pass generatesPoints to component. """
+        return self._component.generatesPoints
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ Pass holdsPoints to component. """
+        return self._component.holdsPoints
+
+    @property
+    def interpolation(self) -> str:
+        """ Pass interpolation to component. """
+        return self._component.interpolation
+
+    @property
+    def threshold(self) -> float:
+        """ Returns the threshold of the filter. """
+        return self._component.threshold
+
+    @property
+    def noise(self) -> float:
+        """ Returns the estimated standard deviation of the noise, or None\
+            until a window of points has been received. """
+        return self._noise
+
+    def _estimate(self, value):
+        """ Updates the noise estimate with the difference from the last value.\
+            The differences of white noise have twice its variance. """
+        if(not math.isfinite(value)):
+            return
+        if(self._lastValue is not None):
+            difference = value - self._lastValue
+            self._count += 1
+
+            # Exponentially weighted mean and variance of the differences
+            if(self._estimator == "ewma"):
+                delta = difference - self._mean
+                self._mean += self._alpha*delta
+                self._variance = (1 - self._alpha)*(self._variance + self._alpha*delta*delta)
+                if(self._count >= self._window):
+                    self._noise = math.sqrt(self._variance/2)
+
+            # Median absolute deviation of each window of differences
+            else:
+                self._differences += [difference]
+                if(len(self._differences) >= self._window):
+                    median = statistics.median(self._differences)
+                    deviation = statistics.median([abs(difference - median) for difference in self._differences])
+                    self._noise = 1.4826*deviation/math.sqrt(2)
+                    self._differences = list()
+
+        self._lastValue = value
+        return
+
+    def filterPoint(self, time, value) -> list:
+        """ Updates the noise estimate and applies compression to the point,\
+            updating the threshold when a point is kept. """
+        self._estimate(value)
+        results = self._component.filterPoint(time, value)
+        if(len(results) > 0 and self._noise is not None):
+            self._component.threshold = min(max(self._noiseScale*self._noise, self._minThreshold), self._maxThreshold)
+        return results
+
+    def flush(self) -> list:
+        """ Pass flush calls to component. """
+        return self._component.flush()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""Analysis.py: Rebuilds compressed series at the input times and reports\
+ the reconstruction error and compression ratio."""
+
+# Import built-in modules
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+# Import third-party modules
+import numpy as np
+
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Methods of rebuilding a series from the filtered points
+interpolations = ("linear", "step")
+
+def interpolationFor(filter) -> str:
+    """ Returns the interpolation which rebuilds the output of a filter,\
+        linear for SDT and the offline filters and step-hold otherwise. """
+    return filter.interpolation
+
+def toTimes(times) -> np.ndarray:
+    """ Returns times as an array, with datetimes as int64 nanoseconds. """
+    times = np.asarray(times)
+    if(times.dtype.kind == "M"):
+        return times.astype("datetime64[ns]", copy = False).view(np.int64)
+    return times
+
+def reconstructGroups(groups, times, outputGroups, outputTimes, outputValues, interpolation = "linear") -> np.ndarray:
+    """ Rebuilds many series at the input times from the filtered points,\
+        where the groups arrays hold the series number of each point.\
+        Inputs before the first or after the last filtered point of their\
+        series take the value of that point, and series without filtered\
+        points are rebuilt as NaN.
+    """
+    if(interpolation not in interpolations):
+        raise ValueError("Interpolation must be one of {0}.".format(", ".join(interpolations)))
+
+    nOutput = len(outputTimes)
+    nTotal = nOutput + len(times)
+
+    # Sort filtered and input points together by series then time, with a\
+    # filtered point before an input point at the same time
+    allGroups = np.concatenate((np.asarray(outputGroups, dtype = np.int64), np.asarray(groups, dtype = np.int64)))
+    allTimes = np.concatenate((toTimes(outputTimes), toTimes(times)))
+    isInput = np.arange(0, nTotal) >= nOutput
+    order = np.lexsort((isInput, allTimes, allGroups))
+    allGroups = allGroups[order]
+    allTimes = allTimes[order]
+    isOutput = ~isInput[order]
+    allValues = np.concatenate((np.asarray(outputValues, dtype = np.float64), np.full(len(times), np.nan)))[order]
+
+    # Position of the previous and next filtered point of each point
+    positions = np.arange(0, nTotal)
+    previous = np.maximum.accumulate(np.where(isOutput, positions, -1))
+    following = np.minimum.accumulate(np.where(isOutput, positions, nTotal)[::-1])[::-1]
+
+    # Filtered points must belong to the same series
+    hasPrevious = previous >= 0
+    hasPrevious[hasPrevious] = allGroups[previous[hasPrevious]] == allGroups[hasPrevious]
+    hasFollowing = following < nTotal
+    hasFollowing[hasFollowing] = allGroups[following[hasFollowing]] == allGroups[hasFollowing]
+    previous = np.where(hasPrevious, previous, following)
+    following = np.where(hasFollowing, following, previous)
+    valid = hasPrevious | hasFollowing
+    previous = np.where(valid, previous, 0)
+    following = np.where(valid, following, 0)
+
+    # Step-hold takes the previous value, linear interpolates to the next
+    if(interpolation == "step"):
+        result = allValues[previous]
+    else:
+        span = (allTimes[following] - allTimes[previous]).astype(np.float64)
+        offset = (allTimes - allTimes[previous]).astype(np.float64)
+        fraction = np.divide(offset, span, out = np.zeros(nTotal), where = span != 0)
+        result = allValues[previous] + (allValues[following] - allValues[previous])*fraction
+    result = np.where(valid, result, np.nan)
+
+    # Return in the order of the input points
+    rebuilt = np.empty(len(times))
+    rebuilt[order[~isOutput] - nOutput] = result[~isOutput]
+    return rebuilt
+
+def reconstruct(times, outputTimes, outputValues, interpolation = "linear") -> np.ndarray:
+    """ Rebuilds a series at the input times from the filtered points. """
+    return reconstructGroups(np.zeros(len(times), dtype = np.int64), times,
+        np.zeros(len(outputTimes), dtype = np.int64), outputTimes, outputValues, interpolation)
+
+def compareGroups(groups, times, values, outputGroups, outputTimes, outputValues, interpolation = "linear",
+    nGroups = None) -> dict:
+    """ Returns arrays of the number of input and filtered points, the\
+        compression ratio and the maximum and RMS reconstruction error of\
+        each series, indexed by series number. """
+    groups = np.asarray(groups, dtype = np.int64)
+    outputGroups = np.asarray(outputGroups, dtype = np.int64)
+    if(nGroups is None):
+        nGroups = int(max(groups.max(initial = -1), outputGroups.max(initial = -1))) + 1
+
+    rebuilt = reconstructGroups(groups, times, outputGroups, outputTimes, outputValues, interpolation)
+    error = np.abs(rebuilt - np.asarray(values, dtype = np.float64))
+
+    # Reduce the error of each series
+    points = np.bincount(groups, minlength = nGroups)
+    outputPoints = np.bincount(outputGroups, minlength = nGroups)
+    maxError = np.full(nGroups, np.nan)
+    np.fmax.at(maxError, groups, error)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        rmsError = np.sqrt(np.bincount(groups, weights = error*error, minlength = nGroups)/points)
+        ratio = points/outputPoints
+
+    return {
+        "points" : points,
+        "outputPoints" : outputPoints,
+        "ratio" : ratio,
+        "maxError" : maxError,
+        "rmsError" : rmsError
+        }
+
+def compareSeries(times, values, outputTimes, outputValues, interpolation = "linear") -> dict:
+    """ Returns the number of input and filtered points, the compression\
+        ratio and the maximum and RMS reconstruction error of a series. """
+    result = compareGroups(np.zeros(len(times), dtype = np.int64), times, values,
+        np.zeros(len(outputTimes), dtype = np.int64), outputTimes, outputValues, interpolation, 1)
+    return {name : array[0].item() for name, array in result.items()}
+
+def compareFrames(data : DataFrame, output : DataFrame, keys, timeColumn = "_time", valueColumn = "_value",
+    interpolation = "linear") -> DataFrame:
+    """ Compares the input and filtered rows of many series, identified by\
+        the key columns. Returns a data frame indexed by key with the\
+        number of points, compression ratio and errors of each series.
+    """
+    import pandas as pd
+
+    # Number the series of both data frames together
+    keys = list(keys)
+    combined = pd.concat([data[keys], output[keys]], ignore_index = True)
+    grouped = combined.groupby(keys, sort = True, dropna = False)
+    groupIds = grouped.ngroup().to_numpy()
+    result = compareGroups(groupIds[0:len(data)], data[timeColumn].to_numpy(), data[valueColumn].to_numpy(),
+        groupIds[len(data):], output[timeColumn].to_numpy(), output[valueColumn].to_numpy(),
+        interpolation, grouped.ngroups)
+
+    return pd.DataFrame(result, index = grouped.size().index)
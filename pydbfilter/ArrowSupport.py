@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""ArrowSupport.py: Filters record batches of many series in Arrow IPC\
+ format, without converting their columns to text."""
+
+# Import third-party modules
+import numpy as np
+import pyarrow as pa
+
+# Import custom modules
+from . import Profiling
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Content type of an Arrow IPC stream
+contentType = "application/vnd.apache.arrow.stream"
+
+# Columns of a record batch which are not tags
+reservedColumns = ("time", "value", "measurement", "field")
+
+def readBatches(content) -> list:
+    """ Returns the record batches of an Arrow IPC stream, which reference\
+        the buffers of the content rather than copies. """
+    return list(pa.ipc.open_stream(pa.py_buffer(content)))
+
+def encodeBatches(batches) -> bytes:
+    """ Returns record batches as an Arrow IPC stream. """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def createBatch(times, values, measurements, fields, tags = {}) -> pa.RecordBatch:
+    """ Returns a record batch of arrays of times in nanoseconds since the\
+        epoch, values, measurements, fields and the values of each tag in a\
+        dictionary of tag names, with the string columns dictionary\
+        encoded. """
+    columns = {
+        "time" : pa.array(np.asarray(times, dtype = np.int64).view("datetime64[ns]")),
+        "value" : pa.array(np.asarray(values, dtype = np.float64)),
+        "measurement" : pa.array(measurements, type = pa.string()).dictionary_encode(),
+        "field" : pa.array(fields, type = pa.string()).dictionary_encode()
+        }
+    for name, tagValues in tags.items():
+        columns[name] = pa.array(tagValues, type = pa.string()).dictionary_encode()
+    return pa.RecordBatch.from_pydict(columns)
+
+def _codes(column) -> tuple:
+    """ Returns the dictionary indices of a string column, with -1 for nulls,\
+        and the dictionary as a list. Columns which are not dictionary\
+        encoded are encoded first. """
+    if(not pa.types.is_dictionary(column.type)):
+        column = column.dictionary_encode()
+    codes = column.indices.fill_null(-1).to_numpy(zero_copy_only = False).astype(np.int64, copy = False)
+    return codes, column.dictionary.to_pylist()
+
+def _times(column) -> np.ndarray:
+    """ Returns a time column as int64 nanoseconds since the epoch. """
+    if(pa.types.is_timestamp(column.type)):
+        if(column.type.unit != "ns"):
+            column = column.cast(pa.timestamp("ns", column.type.tz))
+        column = column.view(pa.int64())
+    return column.to_numpy(zero_copy_only = False).astype(np.int64, copy = False)
+
+def filterBatch(measurements, batch) -> list:
+    """ Filters the rows of a record batch with the filter of each series,\
+        from trees in a dictionary of measurements and fields. The batch has\
+        time, value, measurement and field columns, and a column of the\
+        values of each tag, where a null tag value is a tag which the series\
+        does not have. Rows are grouped into series by the dictionary\
+        indices of the string columns, keeping the order of the rows of\
+        each series, and rows of unknown measurements and fields or null\
+        values are dropped. Rows rejected by the filter of their series,\
+        such as a repeated or out of order time, are dropped and counted\
+        without affecting other series. Returns a list of the measurement,\
+        field, tags and filter output of each series. """
+    names = batch.schema.names
+    for name in reservedColumns:
+        if(name not in names):
+            raise ValueError("Record batch must have a {0} column.".format(name))
+    if(batch.num_rows == 0):
+        return list()
+
+    times = _times(batch.column("time"))
+    values = batch.column("value").cast(pa.float64())
+    valid = values.is_valid().to_numpy(zero_copy_only = False)
+    values = values.to_numpy(zero_copy_only = False)
+
+    # Dictionary indices of the measurement, field and each tag
+    tagNames = [name for name in names if name not in reservedColumns]
+    keys = [_codes(batch.column(name)) for name in ["measurement", "field"] + tagNames]
+
+    # Rows of each series are adjacent after a stable sort by the indices
+    order = np.lexsort([codes for codes, dictionary in reversed(keys)])
+    order = order[valid[order]]
+    if(len(order) == 0):
+        return list()
+    changed = np.zeros(len(order), dtype = bool)
+    changed[0] = True
+    for codes, dictionary in keys:
+        sortedCodes = codes[order]
+        changed[1:] |= sortedCodes[1:] != sortedCodes[:-1]
+    starts = np.flatnonzero(changed).tolist() + [len(order)]
+
+    results = list()
+    for start, stop in zip(starts[0:-1], starts[1:]):
+        row = order[start]
+        (measurementCode, measurementNames), (fieldCode, fieldNames) = \
+            [(codes[row], dictionary) for codes, dictionary in keys[0:2]]
+        if(measurementCode < 0 or fieldCode < 0):
+            continue
+        measurement = measurementNames[measurementCode]
+        field = fieldNames[fieldCode]
+        if(measurement not in measurements.keys() or field not in measurements[measurement].keys()):
+            continue
+
+        # Filter the points of the series, with the tags sorted as for line protocol
+        tags = sorted([(name, dictionary[codes[row]]) for name, (codes, dictionary) in zip(tagNames, keys[2:])
+            if codes[row] >= 0])
+        rows = order[start:stop]
+        filter = measurements[measurement][field].walk(list(tags))
+        results += [(measurement, field, tags, _filterRows(filter, times[rows], values[rows]))]
+
+    return results
+
+def _filterRows(filter, times, values):
+    """ Returns the output of a filter for the points of a series, dropping\
+        points which are not newer than the previous point of the series,\
+        and then points which the filter rejects as not newer than its last\
+        point, which are the first of the remaining points. """
+    newer = np.ones(len(times), dtype = bool)
+    newer[1:] = times[1:] > np.maximum.accumulate(times)[:-1]
+    points = list(zip(times[newer].tolist(), values[newer].tolist()))
+
+    # Filters reject a point before changing their state, so the first\
+    # point is dropped until the filter accepts the points
+    first = 0
+    while(True):
+        try:
+            output = filter.filterPoints(points[first:] if first > 0 else points)
+            break
+        except ValueError:
+            first += 1
+    Profiling.count("rows.rejected", len(times) - len(points) + first)
+
+    return output
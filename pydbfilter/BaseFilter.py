@@ -2,11 +2,14 @@
 """BaseFilter.py: Filter class interface."""
 
 # Import built-in modules
+from __future__ import annotations
 from abc import abstractmethod
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-# Import third-party modules
-from pandas import DataFrame
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    import numpy as np
+    from pandas import DataFrame, Series
 
 # Authorship information
 __author__ = "James Bott"
@@ -20,13 +23,26 @@ __status__ = "Development"
 
 class BaseFilter():
     """ Define interface common to all concrete filter implementations. """
+
+    # True if the filter generates points which are not in the input
+    generatesPoints : bool = False
+
+    # True if output points are held until the filter is flushed
+    holdsPoints : bool = False
+
+    # Interpolation which rebuilds the input from the output points
+    interpolation : str = "step"
     
     @abstractmethod
     def filterPoint(self, time: float, value: float) -> list:
         pass
 
     @abstractmethod
-    def filterPoints(self, data : Union[DataFrame, list]) -> Union[DataFrame, list]:
+    def filterPoints(self, data : Union[DataFrame, Series, list]) -> Union[DataFrame, Series, list]:
+        pass
+
+    @abstractmethod
+    def filterMask(self, data : Union[DataFrame, Series, tuple]) -> np.ndarray:
         pass
 
     @abstractmethod
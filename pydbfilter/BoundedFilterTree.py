@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""BoundedFilterTree.py: Filter tree which holds a bounded number of series in\
+ memory, spilling the least recently used to an on-disk store."""
+
+# Import built-in modules
+from __future__ import annotations
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Union
+
+# Import custom modules
+from .BaseFilter import BaseFilter
+from .FilterTree import FilterTree
+
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    import numpy as np
+    from pandas import DataFrame, Series
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def _closeStore(connection, filename):
+    """ Closes the store and removes its file. """
+    connection.close()
+    if(filename is not None and os.path.exists(filename)):
+        os.remove(filename)
+    return
+
+class _SeriesHandle(BaseFilter):
+    """ Filter returned by walk() for the series of a set of tags. Each call\
+        fetches the filter of the series from the tree, reading it from the\
+        store if it has been spilled, and holds the lock of the tree so that\
+        the filter is not spilled while it is in use.
+    """
+
+    def __init__(self, tree, key):
+        """ Class constructor. """
+        self._tree = tree
+        self._key = key
+        return
+
+    def __eq__(self, other) -> bool:
+        """ Handles are equal if they are for the same series of a tree. """
+        return isinstance(other, _SeriesHandle) and other._tree is self._tree and other._key == self._key
+
+    def __hash__(self) -> int:
+        """ Returns the hash of the series. """
+        return hash((id(self._tree), self._key))
+
+    @property
+    def generatesPoints(self) -> bool:
+        """ Pass generatesPoints to the filter of the tree. """
+        return self._tree.generatesPoints
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ Pass holdsPoints to the filter of the tree. """
+        return self._tree.holdsPoints
+
+    @property
+    def interpolation(self) -> str:
+        """ Pass interpolation to the filter of the tree. """
+        return self._tree.interpolation
+
+    def filterPoint(self, time: float, value: float) -> list:
+        """ Pass filterPoint calls to the filter of the series. """
+        with self._tree._lock:
+            return self._tree._fetch(self._key).filterPoint(time, value)
+
+    def filterPoints(self, data : Union[DataFrame, Series, list]) -> Union[DataFrame, Series, list]:
+        """ Pass filterPoints calls to the filter of the series. """
+        with self._tree._lock:
+            return self._tree._fetch(self._key).filterPoints(data)
+
+    def filterMask(self, data : Union[DataFrame, Series, tuple]) -> np.ndarray:
+        """ Pass filterMask calls to the filter of the series. """
+        with self._tree._lock:
+            return self._tree._fetch(self._key).filterMask(data)
+
+    def flush(self) -> list:
+        """ Pass flush calls to the filter of the series. """
+        with self._tree._lock:
+            return self._tree._fetch(self._key).flush()
+
+class BoundedFilterTree(FilterTree):
+    """ Filter tree which holds the filters of at most a maximum number of\
+        series in memory, such as when a burst of new tag values creates\
+        millions of series. When the maximum is exceeded the least recently\
+        used filters are pickled to a SQLite database in a temporary file,\
+        and are read back when the next point of their series arrives, so\
+        series which return continue from their previous state. The series\
+        are held in a table keyed by the tags passed to walk(), rather than\
+        as a node for each tag, and walk() returns a handle which is safe to\
+        use from several threads.
+    """
+
+    def __init__(self, className, *args, maxSeries = 100000, spillBatch = 100, spillDir = None, **kwargs):
+        """ Class constructor. Filters are spilled in batches of spillBatch\
+            series to a file created in spillDir, or the temporary directory\
+            of the system, which is removed when the tree is closed. """
+        if(maxSeries < 1):
+            raise ValueError("Maximum number of series must be at least one.")
+        if(spillBatch < 1):
+            raise ValueError("Spill batch must be at least one series.")
+        super().__init__(className, *args, **kwargs)
+        self._maxSeries = maxSeries
+        self._spillBatch = spillBatch
+        self._spillDir = spillDir
+
+        # Filters in memory in order of use, and counters of filters written to and read from the store
+        self._series = OrderedDict()
+        self.spills = 0
+        self.faults = 0
+
+        self._lock = threading.RLock()
+        self._openStore()
+        return
+
+    def _openStore(self):
+        """ Creates the store. Its journal is disabled, as its contents are not\
+            needed once the process exits. """
+        descriptor, self._filename = tempfile.mkstemp(prefix = "pydbfilter-", suffix = ".sqlite",
+            dir = self._spillDir)
+        os.close(descriptor)
+        self._connection = sqlite3.connect(self._filename, isolation_level = None, check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute("CREATE TABLE series (key TEXT PRIMARY KEY, state BLOB) WITHOUT ROWID")
+        self._finalizer = weakref.finalize(self, _closeStore, self._connection, self._filename)
+        return
+
+    def close(self):
+        """ Closes the store, discarding the spilled filters. """
+        self._finalizer()
+        return
+
+    def __getstate__(self) -> dict:
+        """ Returns the state of the tree for pickling, including the spilled\
+            filters. """
+        with self._lock:
+            state = {name : value for name, value in self.__dict__.items()
+                if name not in ("_lock", "_connection", "_filename", "_finalizer")}
+            state["_spilled"] = self._connection.execute("SELECT key, state FROM series").fetchall()
+        return state
+
+    def __setstate__(self, state):
+        """ Restores a pickled tree, writing its spilled filters to a new store. """
+        spilled = state.pop("_spilled")
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._openStore()
+        self._connection.executemany("INSERT INTO series (key, state) VALUES (?, ?)", spilled)
+        return
+
+    @property
+    def resident(self) -> int:
+        """ Returns the number of series in memory. """
+        return len(self._series)
+
+    @property
+    def spilled(self) -> int:
+        """ Returns the number of series in the store. """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM series").fetchone()[0]
+
+    @staticmethod
+    def _encodeKey(key) -> str:
+        """ Returns the text of the tags of a series in the store. """
+        return json.dumps(key)
+
+    @staticmethod
+    def _decodeKey(text) -> tuple:
+        """ Returns the tags of a series from their text in the store. """
+        return tuple([tuple(tag) for tag in json.loads(text)])
+
+    def _fetch(self, key) -> BaseFilter:
+        """ Returns the filter of a series, reading it from the store or\
+            creating it if it is not in memory, and spills the least\
+            recently used filters if the maximum is exceeded. """
+        filter = self._series.get(key)
+        if(filter is not None):
+            self._series.move_to_end(key)
+            return filter
+
+        # Read the filter from the store, or create a filter for a new series
+        text = self._encodeKey(key)
+        row = self._connection.execute("SELECT state FROM series WHERE key = ?", (text,)).fetchone()
+        if(row is not None):
+            filter = pickle.loads(row[0])
+            self._connection.execute("DELETE FROM series WHERE key = ?", (text,))
+            self.faults += 1
+        else:
+            filter = self._className(*self._classArgs, **self._classKwargs)
+        self._series[key] = filter
+
+        # Spill a batch of the least recently used filters, keeping the filter being returned
+        if(len(self._series) > self._maxSeries):
+            count = len(self._series) - max(self._maxSeries - self._spillBatch + 1, 1)
+            rows = list()
+            for index in range(0, count):
+                spillKey, spillFilter = self._series.popitem(last = False)
+                rows += [(self._encodeKey(spillKey), pickle.dumps(spillFilter, protocol = pickle.HIGHEST_PROTOCOL))]
+            self._connection.execute("BEGIN")
+            self._connection.executemany("INSERT INTO series (key, state) VALUES (?, ?)", rows)
+            self._connection.execute("COMMIT")
+            self.spills += count
+
+        return filter
+
+    def walk(self, tags):
+        """ Returns a filter for the series of the tags specified, which is\
+            created when a point is first filtered. The list of tags is\
+            consumed as by FilterTree.walk(). """
+        if(len(tags) == 0):
+            return self
+        key = tuple(reversed(tags))
+        tags.clear()
+        return _SeriesHandle(self, key)
+
+    def iterChildren(self, parentTags = ()):
+        """ Generator which yields a tuple of the tags and the filter of each\
+            series, in memory in order of use and then in the store, with\
+            the tags in the order of FilterTree.iterChildren(). Spilled\
+            filters are read back from the store when the handles are used,\
+            such as by flushAll(). """
+        with self._lock:
+            keys = list(self._series.keys())
+            keys += [self._decodeKey(text) for text, in self._connection.execute("SELECT key FROM series")]
+        for key in keys:
+            yield (tuple(parentTags) + key, _SeriesHandle(self, key))
+        return
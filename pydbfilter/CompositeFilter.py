@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""CompositeFilter.py: Filters one series through several filters in turn.\
+"""
+
+# Import custom modules
+from .SerialFilter import SerialFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class CompositeFilter(SerialFilter):
+    """ Chains filters so that the points kept by each stage are the input of\
+        the next, such as a deadband which drops sensor jitter before SDT.\
+        Each input point passes through every stage before the next point,\
+        so no stage output is collected for a batch.
+    """
+
+    def __init__(self, *stages, **kwargs):
+        """ Class constructor. Each stage is a tuple of the filter class and\
+            its arguments, in the order points pass through them, and\
+            keyword arguments are passed to every stage. """
+        if(len(stages) == 0):
+            raise ValueError("At least one stage must be specified.")
+        self._stages = [className(*args, **kwargs) for className, *args in stages]
+
+        # Time of the last point passed to each stage
+        self._lastTimes = [None]*len(self._stages)
+
+        return
+
+    @property
+    def stages(self) -> list:
+        """ Returns the filter of each stage. """
+        return self._stages
+
+    @property
+    def generatesPoints(self) -> bool:
+        """ True if the filter of any stage generates points. """
+        return any([stage.generatesPoints for stage in self._stages])
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ True if the filter of any stage holds points until flushed. """
+        return any([stage.holdsPoints for stage in self._stages])
+
+    @property
+    def interpolation(self) -> str:
+        """ Output is rebuilt by the interpolation of the last stage. """
+        return self._stages[-1].interpolation
+
+    def _pass(self, index, points) -> list:
+        """ Passes points through the stages from the index onwards. Points\
+            which are not newer than the last point passed to a stage, such\
+            as a kept point returned again on a timeout or flush, are not\
+            passed again. """
+        for index in range(index, len(self._stages)):
+            stage = self._stages[index]
+            lastTime = self._lastTimes[index]
+            results = list()
+            for time, value in points:
+                if(lastTime is None or time > lastTime):
+                    results += stage.filterPoint(time, value)
+                    lastTime = time
+            self._lastTimes[index] = lastTime
+            points = results
+            if(len(points) == 0):
+                break
+        return points
+
+    def filterPoint(self, time, value) -> list:
+        """ Applies compression to the point with each stage in turn. """
+        return self._pass(1, self._stages[0].filterPoint(time, value))
+
+    def flush(self) -> list:
+        """ Flushes each stage in turn, passing its last points through the\
+            later stages before they are flushed. """
+        results = list()
+        for index, stage in enumerate(self._stages):
+            results += self._pass(index + 1, stage.flush())
+        return results
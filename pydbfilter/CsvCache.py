@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""CsvCache.py: Memory-mapped columnar cache of parsed influxdb CSV exports.\
+"""
+
+# Import built-in modules
+import hashlib
+import json
+import os
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class CsvCache:
+    """ Converts an influxdb CSV export once to arrays of int64 times,\
+        float64 values and series numbers, sorted by series then time, which\
+        later runs memory map instead of parsing the CSV file. A series is\
+        each combination of the columns other than the time, value and query\
+        range columns, held in a table indexed by series number with the\
+        earliest start and latest stop of its query range. The cache is\
+        rebuilt when the size of the source file changes, or when its\
+        modification time changes and its hash differs.
+    """
+
+    # Version of the cache layout
+    version = 1
+
+    def __init__(self, filename, directory = None, header = 3):
+        """ Class constructor. The cache is kept in the directory, which is\
+            the file name with a .cache suffix by default. """
+
+        # Parameters
+        self._filename = filename
+        self._directory = directory if directory is not None else filename + ".cache"
+        self._header = header
+
+        # Whether the cache was built when opened
+        self.built = False
+        if(not self.isValid()):
+            self.build()
+            self.built = True
+        self._load()
+
+        return
+
+    def _path(self, name) -> str:
+        """ Returns the path of a file of the cache. """
+        return os.path.join(self._directory, name)
+
+    def _hash(self) -> str:
+        """ Returns the SHA-256 hash of the source file. """
+        digest = hashlib.sha256()
+        with open(self._filename, "rb") as file:
+            for block in iter(lambda : file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _source(self) -> dict:
+        """ Returns the size and modification time of the source file. """
+        status = os.stat(self._filename)
+        return {"size" : status.st_size, "mtime" : status.st_mtime_ns}
+
+    def isValid(self) -> bool:
+        """ Tests if the cache holds the current source file. A changed\
+            modification time with the same hash updates the cache. """
+        try:
+            with open(self._path("meta.json"), "r") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        source = self._source()
+        if(meta.get("version") != self.version or meta.get("header") != self._header
+            or meta.get("size") != source["size"]):
+            return False
+        if(meta.get("mtime") != source["mtime"]):
+            if(meta.get("hash") != self._hash()):
+                return False
+            meta["mtime"] = source["mtime"]
+            self._writeMeta(meta)
+
+        return True
+
+    def _writeMeta(self, meta):
+        """ Replaces the description of the cache, which is written last so\
+            an incomplete cache is never valid. """
+        with open(self._path("meta.json.tmp"), "w") as file:
+            json.dump(meta, file)
+        os.replace(self._path("meta.json.tmp"), self._path("meta.json"))
+        return
+
+    def build(self):
+        """ Parses the source file and writes the cache. """
+        source = self._source()
+        sourceHash = self._hash()
+        dfInput = pd.read_csv(self._filename, header = self._header)
+        columns = list(dfInput.columns)
+        seriesColumns = [column for column in columns if column not in ("_time", "_value", "_start", "_stop")]
+
+        # Number the series and sort by series then time
+        times = pd.to_datetime(dfInput["_time"]).to_numpy(dtype = "datetime64[ns]").view(np.int64)
+        values = dfInput["_value"].to_numpy(dtype = np.float64)
+        if(len(seriesColumns) > 0):
+            grouped = dfInput.groupby(seriesColumns, sort = True, dropna = False)
+            seriesIds = grouped.ngroup().to_numpy().astype(np.int32)
+            dfSeries = grouped.size().reset_index()[seriesColumns]
+            if("_start" in columns):
+                dfSeries["_start"] = grouped["_start"].min().to_numpy()
+            if("_stop" in columns):
+                dfSeries["_stop"] = grouped["_stop"].max().to_numpy()
+        else:
+            seriesIds = np.zeros(len(dfInput), dtype = np.int32)
+            dfSeries = pd.DataFrame(index = range(0, 1 if len(dfInput) > 0 else 0))
+        order = np.lexsort((times, seriesIds))
+
+        # Write the arrays, then the description
+        os.makedirs(self._directory, exist_ok = True)
+        if(os.path.exists(self._path("meta.json"))):
+            os.remove(self._path("meta.json"))
+        np.save(self._path("times.npy"), times[order])
+        np.save(self._path("values.npy"), values[order])
+        np.save(self._path("series.npy"), seriesIds[order])
+        dfSeries.to_csv(self._path("series.csv"), index = False)
+        self._writeMeta({
+            "version" : self.version,
+            "header" : self._header,
+            "size" : source["size"],
+            "mtime" : source["mtime"],
+            "hash" : sourceHash,
+            "columns" : columns,
+            "series" : len(dfSeries)
+            })
+
+        return
+
+    def _load(self):
+        """ Memory maps the arrays and reads the series table. """
+        with open(self._path("meta.json"), "r") as file:
+            meta = json.load(file)
+        self.columns = meta["columns"]
+        self._seriesCount = meta["series"]
+        self.times = np.load(self._path("times.npy"), mmap_mode = "r")
+        self.values = np.load(self._path("values.npy"), mmap_mode = "r")
+        self.seriesIds = np.load(self._path("series.npy"), mmap_mode = "r")
+
+        # Series values are read as text, as they are written to the output as text
+        try:
+            self.series = pd.read_csv(self._path("series.csv"), dtype = str, keep_default_na = False)
+        except pd.errors.EmptyDataError:
+            self.series = pd.DataFrame()
+
+        # Index of the first point of each series, and the end of the last
+        self.offsets = np.searchsorted(self.seriesIds, np.arange(0, self._seriesCount + 1))
+
+        return
+
+    def __len__(self) -> int:
+        """ Returns the number of series. """
+        return self._seriesCount
+
+    def seriesRows(self) -> list:
+        """ Returns a row of every column for each series, with the time and\
+            value columns set to None. """
+        records = self.series.to_dict("records") if len(self.series.columns) > 0 else [dict()]*len(self)
+        return [{column : record.get(column) for column in self.columns} for record in records]
+
+    def seriesPoints(self, series) -> tuple:
+        """ Returns the time and value arrays of a series. """
+        start, end = self.offsets[series], self.offsets[series + 1]
+        return self.times[start:end], self.values[start:end]
@@ -26,6 +26,17 @@ class DeadbandFilter(SerialFilter):
 
         return
 
+    @property
+    def threshold(self) -> float:
+        """ Returns the deadband value. """
+        return self._deadbandValue
+
+    @threshold.setter
+    def threshold(self, value):
+        """ Sets the deadband value. """
+        self._deadbandValue = value
+        return
+
     def isOutsideBounds(self, time, value):
         """ Tests if a time/value point is outside of deadband."""
         result = False
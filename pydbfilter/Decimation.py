@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+"""Decimation.py: Streaming decimation of query results to a point budget."""
+
+# Import built-in modules
+import csv
+import io
+from abc import ABC, abstractmethod
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+
+# Import custom modules
+from .SdtFilter import SdtFilter
+from .DeadbandFilter import DeadbandFilter
+from .DecimationMethods import methods as methods
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Annotated CSV data types of numeric values
+numericTypes = ("double", "long", "unsignedLong")
+
+class BucketDecimator(ABC):
+    """ Base class of decimators which divide the time range of a series into\
+        buckets of equal width and select points of each bucket. Points are\
+        passed in time order in chunks, and the points of a bucket are held\
+        until the bucket can be decided, so no more than a few buckets of a\
+        series are held at once. The results are the selected times, values\
+        and rows of the points passed to the decimator.
+    """
+
+    # Output points are points passed to the decimator
+    generatesPoints = False
+
+    def __init__(self, start, stop, buckets):
+        """ Class constructor. """
+        if(buckets < 1):
+            raise ValueError("Number of buckets must be at least one.")
+
+        # Parameters
+        self._start = start
+        self._buckets = buckets
+        self._width = max((stop - start)/buckets, 1.0)
+
+        # Points of the buckets which are not decided
+        self._times = np.zeros(0, dtype = np.int64)
+        self._values = np.zeros(0)
+        self._rows = np.zeros(0, dtype = object)
+        self._bucketIds = np.zeros(0, dtype = np.int64)
+
+        return
+
+    @abstractmethod
+    def _ready(self) -> int:
+        """ Returns the number of held points whose buckets can be decided. """
+        pass
+
+    @abstractmethod
+    def _select(self, count, final) -> np.ndarray:
+        """ Returns the indices of the points selected from the first count\
+            held points, which are all of the held points if final. """
+        pass
+
+    def _take(self, count, final) -> tuple:
+        """ Selects from the first count held points and removes them. """
+        selected = self._select(count, final)
+        results = (self._times[selected], self._values[selected], self._rows[selected])
+        self._times = self._times[count:]
+        self._values = self._values[count:]
+        self._rows = self._rows[count:]
+        self._bucketIds = self._bucketIds[count:]
+        return results
+
+    def filterChunk(self, times, values, rows) -> tuple:
+        """ Adds a chunk of points, returning the selected times, values and\
+            rows of the buckets which are complete. """
+        bucketIds = np.clip(np.floor((np.asarray(times) - self._start)/self._width), 0, self._buckets - 1).astype(np.int64)
+
+        # Late points are placed in the latest bucket
+        if(len(self._bucketIds) > 0):
+            bucketIds = np.maximum(bucketIds, self._bucketIds[-1])
+        self._bucketIds = np.concatenate([self._bucketIds, np.maximum.accumulate(bucketIds)])
+        self._times = np.concatenate([self._times, np.asarray(times, dtype = np.int64)])
+        self._values = np.concatenate([self._values, np.asarray(values, dtype = np.float64)])
+        self._rows = np.concatenate([self._rows, np.asarray(rows, dtype = object)])
+
+        return self._take(self._ready(), False)
+
+    def flush(self) -> tuple:
+        """ Returns the selected times, values and rows of the held points at\
+            the end of the series. """
+        return self._take(len(self._times), True)
+
+class MinMaxDecimator(BucketDecimator):
+    """ Selects the points with the minimum and maximum value of each bucket,\
+        in time order, which preserves the envelope of a series drawn with\
+        one bucket per pixel. """
+
+    def _ready(self) -> int:
+        """ Returns the number of points before the latest bucket. """
+        if(len(self._bucketIds) == 0):
+            return 0
+        return int(np.searchsorted(self._bucketIds, self._bucketIds[-1]))
+
+    def _select(self, count, final) -> np.ndarray:
+        """ Returns the indices of the minimum and maximum of each bucket. """
+        if(count == 0):
+            return np.zeros(0, dtype = np.int64)
+        bucketIds = self._bucketIds[0:count]
+
+        # Sorted by bucket then value, each bucket starts with its minimum and ends with its maximum
+        order = np.lexsort((self._values[0:count], bucketIds))
+        starts = np.flatnonzero(np.diff(bucketIds, prepend = -1))
+        ends = np.append(starts[1:], count) - 1
+        return np.unique(np.concatenate([order[starts], order[ends]]))
+
+class LttbDecimator(BucketDecimator):
+    """ Largest-Triangle-Three-Buckets decimation, which selects the first\
+        and last points of a series and the point of each bucket forming the\
+        largest triangle with the point selected from the previous bucket\
+        and the mean of the next bucket. """
+
+    def __init__(self, start, stop, buckets):
+        """ Class constructor. """
+        super().__init__(start, stop, buckets)
+
+        # Time and value of the last selected point
+        self._previous = None
+
+        return
+
+    def _ready(self) -> int:
+        """ Returns the number of points before the last two buckets, as a\
+            bucket is decided once the next bucket is complete. """
+        bucketIds = np.unique(self._bucketIds)
+        if(len(bucketIds) < 3):
+            return 0
+        return int(np.searchsorted(self._bucketIds, bucketIds[-2]))
+
+    def _select(self, count, final) -> np.ndarray:
+        """ Returns the indices of the point of each bucket with the largest\
+            triangle. """
+        selected = list()
+        first = 0
+
+        # First point of the series
+        if(self._previous is None and count > 0):
+            selected += [0]
+            self._previous = (self._times[0], self._values[0])
+            first = 1
+
+        # Last point of the series follows the last bucket
+        last = count - 1 if final else count
+        if(final and last >= first):
+            bucketIds = np.append(self._bucketIds[0:last], self._bucketIds[last - 1] + 1 if last > 0 else 0)
+        else:
+            bucketIds = self._bucketIds
+        starts = np.flatnonzero(np.diff(bucketIds[first:], prepend = -1)) + first
+        ends = np.append(starts[1:], len(bucketIds))
+
+        for start, end, nextEnd in zip(starts, ends, np.append(ends[1:], len(bucketIds))):
+            if(start >= last):
+                break
+
+            # Mean of the next bucket
+            meanTime = (self._times[end:nextEnd] - self._previous[0]).astype(np.float64).mean()
+            meanValue = self._values[end:nextEnd].mean() - self._previous[1]
+
+            # Twice the area of the triangle with each point of the bucket
+            times = (self._times[start:end] - self._previous[0]).astype(np.float64)
+            values = self._values[start:end] - self._previous[1]
+            index = start + int(np.argmax(np.abs(times*meanValue - meanTime*values)))
+            selected += [index]
+            self._previous = (self._times[index], self._values[index])
+
+        if(final and last >= first):
+            selected += [last]
+
+        return np.array(selected, dtype = np.int64)
+
+class FilterDecimator:
+    """ Decimates a series with a filter object such as an SdtFilter or\
+        DeadbandFilter. Output points are new points, which may not be a\
+        point of the chunk passed in, so rows are not returned. """
+
+    # Output points are written as new rows
+    generatesPoints = True
+
+    def __init__(self, filter):
+        """ Class constructor. """
+        self._filter = filter
+        return
+
+    def _results(self, results) -> tuple:
+        """ Returns the times and values of filter output. """
+        return (np.array([result[0] for result in results], dtype = np.int64),
+            np.array([result[1] for result in results], dtype = np.float64), None)
+
+    def filterChunk(self, times, values, rows) -> tuple:
+        """ Filters a chunk of points, skipping null values. """
+        valid = ~np.isnan(values)
+        return self._results(self._filter.filterPoints(list(zip(times[valid].tolist(), values[valid].tolist()))))
+
+    def flush(self) -> tuple:
+        """ Returns the last points of the filter. """
+        return self._results(self._filter.flush())
+
+def parseTimes(text) -> np.ndarray:
+    """ Returns nanoseconds since the epoch of a Series of RFC3339 times,\
+        parsing UTC times with NumPy which is faster than pandas. """
+    if(text.str.endswith("Z").all()):
+        return text.str[0:-1].to_numpy().astype("datetime64[ns]").view(np.int64)
+    return pd.to_datetime(text, format = "ISO8601", utc = True).dt.tz_localize(None) \
+        .to_numpy(dtype = "datetime64[ns]").view(np.int64)
+
+def createDecimator(row, method, points, filters = {}):
+    """ Returns a decimator for a table from the columns of its first row,\
+        or None to pass the table through. The minmax and lttb methods\
+        select up to the number of points over the query range given by\
+        the _start and _stop columns. The sdt and deadband methods filter\
+        with the threshold and maximum interval of the measurement and\
+        field in the filters dictionary, keyed by tuples of the measurement\
+        and field. """
+    if(method in ("minmax", "lttb")):
+        if(len(row.get("_start") or "") == 0 or len(row.get("_stop") or "") == 0):
+            return None
+        start, stop = parseTimes(pd.Series([row["_start"], row["_stop"]])).tolist()
+        if(method == "minmax"):
+            return MinMaxDecimator(start, stop, max(points//2, 1))
+        return LttbDecimator(start, stop, max(points - 2, 1))
+    elif(method in ("sdt", "deadband")):
+        key = (row.get("_measurement"), row.get("_field"))
+        if(key not in filters.keys()):
+            return None
+        return FilterDecimator((SdtFilter if method == "sdt" else DeadbandFilter)(*filters[key]))
+    raise ValueError("Unknown decimation method {0}.".format(method))
+
+def formatTime(time) -> str:
+    """ Formats nanoseconds since the epoch as an RFC3339 time with the\
+        fraction of a second trimmed, as written by influxdb. """
+    text = np.datetime_as_string(np.datetime64(int(time), "ns"))
+    return text.rstrip("0").rstrip(".") + "Z"
+
+class CsvDecimator:
+    """ Decimates each table of an annotated CSV query response as it is\
+        streamed. Text is passed to feed() in chunks of any size, and the\
+        complete lines are parsed with pandas and passed to a decimator\
+        for each table created by the factory, which is called with the\
+        columns of the first row of a table and returns a decimator or\
+        None to pass the table through. Tables without numeric values, and\
+        chunks with quoted fields, are passed through unchanged.
+    """
+
+    def __init__(self, factory):
+        """ Class constructor. """
+        self._factory = factory
+        self._buffer = ""
+        self._newline = None
+
+        # Columns and data types of the current header
+        self._columns = None
+        self._datatypes = None
+
+        # Key, decimator and first row of the current table
+        self._table = None
+        self._decimator = None
+        self._template = None
+
+        return
+
+    def feed(self, text) -> str:
+        """ Adds text of the response, returning the decimated text of the\
+            complete lines. """
+        self._buffer += text
+        end = self._buffer.rfind("\n")
+        if(end < 0):
+            return ""
+        complete = self._buffer[0:end + 1]
+        self._buffer = self._buffer[end + 1:]
+        return self._process(complete)
+
+    def close(self) -> str:
+        """ Returns the decimated text of the remainder of the response. """
+        output = self._process(self._buffer + "\n") if len(self._buffer) > 0 else ""
+        self._buffer = ""
+        return output + self._join(self._endTable())
+
+    def _join(self, lines) -> str:
+        """ Joins output lines with the line ending of the response. """
+        if(len(lines) == 0):
+            return ""
+        return self._newline.join(lines) + self._newline
+
+    def _process(self, text) -> str:
+        """ Decimates complete lines of the response. """
+        if(self._newline is None):
+            self._newline = "\r\n" if text[0:text.find("\n")].endswith("\r") else "\n"
+        lines = text.replace("\r\n", "\n").split("\n")[0:-1]
+        output = list()
+
+        # Annotations, blank lines and headers end a table
+        controls = [index for index, line in enumerate(lines) if len(line) == 0 or line[0] == "#"]
+        start = 0
+        for index in controls + [len(lines)]:
+            if(index > start):
+                output += self._processRows(lines[start:index])
+            if(index < len(lines)):
+                output += self._endTable()
+                line = lines[index]
+                self._columns = None
+                if(len(line) == 0):
+                    self._datatypes = None
+                elif(line.startswith("#datatype,")):
+                    self._datatypes = line.split(",")
+                output += [line]
+            start = index + 1
+
+        return self._join(output)
+
+    def _endTable(self) -> list:
+        """ Returns the last rows of the current table. """
+        output = list()
+        if(self._decimator is not None):
+            output = self._outputRows(*self._decimator.flush())
+        self._table = None
+        self._decimator = None
+        return output
+
+    def _outputRows(self, times, values, rows) -> list:
+        """ Returns the lines of output points, as new rows from the first\
+            row of the table if the decimator generates points. """
+        if(not self._decimator.generatesPoints):
+            return list(rows)
+        output = list()
+        for time, value in zip(times.tolist(), values.tolist()):
+            fields = list(self._template)
+            fields[self._timeIndex] = formatTime(time)
+            fields[self._valueIndex] = repr(value)
+            output += [",".join(fields)]
+        return output
+
+    def _processRows(self, lines) -> list:
+        """ Decimates lines of data rows, where the first line after the\
+            annotations is the header. """
+        if(self._columns is None):
+            self._columns = lines[0].split(",")
+            lines = lines[1:]
+            if(len(lines) == 0):
+                return [",".join(self._columns)]
+            return [",".join(self._columns)] + self._processRows(lines)
+
+        # Tables which are passed through
+        columns = self._columns
+        numeric = (self._datatypes is None or "_value" not in columns
+            or self._datatypes[columns.index("_value")] in numericTypes)
+        if(not numeric or "_time" not in columns or "_value" not in columns
+            or "table" not in columns or any(['"' in line for line in lines])):
+            return self._endTable() + lines
+        self._timeIndex = columns.index("_time")
+        self._valueIndex = columns.index("_value")
+        keyIndices = [columns.index("table")] + ([columns.index("result")] if "result" in columns else [])
+
+        # Parse the key, time and value columns of all lines at once
+        frame = pd.read_csv(io.StringIO("\n".join(lines)), header = None, dtype = str,
+            keep_default_na = False, usecols = keyIndices + [self._timeIndex, self._valueIndex])
+        keys = frame[keyIndices[0]]
+        for index in keyIndices[1:]:
+            keys = keys + "," + frame[index]
+        keys = keys.to_numpy()
+        times = parseTimes(frame[self._timeIndex])
+        values = pd.to_numeric(frame[self._valueIndex], errors = "coerce").to_numpy(dtype = np.float64)
+        rows = np.array(lines, dtype = object)
+
+        # Decimate each run of rows of a table
+        output = list()
+        starts = np.flatnonzero(np.append(True, keys[1:] != keys[0:-1]))
+        for start, end in zip(starts, np.append(starts[1:], len(lines))):
+            if(keys[start] != self._table):
+                output += self._endTable()
+                self._table = keys[start]
+                self._template = next(csv.reader([lines[start]]))
+                self._decimator = self._factory(dict(zip(columns, self._template)))
+            if(self._decimator is None):
+                output += lines[start:end]
+            else:
+                output += self._outputRows(*self._decimator.filterChunk(times[start:end],
+                    values[start:end], rows[start:end]))
+
+        return output
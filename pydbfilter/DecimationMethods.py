@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+"""DecimationMethods.py: Names of the decimation methods of query results,\
+ which are imported without NumPy or pandas."""
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Decimation methods of Decimation.createDecimator()
+methods = ("minmax", "lttb", "sdt", "deadband")
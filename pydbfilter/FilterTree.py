@@ -3,13 +3,18 @@
 """
 
 # Import built-in modules
-from typing import Union
-
-# Import third-party modules
-from pandas import DataFrame
+from __future__ import annotations
+from itertools import chain
+from typing import TYPE_CHECKING, Union
 
 # Import custom modules
 from .BaseFilter import BaseFilter
+from .TierFilter import TierFilter
+
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    import numpy as np
+    from pandas import DataFrame, Series
 
 # Authorship information
 __author__ = "James Bott"
@@ -37,16 +42,57 @@ class FilterTree(BaseFilter):
         """ Method returns a list where each element is a tuple containing a 
             list of associated tags and a DeadbandFilter object instance.
         """ 
-        result = list()
+        return [(list(tags), filter) for tags, filter in self.iterChildren(parentTags)]
+
+    def _iterNodes(self):
+        """ Returns an iterator over the (tag, child) pairs of this node. """
+        return (((tagName, tagValue), filter)
+            for tagName, row in self._children.items()
+                for tagValue, filter in row.items())
+
+    def iterChildren(self, parentTags = ()):
+        """ Generator which yields a tuple of associated tags and the filter\
+            for each node below this one, in the same order as\
+            getAllChildren(), without building intermediate lists. The tree\
+            must not be modified during iteration.
+        """
+        # Stack of the tags and remaining children of each level
+        stack = [(tuple(parentTags), self._iterNodes())]
+
+        while(len(stack) > 0):
+            tags, nodes = stack[-1]
+            node = next(nodes, None)
+
+            # Level is complete
+            if(node is None):
+                stack.pop()
+            # Yield child then descend into its children
+            else:
+                tag, filter = node
+                childTags = tags + (tag,)
+                yield (childTags, filter)
+                if(len(filter._children) > 0):
+                    stack += [(childTags, filter._iterNodes())]
 
-        for tagName, row in self._children.items():
-            for tagValue, filter in row.items(): 
-                # Add child record
-                result += [(parentTags + [(tagName, tagValue)], filter)]
-                # Add children of child record
-                result += filter.getAllChildren(parentTags + [(tagName, tagValue)])
+        return
 
-        return result
+    def flushAll(self) -> Union[tuple, list]:
+        """ Flushes this node and every node below it in one pass. Returns\
+            lists of the tags, times and values of the flushed points, or a\
+            list of these for each tier if the filters are TierFilters.
+        """
+        tiered = isinstance(self._component, TierFilter)
+        columns = [(list(), list(), list()) for tier in range(0, len(self._component) if tiered else 1)]
+
+        for tags, filter in chain([((), self)], self.iterChildren()):
+            flushed = filter.flush()
+            for (keys, times, values), points in zip(columns, flushed if tiered else [flushed]):
+                for time, value in points:
+                    keys += [tags]
+                    times += [time]
+                    values += [value]
+
+        return columns if tiered else columns[0]
 
     def _addChild(self, tag, value, child):
         """ Adds a child to this tree node. """
@@ -103,10 +149,37 @@ class FilterTree(BaseFilter):
         """ Pass filterPoint calls to component. """
         return self._component.filterPoint(time, value)
 
-    def filterPoints(self, data : Union[DataFrame, list]) -> Union[DataFrame, list]:
+    @property
+    def generatesPoints(self) -> bool:
+        """ Pass generatesPoints to component. """
+        return self._component.generatesPoints
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ Pass holdsPoints to component. """
+        return self._component.holdsPoints
+
+    @property
+    def interpolation(self) -> str:
+        """ Pass interpolation to component. """
+        return self._component.interpolation
+
+    def filterPoints(self, data : Union[DataFrame, Series, list]) -> Union[DataFrame, Series, list]:
         """ Pass filterPoints calls to component. """
         return self._component.filterPoints(data)
 
+    def filterMask(self, data : Union[DataFrame, Series, tuple]) -> np.ndarray:
+        """ Pass filterMask calls to component. """
+        return self._component.filterMask(data)
+
+    def filterGroups(self, data : DataFrame, tagColumns : Union[str, list], timeColumn, valueColumn) -> np.ndarray:
+        """ Filters each group of a data frame grouped by the tag columns using\
+            the filter for the group's tags. Returns a boolean array over the\
+            rows of the data frame which is true for each row kept.
+        """
+        from . import PandasSupport
+        return PandasSupport.filterGroups(self, data, tagColumns, timeColumn, valueColumn)
+
     def flush(self) -> list:
         """ Pass flush calls to component. """
         return self._component.flush()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""GorillaCodec.py: Lossless binary encoding of series with delta-of-delta\
+ times and XOR compressed values."""
+
+# Import built-in modules
+import struct
+
+# Import third-party modules
+import numpy as np
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Start of an encoded stream
+magic = b"PDBG\x01"
+
+# Series number, number of points, first time, first value, time scale and\
+# the length in bytes of each section of a block
+_blockHeader = struct.Struct("<IIqQq5I")
+
+# Bit width of the delta-of-delta for each 3 bit time code
+timeWidths = np.array([0, 4, 8, 12, 16, 24, 32, 64], dtype = np.int64)
+
+# Value codes for an unchanged value, a XOR within the previous window and\
+# a XOR with a new window
+_valueSame = 0
+_valueReuse = 2
+_valueWindow = 3
+
+def _leadingZeros(x) -> np.ndarray:
+    """ Returns the number of leading zero bits of each uint64, which is 64\
+        for zero. """
+    # Exponent of the float may be rounded up to the next power of two
+    highest = np.minimum(np.frexp(x.astype(np.float64))[1] - 1, 63).astype(np.int64)
+    highest -= ((x >> np.maximum(highest, 0).astype(np.uint64)) == 0) & (x != 0)
+    return 63 - highest
+
+def _trailingZeros(x) -> np.ndarray:
+    """ Returns the number of trailing zero bits of each non-zero uint64. """
+    lowest = x & (~x + np.uint64(1))
+    return (np.frexp(lowest.astype(np.float64))[1] - 1).astype(np.int64)
+
+def packCodes(codes, width) -> bytes:
+    """ Packs codes of a fixed number of bits, most significant bit first,\
+        padded to a whole byte. """
+    codes = np.asarray(codes, dtype = np.int64)
+    bits = np.empty((len(codes), width), dtype = np.uint8)
+    for i in range(0, width):
+        bits[:, i] = (codes >> (width - 1 - i)) & 1
+    return np.packbits(bits).tobytes()
+
+def unpackCodes(data, width, count) -> np.ndarray:
+    """ Returns the codes packed by packCodes(). """
+    bits = np.unpackbits(np.frombuffer(data, dtype = np.uint8), count = count*width).reshape(count, width)
+    codes = np.zeros(count, dtype = np.int64)
+    for i in range(0, width):
+        codes = (codes << 1) | bits[:, i]
+    return codes
+
+def packBits(fields, lengths) -> bytes:
+    """ Packs each field into the given number of bits from 0 to 64, most\
+        significant bit first, padded to a whole byte. """
+    used = lengths > 0
+    fields = np.asarray(fields, dtype = np.uint64)[used]
+    lengths = np.asarray(lengths, dtype = np.int64)[used]
+    if(len(lengths) == 0):
+        return b""
+
+    # Word and bit offset of the start and end of each field
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    totalBits = int(ends[-1])
+    words = starts >> 6
+    fieldEnds = (starts & 63) + lengths
+
+    # Bits in the first word, and bits spilling into the next word
+    spills = fieldEnds > 64
+    first = fields << (64 - np.minimum(fieldEnds, 64)).astype(np.uint64)
+    first[spills] = fields[spills] >> (fieldEnds[spills] - 64).astype(np.uint64)
+    result = np.zeros((totalBits + 63)//64 + 1, dtype = np.uint64)
+    indices = np.flatnonzero(np.diff(words, prepend = -1))
+    result[words[indices]] = np.bitwise_or.reduceat(first, indices)
+    result[words[spills] + 1] |= fields[spills] << (128 - fieldEnds[spills]).astype(np.uint64)
+
+    return result.astype(">u8").tobytes()[0:(totalBits + 7)//8]
+
+def unpackBits(data, lengths) -> np.ndarray:
+    """ Returns the fields of the given number of bits packed by packBits(). """
+    lengths = np.asarray(lengths, dtype = np.int64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    # Read each field from its word and the next
+    padded = bytes(data) + bytes(16 - len(data)%8)
+    words = np.frombuffer(padded, dtype = ">u8").astype(np.uint64)
+    index = starts >> 6
+    offsets = (starts & 63).astype(np.uint64)
+    combined = (words[index] << offsets) | ((words[index + 1] >> np.uint64(1)) >> (np.uint64(63) - offsets))
+    fields = combined >> (64 - np.maximum(lengths, 1)).astype(np.uint64)
+    fields[lengths == 0] = 0
+    return fields
+
+def encodeBlock(series, times, values) -> bytes:
+    """ Encodes the times and values of a block of a series. Times are\
+        stored as the delta-of-delta in units of the greatest common divisor\
+        of the intervals, and values as the XOR with the previous value,\
+        keeping the bits between the leading and trailing zeros of the\
+        previous XOR when they fit and otherwise a new window.
+    """
+    times = np.asarray(times, dtype = np.int64)
+    bits = np.ascontiguousarray(values, dtype = np.float64).view(np.uint64)
+    n = len(times)
+    if(n == 0):
+        raise ValueError("Block must have at least one point.")
+
+    # Delta-of-delta of the times, zigzag encoded
+    deltas = np.diff(times)
+    scale = int(np.gcd.reduce(deltas)) if n > 1 else 1
+    scale = scale if scale > 0 else 1
+    dods = np.diff(deltas//scale, prepend = 0)
+    zigzag = ((dods << 1) ^ (dods >> 63)).view(np.uint64)
+    timeCodes = np.searchsorted(timeWidths, 64 - _leadingZeros(zigzag))
+
+    # XOR of each value with the previous value
+    xors = bits[1:] ^ bits[0:-1]
+    changed = np.flatnonzero(xors != 0)
+    changedXors = xors[changed]
+    leading = np.minimum(_leadingZeros(changedXors), 31)
+    trailing = _trailingZeros(changedXors)
+
+    # A new window is stored unless the XOR fits the window of the previous\
+    # changed value, which is within the window that value was stored in
+    reuse = np.zeros(len(changed), dtype = bool)
+    reuse[1:] = (leading[1:] >= leading[0:-1]) & (trailing[1:] >= trailing[0:-1])
+    windowIndex = np.maximum.accumulate(np.where(reuse, 0, np.arange(0, len(changed))))
+    windowLeading = leading[windowIndex]
+    windowTrailing = trailing[windowIndex]
+    valueCodes = np.full(n - 1, _valueSame, dtype = np.int64)
+    valueCodes[changed] = np.where(reuse, _valueReuse, _valueWindow)
+    windows = (leading[~reuse] << 6) | (64 - leading[~reuse] - trailing[~reuse] - 1)
+
+    sections = [
+        packCodes(timeCodes, 3),
+        packBits(zigzag, timeWidths[timeCodes]),
+        packCodes(valueCodes, 2),
+        packCodes(windows, 11),
+        packBits(changedXors >> windowTrailing.astype(np.uint64), 64 - windowLeading - windowTrailing)
+        ]
+    return _blockHeader.pack(series, n, int(times[0]), int(bits[0]), scale,
+        *[len(section) for section in sections]) + b"".join(sections)
+
+def decodeBlock(data, offset = 0) -> tuple:
+    """ Decodes a block, returning the series number, times, values and the\
+        offset of the next block. """
+    series, n, firstTime, firstBits, scale, *lengths = _blockHeader.unpack_from(data, offset)
+    offset += _blockHeader.size
+    sections = list()
+    for length in lengths:
+        sections += [data[offset:offset + length]]
+        offset += length
+
+    # Times from the cumulative sum of the delta-of-delta
+    timeCodes = unpackCodes(sections[0], 3, n - 1)
+    zigzag = unpackBits(sections[1], timeWidths[timeCodes])
+    dods = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    times = np.empty(n, dtype = np.int64)
+    times[0] = firstTime
+    times[1:] = firstTime + np.cumsum(np.cumsum(dods)*scale)
+
+    # Window of each changed value from the last new window
+    valueCodes = unpackCodes(sections[2], 2, n - 1)
+    changed = np.flatnonzero(valueCodes != _valueSame)
+    newWindow = valueCodes[changed] == _valueWindow
+    windows = unpackCodes(sections[3], 11, int(newWindow.sum()))
+    windowIndex = np.maximum.accumulate(np.where(newWindow, np.cumsum(newWindow) - 1, 0))
+    windowLeading = (windows >> 6)[windowIndex]
+    windowLength = ((windows & 63) + 1)[windowIndex]
+
+    # Values from the cumulative XOR
+    meaningful = unpackBits(sections[4], windowLength)
+    xors = np.zeros(n, dtype = np.uint64)
+    xors[0] = firstBits
+    xors[changed + 1] = meaningful << (64 - windowLeading - windowLength).astype(np.uint64)
+    values = np.bitwise_xor.accumulate(xors).view(np.float64)
+
+    return series, times, values, offset
+
+class GorillaWriter:
+    """ Writes series to a binary stream in blocks of up to the block size\
+        for each series. Points of each series are buffered until a block\
+        is full or flush() is called. """
+
+    def __init__(self, file, blockSize = 65536):
+        """ Class constructor. """
+        self._file = file
+        self._blockSize = blockSize
+        self._buffers = dict()
+        self._file.write(magic)
+        return
+
+    def write(self, series, times, values):
+        """ Adds points to a series, writing any full blocks. """
+        bufferTimes, bufferValues = self._buffers.get(series, ([], []))
+        bufferTimes += [np.asarray(times, dtype = np.int64)]
+        bufferValues += [np.asarray(values, dtype = np.float64)]
+        self._buffers[series] = (bufferTimes, bufferValues)
+        if(sum([len(block) for block in bufferTimes]) >= self._blockSize):
+            self._writeSeries(series, False)
+        return
+
+    def _writeSeries(self, series, final):
+        """ Writes the full blocks of a series, or all points if final. """
+        bufferTimes, bufferValues = self._buffers.pop(series)
+        times = np.concatenate(bufferTimes)
+        values = np.concatenate(bufferValues)
+        end = len(times) if final else len(times) - len(times)%self._blockSize
+        for start in range(0, end, self._blockSize):
+            self._file.write(encodeBlock(series, times[start:start + self._blockSize],
+                values[start:start + self._blockSize]))
+        if(end < len(times)):
+            self._buffers[series] = ([times[end:]], [values[end:]])
+        return
+
+    def flush(self):
+        """ Writes the buffered points of every series. """
+        for series in list(self._buffers.keys()):
+            self._writeSeries(series, True)
+        return
+
+def readBlocks(file, bufferSize = 1 << 20):
+    """ Generator which decodes the blocks of a binary stream as it is read,\
+        yielding the series number, times and values of each block. """
+    if(file.read(len(magic)) != magic):
+        raise ValueError("Stream is not encoded by GorillaWriter.")
+
+    data = b""
+    offset = 0
+    ended = False
+    while(True):
+        # Block is complete once its header and sections have been read
+        available = len(data) - offset
+        if(available >= _blockHeader.size):
+            size = _blockHeader.size + sum(_blockHeader.unpack_from(data, offset)[5:])
+            if(available >= size):
+                series, times, values, offset = decodeBlock(data, offset)
+                yield series, times, values
+                continue
+        if(ended):
+            if(available > 0):
+                raise ValueError("Stream ended within a block.")
+            return
+
+        # Read more of the stream
+        block = file.read(bufferSize)
+        ended = len(block) == 0
+        data = data[offset:] + block
+        offset = 0
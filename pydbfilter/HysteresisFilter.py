@@ -34,6 +34,17 @@ class HysteresisFilter(SerialFilter):
 
         return
 
+    @property
+    def threshold(self) -> float:
+        """ Returns the hysteresis value. """
+        return self._hystValue
+
+    @threshold.setter
+    def threshold(self, value):
+        """ Sets the hysteresis value. """
+        self._hystValue = value
+        return
+
     def filterPoint(self, time, value) -> list:
         """ Applies compression to the time-series points. """
         results = list()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""PandasSupport.py: Pandas and NumPy integration for the filters, imported\
+ only when a DataFrame, Series or array is filtered."""
+
+# Import built-in modules
+from typing import Union
+
+# Import third-party modules
+import numpy as np
+from pandas import DataFrame, Series
+from pandas.api.types import is_datetime64_any_dtype
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def toTimeArray(times) -> tuple:
+    """ Returns the times of a Series or Index as an array, with datetimes as\
+        an int64 nanosecond view, and the time zone of datetimes. """
+    if(is_datetime64_any_dtype(times)):
+        timeZone = getattr(times.dt, "tz", None) if isinstance(times, Series) else getattr(times, "tz", None)
+        return times.to_numpy(dtype = "datetime64[ns]").view(np.int64), True, timeZone
+    return times.to_numpy(), False, None
+
+def fromTimeList(times, isDatetime, timeZone) -> Union[Series, list]:
+    """ Restores filtered times to the datetime type of the input. """
+    if(isDatetime):
+        times = Series(np.array([round(time) for time in times], dtype = np.int64).view("datetime64[ns]"))
+        if(timeZone is not None):
+            times = times.dt.tz_localize("UTC").dt.tz_convert(timeZone)
+    return times
+
+def splitData(data : Union[DataFrame, Series, tuple]) -> tuple:
+    """ Returns the time array, time type and value array of a data frame,\
+        series or tuple of time and value arrays. """
+    # If type is tuple of arrays
+    if(isinstance(data, tuple)):
+        times, values = data
+        if(times.dtype.kind == "M"):
+            return times.astype("datetime64[ns]", copy = False).view(np.int64), True, None, values
+        return times, False, None, values
+
+    # If type is data frame
+    if(isinstance(data, DataFrame)):
+
+        # Must have two columns
+        if(len(data.columns) != 2):
+            raise ValueError("Input data frame must have two columns.")
+
+        return toTimeArray(data.iloc[:, 0]) + (data.iloc[:, 1].to_numpy(),)
+
+    # Otherwise series indexed by time
+    return toTimeArray(data.index) + (data.to_numpy(),)
+
+def filterArrays(filter, times, values) -> list:
+    """ Applies filterPoint() to arrays of times and values. """
+    results = list()
+    for time, value in zip(times.tolist(), values.tolist()):
+        results += filter.filterPoint(time, value)
+    return results
+
+def filterData(filter, data : Union[DataFrame, Series]) -> Union[DataFrame, Series]:
+    """ Implements filterPoints() for a data frame or series. """
+    # If type is data frame
+    if(type(data) is DataFrame):
+
+        # Datetime columns are filtered as int64 nanoseconds
+        times, isDatetime, timeZone, values = splitData(data)
+
+        # Apply over each row
+        results = filterArrays(filter, times, values)
+        times = fromTimeList([result[0] for result in results], isDatetime, timeZone)
+        values = [result[1] for result in results]
+        results = DataFrame({data.columns[0] : times, data.columns[1] : values})
+    # If type is series
+    if(type(data) is Series):
+
+        # Points which are kept are selected from the input
+        if(not filter.generatesPoints):
+            results = data[filterMask(filter, data)]
+        # Otherwise a new series is created from the generated points
+        else:
+            times, isDatetime, timeZone, values = splitData(data)
+            results = filterArrays(filter, times, values)
+            times = fromTimeList([result[0] for result in results], isDatetime, timeZone)
+            results = Series([result[1] for result in results], index = times, name = data.name)
+
+    return results
+
+def filterMask(filter, data : Union[DataFrame, Series, tuple]) -> np.ndarray:
+    """ Implements filterMask() for a data frame, series or tuple of arrays. """
+    if(filter.generatesPoints):
+        raise ValueError("{0} generates new points which cannot be represented as a mask.".format(
+            type(filter).__name__))
+
+    times, isDatetime, timeZone, values = splitData(data)
+
+    # Locate the kept points in the input by time
+    mask = np.zeros(len(times), dtype = bool)
+    keptTimes = [result[0] for result in filterArrays(filter, times, values)]
+    if(len(keptTimes) > 0):
+        mask[np.searchsorted(times, keptTimes)] = True
+
+    return mask
+
+def filterGroups(tree, data : DataFrame, tagColumns : Union[str, list], timeColumn, valueColumn) -> np.ndarray:
+    """ Implements filterGroups() for a data frame grouped by tag columns. """
+    tagNames = [tagColumns] if isinstance(tagColumns, str) else list(tagColumns)
+    missing = [name for name in tagNames + [timeColumn, valueColumn] if name not in data.columns]
+    if(len(missing) > 0):
+        raise ValueError("Data frame does not have the columns {0}.".format(", ".join(map(str, missing))))
+
+    # Column arrays are shared by all groups
+    times, isDatetime, timeZone = toTimeArray(data[timeColumn])
+    values = data[valueColumn].to_numpy()
+
+    # Filter the rows of each group
+    mask = np.zeros(len(data), dtype = bool)
+    for key, rows in data.groupby(tagNames).indices.items():
+        tagValues = key if isinstance(key, tuple) else (key,)
+        filter = tree.walk(sorted(zip(tagNames, tagValues)))
+        mask[rows] = filter.filterMask((times[rows], values[rows]))
+
+    return mask
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Parallel.py: Filters a single long series in time chunks across a process\
+ pool and stitches the chunk boundaries."""
+
+# Import built-in modules
+import concurrent.futures
+import math
+import os
+
+# Import third-party modules
+import numpy as np
+
+# Import custom modules
+from .Analysis import toTimes
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def filterChunk(className, args, kwargs, times, values) -> tuple:
+    """ Filters a chunk of a series with a new filter, returning the output\
+        points and the filter. """
+    filter = className(*args, **kwargs)
+    results = list()
+    for time, value in zip(times.tolist(), values.tolist()):
+        results += filter.filterPoint(time, value)
+    return results, filter
+
+def filterParallel(times, values, className, *args, chunks = None, processes = None, tolerance = 1e-9,
+    **kwargs) -> list:
+    """ Filters a series split into time chunks, each filtered by a new\
+        filter in a process pool. At each chunk boundary the filter of the\
+        previous chunk continues into the next chunk until it outputs a\
+        point of the next chunk, within the relative tolerance, after which\
+        both filters hold the same state and the output of the next chunk\
+        is used. The output is that of sequential filtering except for\
+        rounding, while the sequential work is the few points needed for\
+        the filters to agree. Returns the list of output points.
+    """
+    times = toTimes(times)
+    values = np.asarray(values, dtype = np.float64)
+    if(chunks is None):
+        chunks = os.cpu_count() or 1
+
+    # Start index of each chunk
+    bounds = np.unique(np.linspace(0, len(times), chunks + 1).astype(np.int64)).tolist()
+
+    # Filter each chunk
+    with concurrent.futures.ProcessPoolExecutor(max_workers = processes) as executor:
+        chunkResults = list(executor.map(filterChunk,
+            [className]*(len(bounds) - 1), [args]*(len(bounds) - 1), [kwargs]*(len(bounds) - 1),
+            [times[start:end] for start, end in zip(bounds[0:-1], bounds[1:])],
+            [values[start:end] for start, end in zip(bounds[0:-1], bounds[1:])]))
+    if(len(chunkResults) == 0):
+        return list()
+
+    # Stitch each chunk to the output of the previous filter
+    results, filter = chunkResults[0]
+    for (chunkResult, chunkFilter), start, end in zip(chunkResults[1:], bounds[1:-1], bounds[2:]):
+        positions = {time : i for i, (time, value) in enumerate(chunkResult)}
+        synchronised = False
+        for time, value in zip(times[start:end].tolist(), values[start:end].tolist()):
+            for point in filter.filterPoint(time, value):
+                i = positions.get(point[0], 0)
+
+                # Filters agree from a point after the start of the chunk
+                if(i > 0 and math.isclose(point[1], chunkResult[i][1], rel_tol = tolerance)):
+                    results += chunkResult[i:]
+                    filter = chunkFilter
+                    synchronised = True
+                    break
+
+                results += [point]
+
+            if(synchronised):
+                break
+
+    # The flushed point may repeat the last output point
+    for time, value in filter.flush():
+        if(len(results) == 0 or results[-1][0] != time):
+            results += [(time, value)]
+
+    return results
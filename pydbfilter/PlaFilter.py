@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""PlaFilter.py: Optimal piecewise linear approximation filter."""
+
+# Import custom modules
+from .SerialFilter import SerialFilter
+from .FilterPoint import FilterPoint
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def _slope(a, b):
+    """ Returns the gradient of the line between two points. """
+    return (b.value - a.value)/(b.time - a.time)
+
+def _cross(o, a, b):
+    """ Returns the cross product of the vectors o to a and o to b. """
+    return (a.time - o.time)*(b.value - o.value) - (a.value - o.value)*(b.time - o.time)
+
+class PlaFilter(SerialFilter):
+    """ Fits the fewest disjoint line segments which are within the maximum\
+        error of every input point, in linear time, by keeping the convex\
+        hulls of the upper and lower error bounds of the current segment.\
+        Each segment outputs points on the line at its first and last input\
+        times, when the segment is complete.
+    """
+
+    # Points are generated on the fitted lines, and the last segment is\
+    # output when flushed
+    generatesPoints = True
+    holdsPoints = True
+    interpolation = "linear"
+
+    def __init__(self, maximumError, maximumInterval):
+        """ Class constructor. """
+
+        # Parameters
+        self._maximumError = maximumError
+        self._maximumInterval = maximumInterval
+
+        # First and last time of the segment
+        self._firstTime = None
+        self._lastTime = None
+
+        self._reset()
+
+        return
+
+    def _reset(self):
+        """ Starts a new segment. """
+        self._count = 0
+
+        # Points of the bounding lines with the minimum and maximum gradient,\
+        # in the local time frame of the segment
+        self._rectangle = [None, None, None, None]
+
+        # Convex hulls of the upper and lower bounds
+        self._upper = list()
+        self._lower = list()
+        self._upperStart = 0
+        self._lowerStart = 0
+
+        return
+
+    def _addPoint(self, time, value) -> bool:
+        """ Adds a point in the local time frame to the segment, returning\
+            false without changing the segment if no line fits the point. """
+        upperPoint = FilterPoint(time, value + self._maximumError)
+        lowerPoint = FilterPoint(time, value - self._maximumError)
+        rectangle = self._rectangle
+
+        # First two points bound the lines
+        if(self._count < 2):
+            rectangle[2*self._count] = upperPoint if self._count == 0 else lowerPoint
+            rectangle[2*self._count + 1] = lowerPoint if self._count == 0 else upperPoint
+            self._upper += [upperPoint]
+            self._lower += [lowerPoint]
+        else:
+            slopeMin = _slope(rectangle[0], rectangle[2])
+            slopeMax = _slope(rectangle[1], rectangle[3])
+
+            # Point is outside the lines which can still be fitted
+            if(_slope(rectangle[2], upperPoint) < slopeMin
+                or _slope(rectangle[3], lowerPoint) > slopeMax):
+                return False
+
+            # Upper bound lowers the maximum gradient
+            if(_slope(rectangle[1], upperPoint) < slopeMax):
+                i = self._lowerStart
+                while(i + 1 < len(self._lower)
+                    and _slope(self._lower[i + 1], upperPoint) <= _slope(self._lower[i], upperPoint)):
+                    i += 1
+                rectangle[1] = self._lower[i]
+                rectangle[3] = upperPoint
+                self._lowerStart = i
+
+                # Remove upper hull points which are no longer convex
+                end = len(self._upper)
+                while(end >= self._upperStart + 2
+                    and _cross(self._upper[end - 2], self._upper[end - 1], upperPoint) <= 0):
+                    end -= 1
+                del self._upper[end:]
+                self._upper += [upperPoint]
+
+            # Lower bound raises the minimum gradient
+            if(_slope(rectangle[0], lowerPoint) > slopeMin):
+                i = self._upperStart
+                while(i + 1 < len(self._upper) and self._upper[i + 1].time < time
+                    and _slope(self._upper[i + 1], lowerPoint) >= _slope(self._upper[i], lowerPoint)):
+                    i += 1
+                rectangle[0] = self._upper[i]
+                rectangle[2] = lowerPoint
+                self._upperStart = i
+
+                # Remove lower hull points which are no longer convex
+                end = len(self._lower)
+                while(end >= self._lowerStart + 2
+                    and _cross(self._lower[end - 2], self._lower[end - 1], lowerPoint) >= 0):
+                    end -= 1
+                del self._lower[end:]
+                self._lower += [lowerPoint]
+
+        self._count += 1
+
+        return True
+
+    def _segment(self) -> list:
+        """ Returns the points of the line fitted to the segment. """
+        rectangle = self._rectangle
+
+        # A single point is output as received
+        if(self._count == 1):
+            return [(self._firstTime, (rectangle[0].value + rectangle[1].value)/2)]
+
+        # Line with the mean gradient through the intersection of the bounding lines
+        slopeMin = _slope(rectangle[0], rectangle[2])
+        slopeMax = _slope(rectangle[1], rectangle[3])
+        if(slopeMin != slopeMax):
+            time = (rectangle[1].value - rectangle[0].value
+                + slopeMin*rectangle[0].time - slopeMax*rectangle[1].time)/(slopeMin - slopeMax)
+            value = rectangle[0].value + slopeMin*(time - rectangle[0].time)
+        else:
+            time = rectangle[0].time
+            value = (rectangle[0].value + rectangle[1].value + slopeMax*(rectangle[0].time - rectangle[1].time))/2
+        slope = (slopeMin + slopeMax)/2
+
+        lastTime = self._lastTime - self._firstTime
+        return [(self._firstTime, value - slope*time), (self._lastTime, value + slope*(lastTime - time))]
+
+    def filterPoint(self, time, value) -> list:
+        """ Applies compression to the time-series points. """
+        results = list()
+
+        # Handle invalid conditions
+        if(self._lastTime is not None and time <= self._lastTime):
+            raise ValueError("Time-series data-point must be newer than previous points.")
+
+        # Segment is complete at the maximum interval
+        if(self._count > 0 and (time - self._firstTime) > self._maximumInterval):
+            results += self._segment()
+            self._reset()
+
+        # Segment is complete when no line fits the point
+        if(self._count > 0 and not self._addPoint(time - self._firstTime, value)):
+            results += self._segment()
+            self._reset()
+
+        # Start a new segment
+        if(self._count == 0):
+            self._firstTime = time
+            self._addPoint(0, value)
+
+        self._lastTime = time
+
+        return results
+
+    def flush(self) -> list:
+        """ Returns the points of the current segment and starts a new one. """
+        results = []
+
+        if(self._count > 0):
+            results += self._segment()
+            self._reset()
+
+        return results
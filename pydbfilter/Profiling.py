@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""Profiling.py: Hooks which time stages and count calls and points when\
+ enabled, and do nothing otherwise."""
+
+# Import built-in modules
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Import custom modules
+from .BaseFilter import BaseFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Methods of each filter class which are timed while enabled
+instrumentedMethods = ("filterPoint", "filterPoints", "flush", "walk")
+
+# Functions called with the kind, name and value of each event
+_callbacks = list()
+
+# Original methods of filter classes which have been wrapped
+_wrapped = dict()
+
+class _NullStage:
+    """ Context manager which does nothing, used while disabled. """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_nullStage = _NullStage()
+
+class _Stage:
+    """ Context manager which reports the wall time of a stage. """
+
+    def __init__(self, name):
+        """ Class constructor. """
+        self._name = name
+        return
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        _emit("stage", self._name, time.perf_counter() - self._started)
+        return False
+
+class _ThreadProfiler:
+    """ Context manager which profiles the calling thread with cProfile,\
+        adding the profiler to a list when it exits. """
+
+    def __init__(self, profilers):
+        """ Class constructor. """
+        self._profilers = profilers
+        return
+
+    def __enter__(self):
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *args):
+        self._profiler.disable()
+        self._profilers.append(self._profiler)
+        return False
+
+def _emit(kind, name, value):
+    """ Passes an event to each callback. """
+    for callback in _callbacks:
+        callback(kind, name, value)
+    return
+
+def _disabledStage(name):
+    """ Returns a context manager which does nothing. """
+    return _nullStage
+
+def _disabledCount(name, n = 1):
+    """ Does nothing. """
+    return
+
+def _enabledStage(name):
+    """ Returns a context manager which times a stage. """
+    return _Stage(name)
+
+def _enabledCount(name, n = 1):
+    """ Reports a count. """
+    _emit("count", name, n)
+    return
+
+# Hooks called by instrumented code, which are replaced while enabled
+stage = _disabledStage
+count = _disabledCount
+
+def _filterClasses() -> list:
+    """ Returns the loaded filter classes. """
+    classes = list()
+    pending = [BaseFilter]
+    while(len(pending) > 0):
+        className = pending.pop()
+        classes += [className]
+        pending += className.__subclasses__()
+    return classes
+
+def _wrapMethod(className, methodName):
+    """ Replaces a method defined by a class with one which reports its\
+        wall time as a call of the class and method. """
+    original = className.__dict__[methodName]
+    name = className.__name__ + "." + methodName
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            _emit("call", name, time.perf_counter() - started)
+
+    _wrapped[(className, methodName)] = original
+    setattr(className, methodName, wrapper)
+    return
+
+def addCallback(callback):
+    """ Adds a function called with the kind, name and value of each event,\
+        enabling the hooks and the timing of the methods of the loaded\
+        filter classes when the first callback is added. Kinds are "stage"\
+        and "call" with the wall time in seconds, and "count" with a number.
+    """
+    global stage, count
+    _callbacks.append(callback)
+    if(len(_callbacks) == 1):
+        stage = _enabledStage
+        count = _enabledCount
+        for className in _filterClasses():
+            for methodName in instrumentedMethods:
+                if(methodName in className.__dict__ and callable(className.__dict__[methodName])):
+                    _wrapMethod(className, methodName)
+    return
+
+def removeCallback(callback):
+    """ Removes a callback, restoring the hooks and methods to do nothing\
+        extra when the last callback is removed. """
+    global stage, count
+    _callbacks.remove(callback)
+    if(len(_callbacks) == 0):
+        stage = _disabledStage
+        count = _disabledCount
+        for (className, methodName), original in _wrapped.items():
+            setattr(className, methodName, original)
+        _wrapped.clear()
+    return
+
+def peakMemory() -> float:
+    """ Returns the peak resident memory of the process in MB, or None if it\
+        is not available. """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak/(1 << 20) if sys.platform == "darwin" else peak/1024.0
+
+class Profile:
+    """ Collects the events of the hooks while started: the number of calls\
+        and total wall time of each stage and filter method, and the total\
+        of each counter. With a dump prefix, the run is also profiled with\
+        cProfile and tracemalloc, written to prefix.pstats and\
+        prefix.tracemalloc when stopped. cProfile only profiles the thread\
+        which started the profile and threads run within thread().
+    """
+
+    def __init__(self, dumpPrefix = None):
+        """ Class constructor. """
+        self._dumpPrefix = dumpPrefix
+        self._lock = threading.Lock()
+        self._profilers = None
+        self.stages = dict()
+        self.calls = dict()
+        self.counters = dict()
+        self.elapsed = 0.0
+        return
+
+    def __call__(self, kind, name, value):
+        """ Records an event. """
+        with self._lock:
+            if(kind == "count"):
+                self.counters[name] = self.counters.get(name, 0) + value
+            else:
+                totals = self.stages if kind == "stage" else self.calls
+                calls, seconds = totals.get(name, (0, 0.0))
+                totals[name] = (calls + 1, seconds + value)
+        return
+
+    def start(self):
+        """ Starts collecting events. """
+        self._started = time.perf_counter()
+        if(self._dumpPrefix is not None):
+            tracemalloc.start()
+            self._profilers = list()
+            self._profiler = _ThreadProfiler(self._profilers).__enter__()
+        addCallback(self)
+        return
+
+    def thread(self):
+        """ Returns a context manager which profiles the calling thread\
+            with cProfile while the profile is dumped. """
+        if(self._profilers is None):
+            return _nullStage
+        return _ThreadProfiler(self._profilers)
+
+    def stop(self):
+        """ Stops collecting events and writes the dumps. """
+        removeCallback(self)
+        self.elapsed += time.perf_counter() - self._started
+        if(self._profilers is not None):
+            self._profiler.__exit__()
+            stats = pstats.Stats(self._profilers[0])
+            for profiler in self._profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(self._dumpPrefix + ".pstats")
+            tracemalloc.take_snapshot().dump(self._dumpPrefix + ".tracemalloc")
+            tracemalloc.stop()
+            self._profilers = None
+        return
+
+    def report(self) -> str:
+        """ Returns a table of the stages, filter methods and counters, with\
+            counters as a rate over the wall time. Methods called by other\
+            methods are included in the time of both. """
+        peak = peakMemory()
+        lines = ["wall time {0:.3f} s, peak memory {1} MB".format(self.elapsed,
+            "{0:.1f}".format(peak) if peak is not None else "unknown")]
+        with self._lock:
+            for title, totals in (("stage", self.stages), ("method", self.calls)):
+                if(len(totals) > 0):
+                    lines += ["{0:<32}{1:>12}{2:>12}{3:>12}".format(title, "calls", "seconds", "us/call")]
+                for name, (calls, seconds) in sorted(totals.items(), key = lambda item : -item[1][1]):
+                    lines += ["{0:<32}{1:>12}{2:>12.3f}{3:>12.2f}".format(name, calls, seconds, 1e6*seconds/calls)]
+            if(len(self.counters) > 0):
+                lines += ["{0:<32}{1:>12}{2:>12}".format("counter", "total", "per second")]
+            for name, total in sorted(self.counters.items()):
+                lines += ["{0:<32}{1:>12}{2:>12.0f}".format(name, total, total/max(self.elapsed, 1e-9))]
+        return "\n".join(lines)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""RdpFilter.py: Ramer-Douglas-Peucker filter for batch compression."""
+
+# Import custom modules
+from .SerialFilter import SerialFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class RdpFilter(SerialFilter):
+    """ Keeps the input points chosen by the Ramer-Douglas-Peucker algorithm,\
+        so that linear interpolation between kept points is within the\
+        maximum error of every input point. Points are buffered and\
+        simplified in chunks, so output is delayed by up to one chunk.
+    """
+
+    # Kept points are rebuilt by linear interpolation, and the buffer is\
+    # output when flushed
+    holdsPoints = True
+    interpolation = "linear"
+
+    def __init__(self, maximumError, maximumInterval, chunkSize = 65536):
+        """ Class constructor. """
+        if(chunkSize < 3):
+            raise ValueError("Chunk size must be at least three points.")
+
+        # Parameters
+        self._maximumError = maximumError
+        self._maximumInterval = maximumInterval
+        self._chunkSize = chunkSize
+
+        # Buffered points, starting with the last point output
+        self._times = list()
+        self._values = list()
+
+        return
+
+    def _simplify(self, times, values):
+        """ Returns the indices of the kept points. Segments are split at the\
+            point of largest error, or in the middle if longer than the\
+            maximum interval, with every segment of a level split at once.
+        """
+        import numpy as np
+
+        keep = np.zeros(len(times), dtype = bool)
+        keep[[0, -1]] = True
+        starts = np.array([0])
+        ends = np.array([len(times) - 1])
+
+        while(len(starts) > 0):
+
+            # Segments with points between their ends
+            lengths = ends - starts - 1
+            active = lengths > 0
+            starts = starts[active]
+            ends = ends[active]
+            lengths = lengths[active]
+            if(len(starts) == 0):
+                break
+
+            # Index and segment of each point between the ends
+            offsets = np.cumsum(lengths) - lengths
+            segments = np.repeat(np.arange(0, len(starts)), lengths)
+            indices = starts[segments] + 1 + np.arange(0, lengths.sum()) - offsets[segments]
+
+            # Error of each point from the line between the segment ends
+            startTimes = times[starts][segments]
+            span = (times[ends] - times[starts])[segments].astype(np.float64)
+            startValues = values[starts][segments]
+            line = startValues + (values[ends][segments] - startValues)*(
+                (times[indices] - startTimes).astype(np.float64)/span)
+            errors = np.abs(values[indices] - line)
+
+            # Point of largest error in each segment
+            maxErrors = np.maximum.reduceat(errors, offsets)
+            candidates = np.flatnonzero(errors == maxErrors[segments])
+            largest = indices[candidates[np.unique(segments[candidates], return_index = True)[1]]]
+
+            # Split segments which exceed the error or maximum interval
+            exceedsError = maxErrors > self._maximumError
+            exceedsInterval = (times[ends] - times[starts]) > self._maximumInterval
+            splits = np.where(exceedsError, largest, (starts + ends)//2)
+            split = exceedsError | exceedsInterval
+            keep[splits[split]] = True
+            starts, ends = (np.concatenate((starts[split], splits[split])),
+                np.concatenate((splits[split], ends[split])))
+
+        return np.flatnonzero(keep)
+
+    def _process(self, final) -> list:
+        """ Simplifies the buffered points, returning the kept points which\
+            can no longer change. The final kept point is only returned when\
+            flushing or when no other point was kept. """
+        import numpy as np
+
+        times = np.array(self._times)
+        values = np.array(self._values, dtype = np.float64)
+        kept = self._simplify(times, values)
+
+        # Points up to the last fixed kept point are output
+        last = kept[-1] if final or len(kept) == 2 else kept[-2]
+        results = [(self._times[i], self._values[i]) for i in kept[1:].tolist() if i <= last]
+
+        # Buffer starts again from the last point output
+        self._times = self._times[last:]
+        self._values = self._values[last:]
+
+        return results
+
+    def filterPoint(self, time, value) -> list:
+        """ Applies compression to the time-series points. """
+        results = list()
+
+        # First point is always kept
+        if(len(self._times) == 0):
+            results += [(time, value)]
+        # Handle invalid conditions
+        elif(time <= self._times[-1]):
+            raise ValueError("Time-series data-point must be newer than previous points.")
+
+        self._times += [time]
+        self._values += [value]
+
+        # Simplify a full chunk
+        if(len(self._times) >= self._chunkSize):
+            results += self._process(False)
+
+        return results
+
+    def flush(self) -> list:
+        """ Returns the kept points of the buffer, including the last point. """
+        results = []
+
+        if(len(self._times) > 1):
+            results += self._process(True)
+
+        return results
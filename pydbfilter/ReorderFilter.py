@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""ReorderFilter.py: Reorders late and duplicate points in front of a filter.\
+"""
+
+# Import built-in modules
+import heapq
+
+# Import custom modules
+from .SerialFilter import SerialFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class ReorderFilter(SerialFilter):
+    """ Holds points in a bounded heap keyed by time, so that points arriving\
+        late within the reorder window are passed to the filter in time order.\
+        Duplicates are detected among the buffered points and the last point\
+        passed to the filter, as the times of earlier points are not kept, so\
+        a duplicate of an older point is handled as a late point.
+    """
+
+    # Policies for points older than the reorder window
+    latePolicies = ("drop", "raise", "forward")
+
+    def __init__(self, className, *args, reorderWindow = 0, reorderCapacity = 1024, latePolicy = "drop", **kwargs):
+        """ Class constructor. """
+
+        if(latePolicy not in self.latePolicies):
+            raise ValueError("Late policy must be one of {0}.".format(", ".join(self.latePolicies)))
+
+        # Parameters
+        self._component = className(*args, **kwargs)
+        self._reorderWindow = reorderWindow
+        self._reorderCapacity = reorderCapacity
+        self._latePolicy = latePolicy
+
+        # Heap of buffered points and the set of their times
+        self._heap = list()
+        self._times = set()
+
+        # Newest time received and time of last point passed to the filter
+        self._newestTime = None
+        self._releasedTime = None
+
+        # Counters
+        self.received = 0
+        self.duplicates = 0
+        self.late = 0
+        self.maxDepth = 0
+
+        return
+
+    @property
+    def generatesPoints(self) -> bool:
+        """ Pass generatesPoints to component. """
+        return self._component.generatesPoints
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ Pass holdsPoints to component. """
+        return self._component.holdsPoints
+
+    @property
+    def interpolation(self) -> str:
+        """ Pass interpolation to component. """
+        return self._component.interpolation
+
+    def _release(self, releaseAll = False) -> list:
+        """ Passes points which have left the reorder window to the filter. """
+        results = list()
+
+        while(len(self._heap) > 0
+            and (releaseAll
+                or len(self._heap) > self._reorderCapacity
+                or self._heap[0][0] <= self._newestTime - self._reorderWindow)):
+            time, value = heapq.heappop(self._heap)
+            self._times.discard(time)
+            self._releasedTime = time
+            results += self._component.filterPoint(time, value)
+
+        return results
+
+    def filterPoint(self, time, value) -> list:
+        """ Buffers the point and returns filtered points released from the\
+            reorder window. """
+        self.received += 1
+
+        # Duplicate of a buffered point or the last released point
+        if(time in self._times or time == self._releasedTime):
+            self.duplicates += 1
+            return []
+
+        # Point older than the reorder window
+        if(self._releasedTime is not None and time < self._releasedTime):
+            self.late += 1
+            if(self._latePolicy == "raise"):
+                raise ValueError("Time-series data-point must be newer than previous points.")
+            elif(self._latePolicy == "forward"):
+                return [(time, value)]
+            return []
+
+        # Buffer the point
+        heapq.heappush(self._heap, (time, value))
+        self._times.add(time)
+        if(self._newestTime is None or time > self._newestTime):
+            self._newestTime = time
+
+        # Release points which have left the window
+        results = self._release()
+        self.maxDepth = max(self.maxDepth, len(self._heap))
+
+        return results
+
+    def drain(self) -> list:
+        """ Passes all buffered points to the filter. """
+        return self._release(releaseAll = True)
+
+    def flush(self) -> list:
+        """ Passes all buffered points to the filter and flushes it. """
+        return self.drain() + self._component.flush()
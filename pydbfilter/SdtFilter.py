@@ -3,6 +3,7 @@
 
 # Import built-in modules
 from collections import deque
+from numbers import Integral
 
 # Import custom modules
 from .SerialFilter import SerialFilter
@@ -20,6 +21,10 @@ __status__ = "Development"
 
 class SdtFilter(SerialFilter):
 
+    # Points are generated at the intersection of parallelogram edges
+    generatesPoints = True
+    interpolation = "linear"
+
     def __init__(self, compressionDeviation, maxInterval):
         """ Class constructor. """
 
@@ -34,10 +39,39 @@ class SdtFilter(SerialFilter):
         # Queu to hold up to two previous points
         self._lastPoints = deque(maxlen = 2)
 
+        # Time of the first point, slopes are calculated relative to this time
+        self._timeOrigin = None
+
+        return
+
+    @property
+    def threshold(self) -> float:
+        """ Returns the compression deviation. """
+        return self._compressionDeviation
+
+    @threshold.setter
+    def threshold(self, value):
+        """ Sets the compression deviation, which is used from the next\
+            parallelogram. """
+        self._compressionDeviation = value
         return
 
+    def _toLocal(self, point):
+        """ Rebases a point to the local time frame of the filter. """
+        return FilterPoint(point.time - self._timeOrigin, point.value)
+
+    def _toTime(self, localTime):
+        """ Converts a local time of a generated point to the input time frame.\
+            Integer time axes beyond the precision of a float (such as epoch\
+            nanoseconds) produce integer times.
+        """
+        if(isinstance(self._timeOrigin, Integral) and abs(self._timeOrigin) >= 2**53):
+            return self._timeOrigin + int(round(localTime))
+        return self._timeOrigin + localTime
+
     def _updateWindow(self, thisPoint, newPoint):
-        """ Initialises window for a new parallelogram. """
+        """ Initialises window for a new parallelogram. Points are in the\
+            local time frame. """
         
         # Update upper and lower pivot
         self._upperPivot = newPoint + FilterPoint(0, self._compressionDeviation)
@@ -65,8 +99,9 @@ class SdtFilter(SerialFilter):
         # Initialisation
         if(len(self._lastPoints) < 1):
             # Upper and lower pivot points
-            self._upperPivot = thisPoint + FilterPoint(0, self._compressionDeviation)
-            self._lowerPivot = thisPoint + FilterPoint(0, -self._compressionDeviation)
+            self._timeOrigin = time
+            self._upperPivot = self._toLocal(thisPoint) + FilterPoint(0, self._compressionDeviation)
+            self._lowerPivot = self._toLocal(thisPoint) + FilterPoint(0, -self._compressionDeviation)
             
             # First point received is generated by the algorithm
             results += [(thisPoint.time, thisPoint.value)]
@@ -78,14 +113,14 @@ class SdtFilter(SerialFilter):
             # If maximum interval reached
             if((thisPoint.time - self._firstTime) > self._maxInterval):
                 results += [(self._lastPoints[0].time, self._lastPoints[0].value)]
-                # Recalculate the window
-                self._updateWindow(self._lastPoints[0], thisPoint)  
+                # Recalculate the window with pivots at the last point
+                self._updateWindow(self._toLocal(thisPoint), self._toLocal(self._lastPoints[0]))  
                 self._firstTime = self._lastPoints[0].time
             # If maximum interval still exceeded
             if((thisPoint.time - self._firstTime) > self._maxInterval):
                 results += [(thisPoint.time, thisPoint.value)]
                 # Recalculate the window
-                self._updateWindow(self._lastPoints[0], thisPoint)
+                self._updateWindow(self._toLocal(self._lastPoints[0]), self._toLocal(thisPoint))
                 self._firstTime = thisPoint.time  
                 
             # Otherwise evaluate if parallelogram envelope exceeded
@@ -98,12 +133,18 @@ class SdtFilter(SerialFilter):
         return results
 
     def _evaluateParallelogram(self, thisPoint):
+        """ Evaluates a point against the parallelogram envelope. The slopes\
+            are calculated in the local time frame. """
         results = list()
 
+        # Rebase this point and the last point to the local time frame
+        localPoint = self._toLocal(thisPoint)
+        lastPoint = self._toLocal(self._lastPoints[0])
+
         # Update the sloping upper and sloping lower gradients
         # These are the gradients between the current point and upper/lower pivot points respectively
-        slopingUpper = (thisPoint.value - self._upperPivot.value) / (thisPoint.time - self._upperPivot.time)
-        slopingLower = (thisPoint.value - self._lowerPivot.value) / (thisPoint.time - self._lowerPivot.time)
+        slopingUpper = (localPoint.value - self._upperPivot.value) / (localPoint.time - self._upperPivot.time)
+        slopingLower = (localPoint.value - self._lowerPivot.value) / (localPoint.time - self._lowerPivot.time)
 
         # If sloping upper gradient exceeded limit
         slopingUpperMaxUpdated = slopingUpper > self._slopingUpperMax 
@@ -138,10 +179,10 @@ class SdtFilter(SerialFilter):
 
             # L2 will be the line between the last two points
             # Find gradient betwen this point and last point
-            m2 = (thisPoint.value - self._lastPoints[0].value)/(thisPoint.time - self._lastPoints[0].time)
+            m2 = (localPoint.value - lastPoint.value)/(localPoint.time - lastPoint.time)
             # Find intercept from equation of line passing through this point:
             #   b2 = y - m2*x
-            b2 = thisPoint.value - m2 * thisPoint.time                    
+            b2 = localPoint.value - m2 * localPoint.time                    
 
             # Find point of intersection between L1 and L2 
             # which will be the upper boundary for the parallelogram 
@@ -155,11 +196,11 @@ class SdtFilter(SerialFilter):
                                 )
 
             # New point generated by compression algorithm
-            results += [(newPoint.time, newPoint.value)]
+            results += [(self._toTime(newPoint.time), newPoint.value)]
             
             # Recalculate the window
-            self._updateWindow(thisPoint, newPoint)
-            self._firstTime = newPoint.time
+            self._updateWindow(localPoint, newPoint)
+            self._firstTime = self._toTime(newPoint.time)
 
             # Re-evaluate the current point
             results += self._evaluateParallelogram(thisPoint)            
@@ -173,7 +214,7 @@ class SdtFilter(SerialFilter):
         # The first point is always returned, so need at least two last points
         if(len(self._lastPoints) > 1):
             results += [(self._lastPoints[0].time, self._lastPoints[0].value)]
-            self._updateWindow(self._lastPoints[-1], self._lastPoints[0]) 
+            self._updateWindow(self._toLocal(self._lastPoints[-1]), self._toLocal(self._lastPoints[0])) 
         
         return results    
              
@@ -2,14 +2,17 @@
 """SerialFilter.py: Implements filterPoints() as calls to filterPoint()."""
 
 # Import built-in modules
-from typing import Union
-
-# Import third-party modules
-from pandas import DataFrame
+from __future__ import annotations
+from typing import TYPE_CHECKING, Union
 
 # Import custom modules
 from .BaseFilter import BaseFilter
 
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    import numpy as np
+    from pandas import DataFrame, Series
+
 # Authorship information
 __author__ = "James Bott"
 __copyright__ = "Copyright 2024, James Bott"
@@ -22,30 +25,26 @@ __status__ = "Development"
 
 class SerialFilter(BaseFilter):
     """ Define interface common to all concrete filter implementations. """
-    
-    def filterPoints(self, data : Union[DataFrame, list]) -> Union[DataFrame, list]:
+
+    def filterPoints(self, data : Union[DataFrame, Series, list]) -> Union[DataFrame, Series, list]:
         """ Implements filtering buffer as serial calls to filterPoint(). """
-        # If type is data frame
-        if(type(data) is DataFrame):
-            
-            # Must have two columns
-            if(len(data.columns) != 2):
-                raise ValueError("Input data frame must have two columns.")
-            
-            # Apply over each row
-            times = list()
-            values = list()
-            for row in data.iterrows():
-                for result in self.filterPoint(row[1][0], row[1][1]):
-                    times += [result[0]]
-                    values += [result[1]]
-            results = DataFrame({data.columns[0] : times, data.columns[1] : values})
         # If type is list
         if(type(data) is list):
-            
+
             # For each point
             results = list()
             for time, value in data:
                 results += self.filterPoint(time, value)
+        # Otherwise data frame or series
+        else:
+            from . import PandasSupport
+            results = PandasSupport.filterData(self, data)
+
+        return results
 
-        return results
\ No newline at end of file
+    def filterMask(self, data : Union[DataFrame, Series, tuple]) -> np.ndarray:
+        """ Returns a boolean array which is true for each input row kept by\
+            the filter, instead of copying the output points. The data may\
+            also be a tuple of time and value arrays. """
+        from . import PandasSupport
+        return PandasSupport.filterMask(self, data)
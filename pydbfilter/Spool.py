@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""Spool.py: Durable append-only log of records in memory-mapped segment\
+ files."""
+
+# Import built-in modules
+import collections
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Length and CRC-32 of each record, where a zero length ends a segment
+_header = struct.Struct("<II")
+
+# Segment and offset of the first unacknowledged record
+_cursor = struct.Struct("<QQ")
+
+class Spool:
+    """ Holds records on disk until they are acknowledged, so that records\
+        accepted by append() are replayed after a crash. Records are written\
+        to preallocated segment files through a memory map, and segments\
+        are deleted once all of their records are acknowledged. Records are\
+        returned by next() in the order they were appended, and may be\
+        acknowledged in any order.
+    """
+
+    def __init__(self, directory, segmentSize = 1 << 24, maxSize = 1 << 30, sync = False):
+        """ Class constructor. Appends fail while the segment files would\
+            exceed the maximum size, and with sync each record is flushed\
+            to disk before append() returns. """
+        if(segmentSize <= _header.size):
+            raise ValueError("Segment size must be larger than the record header.")
+
+        # Parameters
+        self._directory = directory
+        self._segmentSize = segmentSize
+        self._maxSize = maxSize
+        self._sync = sync
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+
+        # Memory map and size of each segment
+        self._maps = dict()
+        self._sizes = dict()
+
+        # Positions returned by next() and whether each is acknowledged, in order
+        self._inFlight = collections.OrderedDict()
+
+        os.makedirs(directory, mode = 0o700, exist_ok = True)
+        self._recover()
+
+        return
+
+    def _path(self, segment) -> str:
+        """ Returns the path of a segment file. """
+        return os.path.join(self._directory, "{0:020d}.log".format(segment))
+
+    def _open(self, segment, size = None):
+        """ Maps a segment, creating it with the size if given. """
+        with open(self._path(segment), "r+b" if size is None else "w+b") as file:
+            if(size is not None):
+                file.truncate(size)
+            self._maps[segment] = mmap.mmap(file.fileno(), 0)
+        self._sizes[segment] = len(self._maps[segment])
+        return
+
+    def _readRecord(self, segment, offset):
+        """ Returns the payload and offset of the next record of a segment,\
+            or None at the end of the segment or a torn record. """
+        segmentMap = self._maps[segment]
+        if(offset + _header.size > len(segmentMap)):
+            return None
+        length, crc = _header.unpack_from(segmentMap, offset)
+        end = offset + _header.size + length
+        if(length == 0 or end > len(segmentMap)):
+            return None
+        payload = segmentMap[offset + _header.size:end]
+        if(zlib.crc32(payload) != crc):
+            return None
+        return payload, end
+
+    def _nextSegment(self, position):
+        """ Returns the start of the next segment if the position is at the\
+            end of a segment before the segment being written. """
+        segment, offset = position
+        while(segment < self._writeSegment and self._readRecord(segment, offset) is None):
+            segment, offset = min([s for s in self._maps.keys() if s > segment]), 0
+        return (segment, offset)
+
+    def _recover(self):
+        """ Maps the existing segments, finds the end of the last segment\
+            and reads the cursor of acknowledged records. """
+        segments = sorted([int(name[0:-4]) for name in os.listdir(self._directory)
+            if name.endswith(".log") and name[0:-4].isdigit()])
+        for segment in segments:
+            self._open(segment)
+
+        # Acknowledged position, from the first segment if not recorded
+        try:
+            with open(os.path.join(self._directory, "cursor"), "rb") as file:
+                self._committed = _cursor.unpack(file.read(_cursor.size))
+        except (OSError, struct.error):
+            self._committed = (segments[0] if len(segments) > 0 else 0, 0)
+
+        # Segments before the cursor were acknowledged before a crash
+        for segment in segments:
+            if(segment < self._committed[0]):
+                self._delete(segment)
+        segments = sorted(self._maps.keys())
+
+        # Start a new segment, or continue after the last complete record
+        if(len(segments) == 0):
+            self._writeSegment = self._committed[0]
+            self._open(self._writeSegment, self._segmentSize)
+            self._writeOffset = 0
+        else:
+            self._writeSegment = segments[-1]
+            self._writeOffset = self._committed[1] if self._committed[0] == self._writeSegment else 0
+            record = self._readRecord(self._writeSegment, self._writeOffset)
+            while(record is not None):
+                self._writeOffset = record[1]
+                record = self._readRecord(self._writeSegment, self._writeOffset)
+
+            # Clear a torn record so that it is never read
+            segmentMap = self._maps[self._writeSegment]
+            end = min(self._writeOffset + _header.size, len(segmentMap))
+            segmentMap[self._writeOffset:end] = bytes(end - self._writeOffset)
+
+        self._readPosition = self._committed
+
+        return
+
+    def _delete(self, segment):
+        """ Unmaps and deletes a segment. """
+        self._maps.pop(segment).close()
+        del self._sizes[segment]
+        os.remove(self._path(segment))
+        return
+
+    @property
+    def size(self) -> int:
+        """ Returns the total size of the segment files. """
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def append(self, payload : bytes) -> bool:
+        """ Appends a record, returning false if the spool is full. """
+        length = _header.size + len(payload)
+
+        with self._lock:
+            if(self._closed):
+                raise ValueError("Spool is closed.")
+
+            # Start a new segment when the record does not fit
+            if(self._writeOffset + length > self._sizes[self._writeSegment]):
+                size = max(self._segmentSize, length + _header.size)
+                if(sum(self._sizes.values()) + size > self._maxSize):
+                    return False
+                self._writeSegment += 1
+                self._writeOffset = 0
+                self._open(self._writeSegment, size)
+
+            # Payload is written before the header, so a record is complete once it has a length
+            segmentMap = self._maps[self._writeSegment]
+            offset = self._writeOffset
+            segmentMap[offset + _header.size:offset + length] = payload
+            _header.pack_into(segmentMap, offset, len(payload), zlib.crc32(payload))
+            if(self._sync):
+                start = offset - offset % mmap.PAGESIZE
+                segmentMap.flush(start, offset + length - start)
+            self._writeOffset += length
+
+            self._available.notify()
+
+        return True
+
+    def next(self, timeout = None):
+        """ Returns the position and payload of the next record which has not\
+            been returned, waiting up to the timeout for a record to be\
+            appended. Returns None on timeout or when the spool is closed. """
+        with self._lock:
+            while(True):
+                if(self._closed):
+                    return None
+
+                segment, offset = self._readPosition
+                record = self._readRecord(segment, offset) if segment in self._maps else None
+                if(record is not None):
+                    payload, end = record
+                    self._readPosition = (segment, end)
+                    self._inFlight[(segment, offset)] = False
+                    return (segment, offset), payload
+
+                # Move to the next segment at the end of a segment
+                if(segment < self._writeSegment):
+                    self._readPosition = self._nextSegment(self._readPosition)
+                elif(not self._available.wait(timeout)):
+                    return None
+
+    def acknowledge(self, position):
+        """ Marks a record as written, deleting segments and recording the\
+            cursor once all earlier records are acknowledged. """
+        with self._lock:
+            self._inFlight[position] = True
+
+            # Advance past the acknowledged records at the front
+            committed = self._committed
+            while(len(self._inFlight) > 0 and next(iter(self._inFlight.values()))):
+                self._inFlight.popitem(last = False)
+            if(len(self._inFlight) > 0):
+                committed = next(iter(self._inFlight.keys()))
+            else:
+                committed = self._nextSegment(self._readPosition)
+            if(committed == self._committed):
+                return
+
+            # Record the cursor, then delete acknowledged segments
+            self._committed = committed
+            path = os.path.join(self._directory, "cursor")
+            with open(path + ".tmp", "wb") as file:
+                file.write(_cursor.pack(*committed))
+                if(self._sync):
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(path + ".tmp", path)
+            for segment in list(self._maps.keys()):
+                if(segment < committed[0]):
+                    self._delete(segment)
+
+        return
+
+    def close(self):
+        """ Wakes waiting readers and unmaps the segments. Records which\
+            were not acknowledged are returned again when reopened. """
+        with self._lock:
+            self._closed = True
+            self._available.notify_all()
+            for segmentMap in self._maps.values():
+                segmentMap.flush()
+                segmentMap.close()
+            self._maps.clear()
+        return
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""TickFilter.py: Filters one point for each of many series at once using\
+ state held as arrays."""
+
+# Import built-in modules
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Import third-party modules
+import numpy as np
+
+# Import custom modules
+from .DeadbandFilter import DeadbandFilter
+from .FilterPoint import FilterPoint
+from .HysteresisFilter import HysteresisFilter
+from .SdtFilter import SdtFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class TickKernel(ABC):
+    """ State of a filter class for many series held as arrays. The fast path\
+        evaluates points which produce no output for all series at once,\
+        other points are evaluated by loading the state into a filter object.
+    """
+
+    # Names of the state arrays and whether they hold input times
+    fields = dict()
+
+    def __init__(self, className, args, kwargs, timeType, capacity):
+        """ Class constructor. """
+        self._className = className
+        self._args = args
+        self._kwargs = kwargs
+        self._timeType = timeType
+        self._capacity = 0
+        self.resize(capacity)
+        return
+
+    def resize(self, capacity):
+        """ Grows the state arrays to hold at least capacity series. """
+        if(capacity <= self._capacity):
+            return
+        capacity = max(capacity, 2*self._capacity)
+        for name, isTime in self.fields.items():
+            array = np.zeros(capacity, dtype = self._timeType if isTime else np.float64)
+            if(self._capacity > 0):
+                array[0:self._capacity] = getattr(self, name)
+            setattr(self, name, array)
+        active = np.zeros(capacity, dtype = bool)
+        if(self._capacity > 0):
+            active[0:self._capacity] = self.active
+        self.active = active
+        self._capacity = capacity
+        return
+
+    def create(self):
+        """ Returns a new filter object. """
+        return self._className(*self._args, **self._kwargs)
+
+    @abstractmethod
+    def fast(self, rows, times, values) -> np.ndarray:
+        """ Updates the state of rows for which the point produces no output,\
+            returning true for those rows. """
+        pass
+
+    @abstractmethod
+    def load(self, row):
+        """ Returns a filter object holding the state of a row. """
+        pass
+
+    @abstractmethod
+    def store(self, row, filter):
+        """ Saves the state of a filter object to a row. """
+        pass
+
+class DeadbandKernel(TickKernel):
+    """ Array state of DeadbandFilter. """
+
+    fields = {"baseTime" : True, "baseValue" : False, "lastTime" : True, "lastValue" : False}
+
+    def fast(self, rows, times, values) -> np.ndarray:
+        """ Points within the deadband and maximum interval produce no output. """
+        filter = self.create()
+        baseValue = self.baseValue[rows]
+        result = (self.active[rows]
+            & (times > self.lastTime[rows])
+            & ((times - self.baseTime[rows]) <= filter._maximumInterval)
+            & (values <= baseValue + filter._deadbandValue)
+            & (values >= baseValue - filter._deadbandValue))
+        self.lastTime[rows[result]] = times[result]
+        self.lastValue[rows[result]] = values[result]
+        return result
+
+    def load(self, row):
+        """ Returns a filter object holding the state of a row. """
+        filter = self.create()
+        if(self.active[row]):
+            filter._base = FilterPoint(self.baseTime[row].item(), self.baseValue[row].item())
+            filter._lastPoint = FilterPoint(self.lastTime[row].item(), self.lastValue[row].item())
+        return filter
+
+    def store(self, row, filter):
+        """ Saves the state of a filter object to a row. """
+        self.active[row] = filter._base is not None
+        if(self.active[row]):
+            self.baseTime[row], self.baseValue[row] = filter._base
+            self.lastTime[row], self.lastValue[row] = filter._lastPoint
+        return
+
+class HysteresisKernel(TickKernel):
+    """ Array state of HysteresisFilter. """
+
+    fields = {"minValue" : False, "maxValue" : False, "firstTime" : True, "lastTime" : True, "lastValue" : False}
+
+    def fast(self, rows, times, values) -> np.ndarray:
+        """ Points within the hysteresis and maximum interval produce no output. """
+        filter = self.create()
+        minValue = np.minimum(self.minValue[rows], values)
+        maxValue = np.maximum(self.maxValue[rows], values)
+        result = (self.active[rows]
+            & (times > self.lastTime[rows])
+            & ((times - self.firstTime[rows]) <= filter._maxInterval)
+            & ((maxValue - minValue) <= filter._hystValue))
+        updated = rows[result]
+        self.minValue[updated] = minValue[result]
+        self.maxValue[updated] = maxValue[result]
+        self.lastTime[updated] = times[result]
+        self.lastValue[updated] = values[result]
+        return result
+
+    def load(self, row):
+        """ Returns a filter object holding the state of a row. """
+        filter = self.create()
+        if(self.active[row]):
+            filter._minValue = self.minValue[row].item()
+            filter._maxValue = self.maxValue[row].item()
+            filter._firstTime = self.firstTime[row].item()
+            filter._lastPoint = FilterPoint(self.lastTime[row].item(), self.lastValue[row].item())
+        return filter
+
+    def store(self, row, filter):
+        """ Saves the state of a filter object to a row. """
+        self.active[row] = filter._minValue is not None
+        if(self.active[row]):
+            self.minValue[row] = filter._minValue
+            self.maxValue[row] = filter._maxValue
+            self.firstTime[row] = filter._firstTime
+            self.lastTime[row], self.lastValue[row] = filter._lastPoint
+        return
+
+class SdtKernel(TickKernel):
+    """ Array state of SdtFilter. Pivots and the first time are held in the\
+        local time frame of each series. """
+
+    fields = {"timeOrigin" : True, "upperTime" : False, "upperValue" : False, "lowerTime" : False,
+        "lowerValue" : False, "slopingUpperMax" : False, "slopingLowerMin" : False, "firstTime" : False,
+        "count" : False, "lastTime0" : True, "lastValue0" : False, "lastTime1" : True, "lastValue1" : False}
+
+    def fast(self, rows, times, values) -> np.ndarray:
+        """ Points within the parallelogram envelope and maximum interval\
+            produce no output. """
+        filter = self.create()
+        localTimes = (times - self.timeOrigin[rows]).astype(np.float64)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            slopingUpperMax = np.maximum(self.slopingUpperMax[rows],
+                (values - self.upperValue[rows])/(localTimes - self.upperTime[rows]))
+            slopingLowerMin = np.minimum(self.slopingLowerMin[rows],
+                (values - self.lowerValue[rows])/(localTimes - self.lowerTime[rows]))
+        result = (self.active[rows]
+            & (times > self.lastTime0[rows])
+            & ((localTimes - self.firstTime[rows]) <= filter._maxInterval)
+            & (slopingUpperMax <= slopingLowerMin))
+        updated = rows[result]
+        self.slopingUpperMax[updated] = slopingUpperMax[result]
+        self.slopingLowerMin[updated] = slopingLowerMin[result]
+        self.lastTime1[updated] = self.lastTime0[updated]
+        self.lastValue1[updated] = self.lastValue0[updated]
+        self.lastTime0[updated] = times[result]
+        self.lastValue0[updated] = values[result]
+        self.count[updated] = 2
+        return result
+
+    def load(self, row):
+        """ Returns a filter object holding the state of a row. """
+        filter = self.create()
+        if(self.active[row]):
+            filter._timeOrigin = self.timeOrigin[row].item()
+            filter._upperPivot = FilterPoint(self.upperTime[row].item(), self.upperValue[row].item())
+            filter._lowerPivot = FilterPoint(self.lowerTime[row].item(), self.lowerValue[row].item())
+            filter._slopingUpperMax = self.slopingUpperMax[row].item()
+            filter._slopingLowerMin = self.slopingLowerMin[row].item()
+            filter._firstTime = filter._toTime(self.firstTime[row].item())
+            lastPoints = [FilterPoint(self.lastTime0[row].item(), self.lastValue0[row].item()),
+                FilterPoint(self.lastTime1[row].item(), self.lastValue1[row].item())]
+            filter._lastPoints = deque(lastPoints[0:int(self.count[row])], maxlen = 2)
+        return filter
+
+    def store(self, row, filter):
+        """ Saves the state of a filter object to a row. """
+        self.active[row] = len(filter._lastPoints) > 0
+        if(self.active[row]):
+            self.timeOrigin[row] = filter._timeOrigin
+            self.upperTime[row], self.upperValue[row] = filter._upperPivot
+            self.lowerTime[row], self.lowerValue[row] = filter._lowerPivot
+            self.slopingUpperMax[row] = filter._slopingUpperMax
+            self.slopingLowerMin[row] = filter._slopingLowerMin
+            self.firstTime[row] = filter._firstTime - filter._timeOrigin
+            self.count[row] = len(filter._lastPoints)
+            self.lastTime0[row], self.lastValue0[row] = filter._lastPoints[0]
+            self.lastTime1[row], self.lastValue1[row] = filter._lastPoints[-1]
+        return
+
+class TickFilter():
+    """ Filters a tick of (series, time, value) points, holding one point for\
+        each of many series, with masked array operations across series.
+    """
+
+    # Kernels implementing each filter class
+    kernels = {
+        DeadbandFilter : DeadbandKernel,
+        HysteresisFilter : HysteresisKernel,
+        SdtFilter : SdtKernel
+        }
+
+    def __init__(self, className, *args, capacity = 1024, **kwargs):
+        """ Class constructor. """
+        if(className not in self.kernels.keys()):
+            raise ValueError("TickFilter does not support {0}.".format(className.__name__))
+        self._className = className
+        self._args = args
+        self._kwargs = kwargs
+        self._capacity = capacity
+        self._kernel = None
+        self._isDatetime = False
+        self._seriesIds = dict()
+        return
+
+    def seriesIds(self, keys) -> np.ndarray:
+        """ Returns the series number of each key, such as a tuple of tags,\
+            assigning numbers to new keys. """
+        ids = self._seriesIds
+        return np.array([ids.setdefault(key, len(ids)) for key in keys], dtype = np.int64)
+
+    def _prepare(self, series, times, values) -> tuple:
+        """ Converts the tick to arrays and creates the kernel state. """
+        series = np.asarray(series, dtype = np.int64)
+        times = np.asarray(times)
+        values = np.asarray(values, dtype = np.float64)
+
+        # Datetimes are filtered as int64 nanoseconds
+        if(times.dtype.kind == "M"):
+            times = times.astype("datetime64[ns]", copy = False).view(np.int64)
+            self._isDatetime = True
+        elif(times.dtype.kind in "iu"):
+            times = times.astype(np.int64, copy = False)
+        else:
+            times = times.astype(np.float64, copy = False)
+
+        # Create the kernel on the first tick, with the time type of the tick
+        if(self._kernel is None):
+            self._kernel = self.kernels[self._className](self._className, self._args, self._kwargs,
+                times.dtype, self._capacity)
+        if(len(series) > 0):
+            self._kernel.resize(int(series.max()) + 1)
+
+        return series, times, values
+
+    def _results(self, series, times, values) -> tuple:
+        """ Converts output points to arrays. """
+        series = np.array(series, dtype = np.int64)
+        values = np.array(values, dtype = np.float64)
+        if(self._isDatetime):
+            times = np.array([round(time) for time in times], dtype = np.int64).view("datetime64[ns]")
+        else:
+            times = np.array(times)
+        return series, times, values
+
+    def filterTick(self, series, times, values) -> tuple:
+        """ Applies compression to one point of each series. Returns arrays of\
+            the series, times and values of the output points, in order of\
+            time for each series.
+        """
+        series, times, values = self._prepare(series, times, values)
+        kernel = self._kernel
+
+        # The first point of each series is evaluated by the fast path
+        rows = np.arange(0, len(series))
+        first = np.unique(series, return_index = True)[1]
+        if(len(first) < len(series)):
+            repeated = np.setdiff1d(rows, first)
+            rows = np.sort(first)
+        else:
+            repeated = rows[0:0]
+        fast = kernel.fast(series[rows], times[rows], values[rows])
+
+        # Remaining points are evaluated by filter objects
+        outSeries = list()
+        outTimes = list()
+        outValues = list()
+        for row in np.concatenate((rows[~fast], repeated)).tolist():
+            seriesId = int(series[row])
+            filter = kernel.load(seriesId)
+            for time, value in filter.filterPoint(times[row].item(), values[row].item()):
+                outSeries += [seriesId]
+                outTimes += [time]
+                outValues += [value]
+            kernel.store(seriesId, filter)
+
+        return self._results(outSeries, outTimes, outValues)
+
+    def getFilter(self, seriesId):
+        """ Returns a filter object holding the state of a series. """
+        return self._kernel.load(seriesId)
+
+    def flush(self, series = None) -> tuple:
+        """ Returns the last point of each series, or of the series given. """
+        outSeries = list()
+        outTimes = list()
+        outValues = list()
+
+        if(self._kernel is not None):
+            if(series is None):
+                series = np.flatnonzero(self._kernel.active)
+            for seriesId in np.asarray(series, dtype = np.int64).tolist():
+                filter = self._kernel.load(seriesId)
+                for time, value in filter.flush():
+                    outSeries += [seriesId]
+                    outTimes += [time]
+                    outValues += [value]
+                self._kernel.store(seriesId, filter)
+
+        return self._results(outSeries, outTimes, outValues)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""TierFilter.py: Filters one series with several filter configurations.\
+"""
+
+# Import built-in modules
+from __future__ import annotations
+from typing import TYPE_CHECKING, Union
+
+# Import custom modules
+from .BaseFilter import BaseFilter
+
+# Third-party modules are only imported for type checking
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class TierFilter(BaseFilter):
+    """ Holds a filter for each tier of a multi-resolution output, such as a\
+        tight deviation for short-term storage and a loose deviation for\
+        long-term storage. Each point is passed to every tier, and results\
+        are returned as a list with the output of each tier.
+    """
+
+    def __init__(self, *tiers, **kwargs):
+        """ Class constructor. Each tier is a tuple of the filter class and\
+            its arguments, and keyword arguments are passed to every tier. """
+        if(len(tiers) == 0):
+            raise ValueError("At least one tier must be specified.")
+        self._tiers = [className(*args, **kwargs) for className, *args in tiers]
+        return
+
+    def __len__(self) -> int:
+        """ Returns the number of tiers. """
+        return len(self._tiers)
+
+    @property
+    def tiers(self) -> list:
+        """ Returns the filter of each tier. """
+        return self._tiers
+
+    @property
+    def generatesPoints(self) -> bool:
+        """ True if the filter of any tier generates points. """
+        return any([tier.generatesPoints for tier in self._tiers])
+
+    @property
+    def holdsPoints(self) -> bool:
+        """ True if the filter of any tier holds points until flushed. """
+        return any([tier.holdsPoints for tier in self._tiers])
+
+    @property
+    def interpolation(self) -> str:
+        """ Linear if the output of any tier is rebuilt by linear interpolation. """
+        return "linear" if "linear" in [tier.interpolation for tier in self._tiers] else "step"
+
+    def filterPoint(self, time, value) -> list:
+        """ Applies compression to the point for each tier. """
+        return [tier.filterPoint(time, value) for tier in self._tiers]
+
+    def filterPoints(self, data : Union[DataFrame, Series, list]) -> list:
+        """ Applies compression to a batch of points for each tier. """
+        return [tier.filterPoints(data) for tier in self._tiers]
+
+    def filterMask(self, data : Union[DataFrame, Series, tuple]) -> list:
+        """ Returns the mask of kept rows for each tier. """
+        return [tier.filterMask(data) for tier in self._tiers]
+
+    def flush(self) -> list:
+        """ Returns the last point of each tier. """
+        return [tier.flush() for tier in self._tiers]
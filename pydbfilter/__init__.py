@@ -2,4 +2,19 @@ from .BaseFilter import BaseFilter as BaseFilter
 from .SdtFilter import SdtFilter as SdtFilter
 from .DeadbandFilter import DeadbandFilter as DeadbandFilter
 from .HysteresisFilter import HysteresisFilter as HysteresisFilter
-from .FilterTree import FilterTree as FilterTree
\ No newline at end of file
+from .FilterTree import FilterTree as FilterTree
+from .ReorderFilter import ReorderFilter as ReorderFilter
+from .TierFilter import TierFilter as TierFilter
+from .RdpFilter import RdpFilter as RdpFilter
+from .PlaFilter import PlaFilter as PlaFilter
+from .CompositeFilter import CompositeFilter as CompositeFilter
+from .AdaptiveFilter import AdaptiveFilter as AdaptiveFilter
+from .BoundedFilterTree import BoundedFilterTree as BoundedFilterTree
+
+def __getattr__(name):
+    """ Imports classes which depend on NumPy when first used. """
+    if(name == "TickFilter"):
+        from .TickFilter import TickFilter
+        globals()["TickFilter"] = TickFilter
+        return TickFilter
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+"""recompressBucket.py: Filters the history of an influx DB v2 bucket into\
+ another bucket, querying, filtering and writing time ranges concurrently."""
+
+# Import built-in modules
+import argparse
+import codecs
+import concurrent.futures
+import csv
+import http.client
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse as urlparse
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
+
+# Import custom modules
+from pydbfilter import SdtFilter, DeadbandFilter, HysteresisFilter, RdpFilter, PlaFilter
+from pydbfilter.Decimation import parseTimes, formatTime
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Filter class of each compression algorithm
+filterClasses = {
+    "sdt" : SdtFilter,
+    "deadband" : DeadbandFilter,
+    "hysteresis" : HysteresisFilter,
+    "rdp" : RdpFilter,
+    "pla" : PlaFilter
+    }
+
+# Columns of a query response which are not tags of the series
+reservedColumns = ("", "result", "table", "_start", "_stop", "_time", "_value", "_field", "_measurement")
+
+# Value types of the query response which are filtered
+numericTypes = ("double", "long", "unsignedLong")
+
+def splitRanges(start, stop, rangeSize) -> list:
+    """ Returns the start and stop of each range of a time span in\
+        nanoseconds. """
+    return [(rangeStart, min(rangeStart + rangeSize, stop)) for rangeStart in range(start, stop, rangeSize)]
+
+def fluxQuery(bucket, start, stop, fields) -> str:
+    """ Returns a Flux query of the measurements and fields of a range. """
+    predicates = " or ".join(['(r._measurement == {0} and r._field == {1})'.format(json.dumps(measurement),
+        json.dumps(field)) for measurement, field in fields])
+    return 'from(bucket: {0})\n  |> range(start: {1}, stop: {2})\n  |> filter(fn: (r) => {3})'.format(
+        json.dumps(bucket), formatTime(start), formatTime(stop), predicates)
+
+def escape(text, characters) -> str:
+    """ Escapes characters of a name or tag in line protocol. """
+    for character in "\\" + characters:
+        text = text.replace(character, "\\" + character)
+    return text
+
+def seriesKey(row) -> str:
+    """ Returns the measurement and tag set of a series in line protocol. """
+    tags = sorted([(column, value) for column, value in row.items() if column not in reservedColumns and value != ""])
+    return escape(row["_measurement"], ", ") + "".join([",{0}={1}".format(escape(tag, ",= "), escape(value, ",= "))
+        for tag, value in tags])
+
+def queryTables(url, token, org, flux, blockSize = 10000):
+    """ Generator which streams an annotated CSV query response, yielding the\
+        table number, the columns of its first row and arrays of the times\
+        and values of up to the block size of its rows. Tables without\
+        numeric values are skipped. """
+    url = urlparse.urlparse(url)
+    connection = (http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection)(
+        url.hostname, url.port)
+    try:
+        connection.request("POST", "/api/v2/query?" + urlparse.urlencode({"org" : org}),
+            json.dumps({"query" : flux, "type" : "flux", "dialect" : {"annotations" : ["datatype", "group", "default"]}}),
+            {"Authorization" : "Token " + token, "Content-Type" : "application/json", "Accept" : "application/csv"})
+        response = connection.getresponse()
+        if(response.status != 200):
+            raise ValueError("Query failed with status {0}: {1}".format(response.status,
+                response.read().decode("UTF-8", "replace")))
+
+        # Rows are read as they arrive
+        reader = csv.reader(codecs.iterdecode(response, "UTF-8"))
+        datatypes = None
+        columns = None
+        table = None
+        row = None
+        times = list()
+        values = list()
+        for cells in reader:
+            # Annotations and blank lines start a new table header
+            if(len(cells) == 0 or (len(cells[0]) > 0 and cells[0].startswith("#"))):
+                if(len(cells) > 0 and cells[0] == "#datatype"):
+                    datatypes = cells
+                columns = None
+                continue
+            if(columns is None):
+                columns = {name : index for index, name in enumerate(cells)}
+                if("error" in columns.keys()):
+                    raise ValueError("Query failed: {0}".format(next(reader, [""])[columns["error"]]))
+                numeric = datatypes is None or datatypes[columns["_value"]] in numericTypes
+                continue
+            if(not numeric):
+                continue
+
+            # Times and values of each table are yielded in blocks
+            if(cells[columns["table"]] != table or len(times) >= blockSize):
+                if(len(times) > 0):
+                    yield table, row, parseTimes(pd.Series(times)), np.array(values, dtype = np.float64)
+                if(cells[columns["table"]] != table):
+                    table = cells[columns["table"]]
+                    row = {name : cells[index] for name, index in columns.items()}
+                times = list()
+                values = list()
+            times += [cells[columns["_time"]]]
+            values += [cells[columns["_value"]]]
+        if(len(times) > 0):
+            yield table, row, parseTimes(pd.Series(times)), np.array(values, dtype = np.float64)
+    finally:
+        connection.close()
+
+    return
+
+class Checkpoint():
+    """ File of the ranges which have been written, as a line of JSON for\
+        each range. """
+
+    def __init__(self, filename):
+        """ Class constructor. """
+        self._filename = filename
+        self._lock = threading.Lock()
+        self.completed = set()
+        if(filename is not None and os.path.exists(filename)):
+            with open(filename, "r") as file:
+                for line in file:
+                    if(len(line.strip()) > 0):
+                        record = json.loads(line)
+                        self.completed.add((record["start"], record["stop"]))
+        return
+
+    def add(self, start, stop, pointsIn, pointsOut):
+        """ Records a range which has been written. """
+        with self._lock:
+            self.completed.add((start, stop))
+            if(self._filename is not None):
+                with open(self._filename, "a") as file:
+                    file.write(json.dumps({"start" : start, "stop" : stop, "points_in" : pointsIn,
+                        "points_out" : pointsOut}) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+        return
+
+class Recompressor():
+    """ Filters each range of a source bucket into a target bucket. Range\
+        workers query a range and filter each series as its rows arrive,\
+        passing batches of line protocol through a bounded queue to writer\
+        threads, so that querying, filtering and writing overlap. Each range\
+        is filtered with new filters which are flushed at its end, and the\
+        range is recorded in the checkpoint once all of its batches have\
+        been written.
+    """
+
+    # Statuses of writes which fail rather than being retried
+    rejectedStatuses = (400, 401, 403, 404, 413, 422)
+
+    def __init__(self, url, token, org, source, target, fields, className, targetUrl = None, workers = 4,
+        writers = 2, batchSize = 5000, queueSize = 16, retries = 5, checkpoint = None):
+        """ Class constructor. The fields are a dictionary of the threshold\
+            and maximum interval of each measurement and field. """
+        self._url = url
+        self._targetUrl = targetUrl if targetUrl is not None else url
+        self._token = token
+        self._org = org
+        self._source = source
+        self._target = target
+        self._fields = fields
+        self._className = className
+        self._workers = workers
+        self._writers = writers
+        self._batchSize = batchSize
+        self._retries = retries
+        self._checkpoint = Checkpoint(checkpoint)
+
+        # Batches waiting to be written, and the number of batches and points of each range
+        self._queue = queue.Queue(maxsize = queueSize)
+        self._lock = threading.Lock()
+        self._pending = dict()
+        self._failed = set()
+        self.pointsIn = 0
+        self.pointsOut = 0
+        return
+
+    def _put(self, index, lines):
+        """ Queues a batch of lines of a range, waiting while the queue is full. """
+        with self._lock:
+            self._pending[index][0] += 1
+        self._queue.put((index, lines))
+        return
+
+    def _finished(self, index, written):
+        """ Counts a batch of a range as finished, or the range as queued if\
+            the batch is None, checkpointing the range when it is complete. """
+        with self._lock:
+            state = self._pending[index]
+            if(written is None):
+                state[2] = True
+            else:
+                state[0] -= 1
+                if(not written):
+                    self._failed.add(index)
+            complete = state[2] and state[0] == 0 and index not in self._failed
+            if(state[2] and state[0] == 0):
+                del self._pending[index]
+        if(complete):
+            start, stop, pointsIn, pointsOut = state[1]
+            self._checkpoint.add(start, stop, pointsIn, pointsOut)
+            print("Range {0} to {1}: {2} points in, {3} points out".format(formatTime(start), formatTime(stop),
+                pointsIn, pointsOut))
+        return
+
+    def _filterRange(self, index, start, stop):
+        """ Queries and filters a range, queueing its output in batches. """
+        pointsIn = 0
+        pointsOut = 0
+        lines = list()
+        try:
+            filter = None
+            currentTable = None
+            prefix = None
+            for table, row, times, values in queryTables(self._url, self._token, self._org,
+                fluxQuery(self._source, start, stop, self._fields.keys())):
+                # Each table is a series, filtered by a new filter
+                if(filter is None or table != currentTable):
+                    if(filter is not None):
+                        lines += [prefix + repr(value) + " " + str(int(time)) for time, value in filter.flush()
+                            if math.isfinite(value)]
+                    threshold, maxInterval = self._fields[(row["_measurement"], row["_field"])]
+                    filter = self._className(threshold, maxInterval)
+                    currentTable = table
+                    prefix = seriesKey(row) + " " + escape(row["_field"], ",= ") + "="
+
+                # Points which are not numbers cannot be written in line protocol
+                finite = np.isfinite(values)
+                pointsIn += len(times)
+                lines += [prefix + repr(value) + " " + str(int(time))
+                    for time, value in filter.filterPoints(list(zip(times[finite].tolist(), values[finite].tolist())))]
+                # Full batches are queued, and the queued lines removed once
+                written = 0
+                while(len(lines) - written >= self._batchSize):
+                    pointsOut += self._batchSize
+                    self._put(index, lines[written:written + self._batchSize])
+                    written += self._batchSize
+                del lines[0:written]
+            if(filter is not None):
+                lines += [prefix + repr(value) + " " + str(int(time)) for time, value in filter.flush()
+                    if math.isfinite(value)]
+            if(len(lines) > 0):
+                pointsOut += len(lines)
+                self._put(index, lines)
+        except Exception as error:
+            print("Range {0} to {1} failed: {2}".format(formatTime(start), formatTime(stop), error))
+            with self._lock:
+                self._failed.add(index)
+
+        # Range is complete once its queued batches are written
+        with self._lock:
+            self._pending[index][1] = (start, stop, pointsIn, pointsOut)
+            self.pointsIn += pointsIn
+            self.pointsOut += pointsOut
+        self._finished(index, None)
+        return
+
+    def _write(self):
+        """ Writes batches from the queue until a None batch is received. """
+        client = InfluxDBClient(url = self._targetUrl, token = self._token, org = self._org)
+        writeApi = client.write_api(write_options = SYNCHRONOUS)
+        try:
+            while(True):
+                batch = self._queue.get()
+                if(batch is None):
+                    break
+                index, lines = batch
+
+                # Retry with an increasing delay
+                written = False
+                delay = 1.0
+                for attempt in range(0, self._retries + 1):
+                    try:
+                        writeApi.write(self._target, self._org, lines)
+                        written = True
+                        break
+                    except ApiException as error:
+                        print("Write failed with status {0}".format(error.status))
+                        if(error.status in self.rejectedStatuses):
+                            break
+                    except Exception as error:
+                        print("Write failed: {0}".format(error))
+                    if(attempt < self._retries):
+                        time.sleep(delay)
+                        delay = min(delay*2, 60.0)
+                self._finished(index, written)
+        finally:
+            client.close()
+        return
+
+    def run(self, ranges) -> int:
+        """ Filters the ranges which are not in the checkpoint. Returns the\
+            number of ranges which failed. """
+        pending = [(index, start, stop) for index, (start, stop) in enumerate(ranges)
+            if (start, stop) not in self._checkpoint.completed]
+        for index, start, stop in pending:
+            self._pending[index] = [0, None, False]
+
+        writers = [threading.Thread(target = self._write) for writer in range(0, self._writers)]
+        for writer in writers:
+            writer.start()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers = self._workers) as executor:
+                list(executor.map(lambda item : self._filterRange(*item), pending))
+        finally:
+            for writer in writers:
+                self._queue.put(None)
+            for writer in writers:
+                writer.join()
+
+        return len(self._failed)
+
+# If run from command line
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Filters the history of an influx DB v2 bucket into another bucket.",
+        fromfile_prefix_chars="@")
+    parser.add_argument('server_url',
+        type=str,
+        help="URL of Influx server in format http://host:port")
+    parser.add_argument('source',
+        type=str,
+        help="Bucket to read from")
+    parser.add_argument('target',
+        type=str,
+        help="Bucket to write the filtered points to")
+    parser.add_argument('--org',
+        type=str,
+        required=True,
+        help="Organisation of the buckets")
+    parser.add_argument('--token',
+        type=str,
+        default=os.environ.get("INFLUX_TOKEN", ""),
+        help="API token, or the INFLUX_TOKEN environment variable")
+    parser.add_argument('--targeturl',
+        type=str,
+        default=None,
+        help="URL of the Influx server of the target bucket, if not the same server")
+    parser.add_argument('--start',
+        type=str,
+        required=True,
+        help="Start of the time span to filter, as an RFC3339 time")
+    parser.add_argument('--stop',
+        type=str,
+        required=True,
+        help="End of the time span to filter, as an RFC3339 time")
+    parser.add_argument('--rangesize',
+        type=float,
+        default=86400,
+        help="Seconds of each range queried, filtered and checkpointed as a unit")
+    parser.add_argument('--fields',
+        nargs=4,
+        metavar=("measurement", "field", "threshold", "maximum_interval"),
+        action="append",
+        default=[],
+        help="Measurement/field values which are filtered with the specified threshold parameter")
+    parser.add_argument('--method',
+        type=str,
+        help="Compression algorithm",
+        choices=filterClasses.keys(),
+        default="sdt")
+    parser.add_argument('--workers',
+        type=int,
+        default=4,
+        help="Number of ranges queried and filtered concurrently")
+    parser.add_argument('--writers',
+        type=int,
+        default=2,
+        help="Number of concurrent writes to the target bucket")
+    parser.add_argument('--batch',
+        type=int,
+        default=5000,
+        help="Number of points of each write")
+    parser.add_argument('--queue',
+        type=int,
+        default=16,
+        help="Number of batches waiting to be written, above which filtering waits")
+    parser.add_argument('--retries',
+        type=int,
+        default=5,
+        help="Number of times a failed write is retried before its range fails")
+    parser.add_argument('--checkpoint',
+        type=str,
+        default=None,
+        help="File recording the ranges written, which are skipped when run again")
+    args = parser.parse_args()
+    if(len(args.fields) == 0):
+        parser.error("at least one --fields option is required")
+
+    # Threshold and maximum interval of each field, with the same time unit as the filtered points
+    fields = {(measurement, field) : (float(threshold), float(maxinterval))
+        for measurement, field, threshold, maxinterval in args.fields}
+
+    # Ranges of the time span
+    start, stop = parseTimes(pd.Series([args.start, args.stop])).tolist()
+    ranges = splitRanges(start, stop, max(int(args.rangesize*1e9), 1))
+
+    recompressor = Recompressor(args.server_url, args.token, args.org, args.source, args.target, fields,
+        filterClasses[args.method], args.targeturl, args.workers, args.writers, args.batch, args.queue,
+        args.retries, args.checkpoint)
+    started = time.perf_counter()
+    failed = recompressor.run(ranges)
+    elapsed = time.perf_counter() - started
+    print("{0} points in, {1} points out in {2:.1f} s, {3:.0f} points per second".format(recompressor.pointsIn,
+        recompressor.pointsOut, elapsed, recompressor.pointsIn/max(elapsed, 1e-9)))
+    if(failed > 0):
+        print("{0} ranges failed and may be retried by running again with the same checkpoint".format(failed))
+        sys.exit(1)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""telegrafFilter.py: Telegraf execd processor with deadband filtering."""
+
+# Import built-in modules
+import argparse
+import re
+import signal
+import sys
+
+# Import custom modules
+from pydbfilter import FilterTree, BoundedFilterTree, SdtFilter, DeadbandFilter, HysteresisFilter, ReorderFilter, AdaptiveFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class TelegrafFilter():
+    """ Filters influx line protocol read from a stream, such as the stdin of\
+        a Telegraf execd processor, and writes the surviving lines to another.
+    """
+
+    # Class variables
+    _linePattern : re.Pattern = re.compile('^([^,]+)(,([^ ]*))? ([^ ]+) ([0-9]+)$')
+
+    def __init__(self, measurements, tags):
+        """ Class constructor. """
+        self._measurements = measurements
+        self._tags = tags
+        self._integerFields = set()
+
+        # Full tags of the last line of each series, by measurement and allowed tags
+        self._seriesTags = dict()
+
+        # Number of points rejected by their filter, such as repeated timestamps
+        self.rejected = 0
+
+        return
+
+    def formatLine(self, measurement, tags, field, time, value):
+        """ Returns a line of influx line protocol for a filtered point. """
+        tagSet = "".join([",{0}={1}".format(tagName, tagValue) for tagName, tagValue in tags])
+        if((measurement, field) in self._integerFields):
+            fieldValue = "{0}i".format(round(value))
+        else:
+            fieldValue = repr(float(value))
+        return "{0}{1} {2}={3} {4}\n".format(measurement, tagSet, field, fieldValue, round(time))
+
+    def handleLine(self, line) -> list:
+        """ Handles a line of influx line protocol, returning the lines to\
+            be written to the output. """
+        # Attempt to match the line
+        m = re.match(self._linePattern, line)
+
+        # Lines which are not matched or not filtered are passed through
+        if(not m or m.group(1) not in self._measurements.keys()):
+            return [line + "\n"] if line else []
+
+        measurement = m.group(1)
+        tag_set = m.group(3)
+        field_set = m.group(4)
+        timestamp = m.group(5)
+
+        # Parse tag set to list of pairs
+        if(tag_set):
+            tags = [tuple(tag.split("=", 1)) for tag in tag_set.split(",")]
+        else:
+            tags = []
+
+        # Parse field set to list of pairs
+        fields = [tuple(field.split("=", 1)) for field in field_set.split(",")]
+
+        # Series are keyed by the allowed tags, and written with the full tags when flushed
+        allowedTags = sorted([tag for tag in tags if tag[0] in self._tags])
+        self._seriesTags[(measurement, tuple(allowedTags))] = tags
+
+        lines = list()
+        unfiltered = list()
+        for field, fieldValue in fields:
+
+            # Fields without a filter are passed through
+            if(field not in self._measurements[measurement].keys()):
+                unfiltered += [field + "=" + fieldValue]
+                continue
+
+            # Retrieve filter from tree datastructure by allowed tags
+            filter = self._measurements[measurement][field].walk(list(allowedTags))
+
+            # Integer fields are filtered as floats and written as integers
+            if(fieldValue.endswith("i")):
+                self._integerFields.add((measurement, field))
+                fieldValue = fieldValue[0:-1]
+
+            # Apply filter to data, dropping points the filter rejects such as\
+            # repeated or out of order timestamps
+            try:
+                points = filter.filterPoint(int(timestamp), float(fieldValue))
+            except ValueError as error:
+                self.rejected += 1
+                print("Dropping point of {0} {1}: {2}".format(measurement, field, error), file=sys.stderr)
+                continue
+            for time, value in points:
+                lines += [self.formatLine(measurement, tags, field, time, value)]
+
+        # Remaining fields are written on the original line
+        if(len(unfiltered) > 0):
+            lines += ["{0}{1} {2} {3}\n".format(measurement, "," + tag_set if tag_set else "",
+                ",".join(unfiltered), timestamp)]
+
+        return lines
+
+    def flush(self) -> list:
+        """ Returns lines for the last point of every filtered series, with\
+            the tags of the last line of the series. """
+        lines = list()
+        for measurement, fields in self._measurements.items():
+            for field, tree in fields.items():
+                for tags, time, value in zip(*tree.flushAll()):
+                    tags = self._seriesTags.get((measurement, tuple(sorted(tags))), tags)
+                    lines += [self.formatLine(measurement, tags, field, time, value)]
+        return lines
+
+    def run(self, input, output, blockSize = 1 << 20):
+        """ Filters lines from the input until end of file. Each read returns\
+            the data available up to the block size, and the lines for each\
+            read are written to the output together. """
+        remainder = b""
+
+        try:
+            while(True):
+                block = input.read1(blockSize)
+                if(len(block) == 0):
+                    break
+
+                # Only complete lines are handled
+                lines = (remainder + block).split(b"\n")
+                remainder = lines.pop()
+
+                results = list()
+                for line in lines:
+                    results += self.handleLine(line.decode("UTF-8").rstrip("\r"))
+                output.write("".join(results).encode("UTF-8"))
+                output.flush()
+
+            # Handle an unterminated last line
+            if(len(remainder) > 0):
+                output.write("".join(self.handleLine(remainder.decode("UTF-8").rstrip("\r"))).encode("UTF-8"))
+
+        finally:
+            # Write the last point of each series on close of input or SIGTERM
+            output.write("".join(self.flush()).encode("UTF-8"))
+            output.flush()
+
+        return
+
+def terminate(signalNumber, frame):
+    """ Converts SIGTERM into an exception so the filters are flushed. """
+    raise SystemExit(0)
+
+# main script
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Telegraf execd processor with deadband filtering.",
+        fromfile_prefix_chars="@")
+    parser.add_argument('--fields',
+        nargs=4,
+        metavar=("measurement", "field", "threshold", "maximum_interval"),
+        action="append",
+        default=[],
+        help="Measurement/field values for which filtering will be applied")
+    parser.add_argument('--tags',
+        nargs="+",
+        default=[],
+        help="Allowed tags")
+    parser.add_argument('--method',
+        type=str,
+        help="Compression algorithm.",
+        choices=["sdt", "deadband", "hysteresis"],
+        default="sdt")
+    parser.add_argument('--reorderwindow',
+        type=float,
+        default=None,
+        help="Reorder points of each series arriving up to this many nanoseconds late")
+    parser.add_argument('--reordercapacity',
+        type=int,
+        default=1024,
+        help="Maximum number of points buffered for each series by the reorder window")
+    parser.add_argument('--latepolicy',
+        type=str,
+        help="Handling of points older than the reorder window",
+        choices=ReorderFilter.latePolicies,
+        default="drop")
+    parser.add_argument('--adaptive',
+        nargs=3,
+        type=float,
+        metavar=("noise_scale", "min_scale", "max_scale"),
+        default=None,
+        help="Set the threshold of each series to this multiple of its estimated noise, between the threshold of the field scaled by the minimum and maximum scales")
+    parser.add_argument('--noisewindow',
+        type=int,
+        default=100,
+        help="Number of points over which the noise of each series is estimated with --adaptive")
+    parser.add_argument('--noiseestimator',
+        type=str,
+        help="Noise estimate of --adaptive, as an exponentially weighted variance or the median absolute deviation of each window of differences",
+        choices=AdaptiveFilter.estimators,
+        default="ewma")
+    parser.add_argument('--maxseries',
+        type=int,
+        default=None,
+        help="Maximum number of series of each field held in memory, above which the least recently used are spilled to disk")
+    parser.add_argument('--spilldir',
+        type=str,
+        default=None,
+        help="Directory of the temporary files of series spilled with --maxseries, or the system temporary directory")
+    args = parser.parse_args()
+
+    # Setup initial filter structure
+    measurements = dict()
+    if(args.method == "sdt"):
+        filter = SdtFilter
+    elif(args.method == "deadband"):
+        filter = DeadbandFilter
+    elif(args.method == "hysteresis"):
+        filter = HysteresisFilter
+    for measurement, field, threshold, maxinterval in args.fields:
+        # Filter class and arguments, with the threshold adapted to the noise of each series
+        tier = (filter, float(threshold), float(maxinterval))
+        if(args.adaptive is not None):
+            tier = (AdaptiveFilter,) + tier + (*args.adaptive, args.noisewindow, args.noiseestimator)
+        kwargs = {}
+        if(args.reorderwindow is not None):
+            tier = (ReorderFilter,) + tier
+            kwargs = {
+                "reorderWindow" : args.reorderwindow,
+                "reorderCapacity" : args.reordercapacity,
+                "latePolicy" : args.latepolicy
+                }
+
+        # Least recently used series are spilled to disk above the maximum number of series
+        if(args.maxseries is None):
+            tree = FilterTree(*tier, **kwargs)
+        else:
+            tree = BoundedFilterTree(*tier, maxSeries = args.maxseries, spillDir = args.spilldir, **kwargs)
+        measurements.setdefault(measurement, dict())[field] = tree
+
+    # Flush the filters when Telegraf stops the processor
+    signal.signal(signal.SIGTERM, terminate)
+
+    try:
+        TelegrafFilter(measurements, args.tags).run(sys.stdin.buffer, sys.stdout.buffer)
+    except KeyboardInterrupt:
+        pass
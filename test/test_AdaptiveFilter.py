@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""test_AdaptiveFilter.py: unit tests for AdaptiveFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import AdaptiveFilter, DeadbandFilter, HysteresisFilter, SdtFilter, RdpFilter, ReorderFilter, FilterTree
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def noisySine(sigma, n = 5000):
+    """ Returns a list of points of a slow sine wave with white noise. """
+    rng = np.random.default_rng(0)
+    values = np.sin(np.arange(0, n)/500.0) + rng.normal(0, sigma, n)
+    return list(zip(range(0, n*10, 10), values.tolist()))
+
+@pytest.mark.parametrize("estimator", ["ewma", "mad"])
+def test_noise(estimator):
+    """Verify the noise is estimated and bounds the threshold."""
+    for sigma in (0.01, 0.1):
+        filter = AdaptiveFilter(DeadbandFilter, 1.0, 1e9, 3.0, 0.001, 1000, 200, estimator)
+        filter.filterPoints(noisySine(sigma))
+        assert filter.noise == pytest.approx(sigma, rel = 0.25)
+        assert filter.threshold == pytest.approx(3*sigma, rel = 0.25)
+
+    # Threshold is held within the bounds
+    filter = AdaptiveFilter(DeadbandFilter, 1.0, 1e9, 3.0, 0.5, 2.0, 200, estimator)
+    filter.filterPoints(noisySine(0.01))
+    assert filter.threshold == 0.5
+    filter = AdaptiveFilter(DeadbandFilter, 1.0, 1e9, 3.0, 0.5, 2.0, 200, estimator)
+    filter.filterPoints(noisySine(10.0))
+    assert filter.threshold == 2.0
+
+    return
+
+@pytest.mark.parametrize("className", [DeadbandFilter, HysteresisFilter, SdtFilter])
+def test_compression(className):
+    """Verify noisy series are compressed more than with a fixed threshold."""
+    data = noisySine(1.0)
+    filter = AdaptiveFilter(className, 0.5, 1e9, window = 50)
+
+    # Output matches the filter with a fixed threshold until the noise is estimated
+    assert filter.filterPoints(data[0:50]) == className(0.5, 1e9).filterPoints(data[0:50])
+    assert filter.noise is None
+    assert filter.threshold == 0.5
+
+    assert len(filter.filterPoints(data[50:])) < len(className(0.5, 1e9).filterPoints(data[50:]))/4
+    assert filter.generatesPoints == className.generatesPoints
+    assert filter.interpolation == className.interpolation
+
+    return
+
+def test_tree():
+    """Verify adaptive filters behind a reorder window in a tree."""
+    tree = FilterTree(ReorderFilter, AdaptiveFilter, DeadbandFilter, 0.5, 1e9, window = 10, reorderWindow = 20)
+    data = noisySine(1.0, 100)
+    results = list()
+    for time, value in data:
+        results += tree.walk([("host", "a")]).filterPoint(time, value)
+    results += tree.walk([("host", "a")]).flush()
+    assert results[-1] == data[-1]
+
+    return
+
+def test_invalid():
+    """Verify invalid arguments raise exceptions."""
+    with pytest.raises(ValueError):
+        AdaptiveFilter(DeadbandFilter, 1.0, 1e9, estimator = "mean")
+    with pytest.raises(ValueError):
+        AdaptiveFilter(DeadbandFilter, 1.0, 1e9, minScale = 2.0, maxScale = 1.0)
+    with pytest.raises(ValueError):
+        AdaptiveFilter(RdpFilter, 1.0, 1e9)
+
+    return
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""test_Analysis.py: unit tests for Analysis module."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+from pandas import DataFrame
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import Analysis, SdtFilter, DeadbandFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_reconstruct():
+    """Verify reconstruct() method with linear and step interpolation."""
+    times = [100, 110, 120, 130, 140]
+
+    assert Analysis.reconstruct(times, [100, 120, 140], [1, 3, 2], "linear").tolist() == [1, 2, 3, 2.5, 2]
+    assert Analysis.reconstruct(times, [100, 120, 140], [1, 3, 2], "step").tolist() == [1, 1, 3, 3, 2]
+
+    # Times outside the filtered points hold the nearest value
+    assert Analysis.reconstruct(times, [110, 130], [1, 3], "linear").tolist() == [1, 1, 2, 3, 3]
+
+    with pytest.raises(ValueError):
+        Analysis.reconstruct(times, [100], [1], "cubic")
+
+    return
+
+def test_compareseries():
+    """Verify compareSeries() method against the filter output."""
+    times = 1700000000000000000 + np.arange(0, 200, dtype=np.int64)*1000000000
+    values = np.sin(np.arange(0, 200)/10.0)
+
+    for filter in [SdtFilter(0.1, 1e12), DeadbandFilter(0.1, 1e12)]:
+        results = filter.filterPoints(list(zip(times.tolist(), values.tolist())))
+        result = Analysis.compareSeries(times, values,
+            [r[0] for r in results], [r[1] for r in results], Analysis.interpolationFor(filter))
+
+        assert result["points"] == 200
+        assert result["outputPoints"] == len(results)
+        assert result["ratio"] == 200/len(results)
+        assert result["rmsError"] <= result["maxError"]
+
+    # Step-hold of the deadband output is within the deadband
+    assert result["maxError"] <= 0.1
+
+    return
+
+def test_compareframes():
+    """Verify compareFrames() method reports each series."""
+    data = DataFrame({
+                    "location" : ["italy", "japan", "italy", "japan", "italy", "japan"],
+                    "_time" : [100, 100, 120, 120, 140, 140],
+                    "_value" : [1, 5, 2, 6, 3, 9]
+                    })
+    output = data.iloc[[0, 1, 4, 5]]
+
+    result = Analysis.compareFrames(data, output, ["location"], interpolation="linear")
+    assert result.index.tolist() == ["italy", "japan"]
+    assert result["points"].tolist() == [3, 3]
+    assert result["outputPoints"].tolist() == [2, 2]
+    assert result["maxError"].tolist() == [0, 1]
+
+    result = Analysis.compareFrames(data, output, ["location"], interpolation="step")
+    assert result["maxError"].tolist() == [1, 1]
+
+    return
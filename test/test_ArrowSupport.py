@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""test_ArrowSupport.py: unit tests for ArrowSupport module."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import FilterTree, DeadbandFilter, SdtFilter, TierFilter
+
+# Arrow support is optional, so its tests are skipped without pyarrow
+pyarrow = pytest.importorskip("pyarrow")
+ArrowSupport = pytest.importorskip("pydbfilter.ArrowSupport")
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def randomRows(nSeries, nPoints):
+    """ Returns the columns of random walk series with a row for each point of\
+        each series in turn. """
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(0, 0.2, (nPoints, nSeries)), axis = 0).ravel()
+    times = np.repeat(np.arange(0, nPoints)*10, nSeries)
+    hosts = ["h{0}".format(series) for series in range(0, nSeries)]*nPoints
+    return times, values, hosts
+
+def test_filterbatch():
+    """Verify the output of each series matches filtering its points."""
+    times, values, hosts = randomRows(20, 50)
+    regions = [None if host == "h0" else "r1" for host in hosts]
+    batch = ArrowSupport.createBatch(times, values, ["load"]*len(times), ["value"]*len(times),
+        {"host" : hosts, "region" : regions})
+    measurements = {"load" : {"value" : FilterTree(SdtFilter, 0.3, 1e9)}}
+
+    # Batches are read from an IPC stream
+    batches = ArrowSupport.readBatches(ArrowSupport.encodeBatches([batch.slice(0, 500), batch.slice(500)]))
+    results = ArrowSupport.filterBatch(measurements, batches[0]) + ArrowSupport.filterBatch(measurements, batches[1])
+
+    for series in range(0, 20):
+        host = "h{0}".format(series)
+        tags = [("host", host)] + ([] if host == "h0" else [("region", "r1")])
+        expected = SdtFilter(0.3, 1e9).filterPoints(list(zip(times[series::20].tolist(), values[series::20].tolist())))
+        output = [points for measurement, field, seriesTags, points in results if seriesTags == tags]
+        assert output[0] + output[1] == expected
+
+    return
+
+def test_columns():
+    """Verify unknown fields, null values, time units and missing columns."""
+    batch = pyarrow.RecordBatch.from_pydict({
+        "time" : pyarrow.array([1, 2, 3, 4], type = pyarrow.timestamp("s")),
+        "value" : pyarrow.array([1, None, 3, 4], type = pyarrow.int64()),
+        "measurement" : ["load", "load", "load", "load"],
+        "field" : ["value", "value", "value", "other"]
+        })
+    tree = FilterTree(TierFilter, (DeadbandFilter, 0.5, 1e12), (DeadbandFilter, 5, 1e12))
+    results = ArrowSupport.filterBatch({"load" : {"value" : tree}}, batch)
+    assert results == [("load", "value", [], [[(1e9, 1.0), (3e9, 3.0)], [(1e9, 1.0)]])]
+
+    with pytest.raises(ValueError):
+        ArrowSupport.filterBatch({}, batch.drop_columns(["field"]))
+    with pytest.raises(pyarrow.ArrowInvalid):
+        ArrowSupport.readBatches(b"line,host=a value=1 1")
+
+    return
+
+def test_rejected_rows():
+    """Verify rows rejected by the filter of a series do not affect other series."""
+    measurements = {"load" : {"value" : FilterTree(DeadbandFilter, 0.5, 1e12)}}
+    batch = ArrowSupport.createBatch([1, 5, 1, 5, 5, 3, 9], [1.0, 2.0, 1.0, 2.0, 3.0, 4.0, 5.0], ["load"]*7,
+        ["value"]*7, {"host" : ["a", "a", "b", "b", "b", "b", "b"]})
+    results = ArrowSupport.filterBatch(measurements, batch)
+    assert results == [("load", "value", [("host", "a")], [(1, 1.0), (5, 2.0)]),
+        ("load", "value", [("host", "b")], [(1, 1.0), (5, 2.0), (9, 5.0)])]
+
+    # Points not newer than the last point of the filter are dropped
+    batch = ArrowSupport.createBatch([5, 6], [3.0, 4.0], ["load"]*2, ["value"]*2, {"host" : ["a", "a"]})
+    assert ArrowSupport.filterBatch(measurements, batch) == [("load", "value", [("host", "a")], [(6, 4.0)])]
+
+    return
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""test_BoundedFilterTree.py: unit tests for BoundedFilterTree class."""
+
+# Import built-in modules
+import os
+import pickle
+import sys
+import threading
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import BoundedFilterTree, FilterTree, SdtFilter, DeadbandFilter, ReorderFilter, TierFilter, BaseFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def interleaved(nSeries, nPoints):
+    """ Returns a list of the tags, time and value of each point of random\
+        walk series, with a point of each series in turn. """
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(0, 0.2, (nPoints, nSeries)), axis = 0)
+    return [([("host", "h{0}".format(series)), ("region", "r{0}".format(series % 3))], time*10, values[time, series])
+        for time in range(0, nPoints) for series in range(0, nSeries)]
+
+def filterAll(tree, data) -> list:
+    """ Returns the points of each series from filtering the data and\
+        flushing the tree. """
+    results = dict()
+    for tags, time, value in data:
+        for point in tree.walk(sorted(tags)).filterPoint(time, value):
+            results.setdefault(tuple(tags), list()).append(point)
+    for tags, time, value in zip(*tree.flushAll()):
+        results.setdefault(tuple(sorted(tags)), list()).append((time, value))
+    return results
+
+def test_walk():
+    """Verify walk() returns the same filter for the same tags."""
+    tree = BoundedFilterTree(SdtFilter, 0.1, 100, maxSeries = 10)
+
+    filter1 = tree.walk([("location", "italy")])
+    filter2 = tree.walk([("location", "japan")])
+    filter3 = tree.walk([("location", "italy")])
+    assert isinstance(filter1, BaseFilter)
+    assert filter1 == filter3
+    assert filter2 != filter3
+    assert tree.walk([]) is tree
+
+    # Series are created when first used
+    assert tree.resident == 0
+    filter1.filterPoint(0, 1.0)
+    assert tree.getAllChildren() == [([("location", "italy")], filter1)]
+    tree.close()
+
+    return
+
+def test_spill():
+    """Verify output matches a filter tree when series are spilled."""
+    data = interleaved(50, 40)
+    expected = filterAll(FilterTree(SdtFilter, 0.3, 1e9), data)
+
+    tree = BoundedFilterTree(SdtFilter, 0.3, 1e9, maxSeries = 20, spillBatch = 5)
+    assert filterAll(tree, data) == expected
+    assert tree.resident <= 20
+    assert tree.resident + tree.spilled == 50
+    assert tree.spills > 0 and tree.faults > 0
+
+    # Store is removed when closed
+    filename = tree._filename
+    assert os.path.exists(filename)
+    tree.close()
+    assert not os.path.exists(filename)
+
+    with pytest.raises(ValueError):
+        BoundedFilterTree(SdtFilter, 0.3, 1e9, maxSeries = 0)
+
+    return
+
+def test_tiers():
+    """Verify tiers and keyword arguments of spilled filters."""
+    data = interleaved(10, 30)
+    tiers = ((DeadbandFilter, 0.1, 1e9), (DeadbandFilter, 0.5, 1e9))
+    expected = FilterTree(TierFilter, *tiers)
+    tree = BoundedFilterTree(TierFilter, *tiers, maxSeries = 3, spillBatch = 1)
+    for tags, time, value in data:
+        assert tree.walk(sorted(tags)).filterPoint(time, value) \
+            == expected.walk(sorted(tags)).filterPoint(time, value)
+    assert sorted(zip(*tree.flushAll()[1])) == sorted(zip(*expected.flushAll()[1]))
+
+    # Reorder buffers are spilled with the filter
+    tree = BoundedFilterTree(ReorderFilter, DeadbandFilter, 0.1, 1e9, maxSeries = 1, reorderWindow = 100)
+    tree.walk([("host", "a")]).filterPoint(20, 1.0)
+    tree.walk([("host", "b")]).filterPoint(20, 1.0)
+    assert tree.walk([("host", "a")]).filterPoint(10, 2.0) == []
+    filter = ReorderFilter(DeadbandFilter, 0.1, 1e9, reorderWindow = 100)
+    assert filter.filterPoint(20, 1.0) + filter.filterPoint(10, 2.0) == []
+    assert tree.walk([("host", "a")]).flush() == filter.flush()
+    assert tree.faults == 1 and tree.spilled == 1
+    tree.close()
+
+    return
+
+def test_pickle():
+    """Verify pickled trees keep their spilled series."""
+    data = interleaved(20, 20)
+    expected = filterAll(FilterTree(SdtFilter, 0.3, 1e9), data)
+
+    tree = BoundedFilterTree(SdtFilter, 0.3, 1e9, maxSeries = 5)
+    for tags, time, value in data[0:200]:
+        tree.walk(sorted(tags)).filterPoint(time, value)
+    copy = pickle.loads(pickle.dumps(tree))
+    tree.close()
+    assert copy.spilled == 15 and copy._filename != tree._filename
+
+    results = filterAll(copy, data[200:])
+    assert all([results[tags] == points[-len(results[tags]):] for tags, points in expected.items()])
+    copy.close()
+
+    return
+
+def test_threads():
+    """Verify series filtered from several threads are not lost when spilled."""
+    tree = BoundedFilterTree(DeadbandFilter, 0.5, 1e9, maxSeries = 4, spillBatch = 1)
+
+    def worker(series):
+        for time in range(0, 200):
+            tree.walk([("host", "h{0}".format(series))]).filterPoint(time, float(time))
+        return
+
+    threads = [threading.Thread(target = worker, args = (series,)) for series in range(0, 8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    keys, times, values = tree.flushAll()
+    assert len(keys) == 8 and times == [199]*8
+    tree.close()
+
+    return
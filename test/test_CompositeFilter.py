@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""test_CompositeFilter.py: unit tests for CompositeFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import CompositeFilter, DeadbandFilter, SdtFilter, TierFilter, FilterTree
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def randomWalk(n = 500):
+    """ Returns a list of points of a random walk. """
+    rng = np.random.default_rng(0)
+    return list(zip(range(0, n*10, 10), np.cumsum(rng.normal(0, 0.2, n)).tolist()))
+
+def test_filterpoint():
+    """Verify the output matches filtering the output of each stage."""
+    data = randomWalk()
+    filter = CompositeFilter((DeadbandFilter, 0.1, 1e9), (SdtFilter, 0.5, 1e9))
+    results = list()
+    for time, value in data:
+        results += filter.filterPoint(time, value)
+
+    assert results == SdtFilter(0.5, 1e9).filterPoints(DeadbandFilter(0.1, 1e9).filterPoints(data))
+    assert len(filter.stages) == 2
+    assert filter.interpolation == "linear"
+
+    # Flushed points of the first stage pass through the second
+    assert filter.flush() == [data[-1]]
+
+    with pytest.raises(ValueError):
+        CompositeFilter()
+
+    return
+
+def test_repeated():
+    """Verify points returned again by a stage are not passed to the next."""
+    # Each point times out, returning the kept last point again
+    filter = CompositeFilter((DeadbandFilter, 0.1, 5), (DeadbandFilter, 0.5, 1e9))
+    results = list()
+    for time, value in randomWalk(100):
+        results += filter.filterPoint(time, value)
+
+    times = [time for time, value in results]
+    assert len(times) > 2 and times == sorted(set(times))
+    assert filter.flush()[-1][0] == 990
+
+    return
+
+def test_batch():
+    """Verify series, masks, tiers and trees of composite filters."""
+    data = randomWalk()
+    series = pd.Series([value for time, value in data], index = [time for time, value in data])
+    stages = ((DeadbandFilter, 0.1, 1e9), (DeadbandFilter, 0.3, 1e9))
+    expected = DeadbandFilter(0.3, 1e9).filterPoints(DeadbandFilter(0.1, 1e9).filterPoints(data))
+
+    assert list(CompositeFilter(*stages).filterPoints(series).items()) == expected
+    mask = CompositeFilter(*stages).filterMask(series)
+    assert list(series[mask].items()) == expected
+
+    # Composite filter of each tier of a tree
+    tree = FilterTree(TierFilter, (CompositeFilter,) + stages, (DeadbandFilter, 0.3, 1e9))
+    assert tree.walk([("host", "a")]).filterPoints(data) == [expected, DeadbandFilter(0.3, 1e9).filterPoints(data)]
+    keys, times, values = tree.flushAll()[0]
+    assert keys == [(("host", "a"),)] and times == [data[-1][0]]
+
+    return
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""test_CsvCache.py: unit tests for CsvCache class."""
+
+# Import built-in modules
+import os
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter.CsvCache import CsvCache
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Annotated CSV export with two series of a field, out of time order
+EXPORT = """#group,false,false,true,true,true,false,false,true,true,true
+#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string
+#default,_result,,,,,,,,,
+,result,table,_start,_stop,_time,_value,_field,_measurement,location
+,_result,1,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:02Z,5.5,temp,env,b
+,_result,0,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:01Z,2.5,temp,env,a
+,_result,0,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:00Z,1.5,temp,env,a
+,_result,1,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:01Z,4.5,temp,env,b
+,_result,1,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:00Z,3.5,temp,env,b
+"""
+
+@pytest.fixture
+def export(tmp_path):
+    """Writes the export to a temporary file."""
+    filename = str(tmp_path / "export.csv")
+    with open(filename, "w") as file:
+        file.write(EXPORT)
+    return filename
+
+def test_columns(export):
+    """Verify the arrays are sorted by series then time."""
+    cache = CsvCache(export)
+    second = 1000000000
+    start = 1704067200*second
+
+    assert cache.built
+    assert len(cache) == 2
+    assert isinstance(cache.times, np.memmap)
+    assert cache.times.dtype == np.int64 and cache.values.dtype == np.float64
+    assert cache.seriesIds.tolist() == [0, 0, 1, 1, 1]
+    assert (cache.times - start).tolist() == [0, second, 0, second, 2*second]
+    assert cache.values.tolist() == [1.5, 2.5, 3.5, 4.5, 5.5]
+
+    # Rows hold every column of the series
+    rows = cache.seriesRows()
+    assert list(rows[1].keys()) == cache.columns
+    assert rows[1]["location"] == "b" and rows[1]["table"] == "1"
+    assert rows[1]["_start"] == "2024-01-01T00:00:00Z" and rows[1]["_time"] is None
+    times, values = cache.seriesPoints(1)
+    assert values.tolist() == [3.5, 4.5, 5.5]
+
+    return
+
+def test_invalidation(export):
+    """Verify the cache is rebuilt only when the source file changes."""
+    CsvCache(export)
+
+    # Unchanged file is read from the cache
+    assert not CsvCache(export).built
+
+    # Changed modification time with the same contents
+    os.utime(export, ns=(0, 0))
+    assert not CsvCache(export).built
+
+    # Changed contents of the same size
+    with open(export, "w") as file:
+        file.write(EXPORT.replace("5.5", "6.5"))
+    cache = CsvCache(export)
+    assert cache.built
+    assert cache.values.tolist()[-1] == 6.5
+
+    # Changed size
+    with open(export, "a") as file:
+        file.write(",_result,1,2024-01-01T00:00:00Z,2024-01-02T00:00:00Z,2024-01-01T00:00:03Z,7.5,temp,env,b\n")
+    cache = CsvCache(export)
+    assert cache.built
+    assert len(cache.values) == 6
+
+    return
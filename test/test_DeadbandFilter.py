@@ -5,7 +5,7 @@
 import sys
 
 # Import third-party modules
-from pandas import DataFrame, testing
+from pandas import DataFrame, Series, date_range, testing, to_datetime
 
 # Import custom modules
 sys.path.append('../')
@@ -60,6 +60,47 @@ def test_filterpoints_df():
     
     return
 
+def test_filterpoints_datetime_df():
+    """Verify filterpoints() method keeps exact times of a datetime64 column."""
+    filter = DeadbandFilter(0.1,100)
+    offset = 1700000000000000001
+
+    data = DataFrame({
+                    "t" : to_datetime([offset + t for t in [100,120,140,150,160,170,180]], utc=True),
+                    "v" : [1,1.1,0.9,1.2,1.3,1.1,1]
+                    })
+    expected = DataFrame({
+                    "t" : to_datetime([offset + t for t in [100, 150, 180]], utc=True),
+                    "v" : [1, 1.2, 1]
+                    })
+    result = filter.filterPoints(data)
+    testing.assert_frame_equal(result, expected)
+
+    return
+
+def test_filterpoints_series():
+    """Verify filterpoints() method selects kept points from a series."""
+    filter = DeadbandFilter(0.1,100e9)
+
+    data = Series([1,1.1,0.9,1.2,1.3,1.1,1], index=date_range("2024-01-01", periods=7, freq="10s"))
+    result = filter.filterPoints(data)
+    testing.assert_series_equal(result, data.iloc[[0, 3, 6]], check_freq=False)
+
+    return
+
+def test_filtermask():
+    """Verify filtermask() method returns the rows kept by the filter."""
+    filter = DeadbandFilter(0.1,100)
+
+    data = DataFrame({
+                    "t" : [100,120,140,150,160,170,180],
+                    "v" : [1,1.1,0.9,1.2,1.3,1.1,1]
+                    })
+    mask = filter.filterMask(data)
+    assert mask.tolist() == [True, False, False, True, False, False, True]
+
+    return
+
 def test_timeout():
     """Verify filter() method timeout functionality."""
     filter = DeadbandFilter(0.1,100)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""test_Decimation.py: unit tests for Decimation module."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter.Decimation import MinMaxDecimator, LttbDecimator, CsvDecimator, createDecimator, formatTime
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Annotated CSV response with a numeric and a string table
+RESPONSE = """#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string\r
+#group,false,false,true,true,false,false,true,true\r
+#default,_result,,,,,,,\r
+,result,table,_start,_stop,_time,_value,_field,_measurement\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:00Z,1,temp,env\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:01Z,5,temp,env\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:02Z,3,temp,env\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:06Z,-2,temp,env\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:07Z,4,temp,env\r
+,,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:08Z,0,temp,env\r
+\r
+#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,string,string,string\r
+#group,false,false,true,true,false,false,true,true\r
+#default,_result,,,,,,,\r
+,result,table,_start,_stop,_time,_value,_field,_measurement\r
+,,1,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:00Z,on,state,env\r
+,,1,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:01Z,off,state,env\r
+\r
+"""
+
+def decimate(decimator, times, values, chunkSize):
+    """ Returns the rows selected by a decimator from points passed in chunks. """
+    rows = np.arange(0, len(times))
+    selected = list()
+    for start in range(0, len(times), chunkSize):
+        selected += decimator.filterChunk(times[start:start + chunkSize], values[start:start + chunkSize],
+            rows[start:start + chunkSize])[2].tolist()
+    selected += decimator.flush()[2].tolist()
+    return selected
+
+def feed(text, factory, chunkSize):
+    """ Returns the output of a CsvDecimator given text in chunks. """
+    decimator = CsvDecimator(factory)
+    output = "".join([decimator.feed(text[start:start + chunkSize]) for start in range(0, len(text), chunkSize)])
+    return output + decimator.close()
+
+def test_min_max():
+    """Verify the minimum and maximum of each bucket are selected in time order."""
+    times = np.arange(0, 12)*10
+    values = np.array([3, 1, 2, 0, 5, 4, 9, 7, 8, 6, 6, 6], dtype=float)
+
+    for chunkSize in (1, 5, 12):
+        assert decimate(MinMaxDecimator(0, 120, 3), times, values, chunkSize) == [0, 3, 5, 6, 8, 9]
+
+    return
+
+def test_lttb():
+    """Verify LTTB keeps the first and last points and a spike."""
+    rng = np.random.default_rng(0)
+    times = np.arange(0, 1000)*1000
+    values = rng.normal(0, 0.1, 1000)
+    values[437] = 50
+
+    results = [decimate(LttbDecimator(0, 1000000, 48), times, values, chunkSize) for chunkSize in (1, 7, 1000)]
+    assert results[0] == results[1] == results[2]
+    assert results[0][0] == 0 and results[0][-1] == 999
+    assert 437 in results[0]
+    assert len(results[0]) == 50
+
+    # Single point
+    assert decimate(LttbDecimator(0, 10, 5), np.array([3]), np.array([1.0]), 1) == [0]
+
+    with pytest.raises(ValueError):
+        LttbDecimator(0, 10, 0)
+
+    return
+
+def test_csv():
+    """Verify tables are decimated as the response is streamed."""
+
+    def factory(row):
+        return createDecimator(row, "minmax", 4)
+
+    # Numeric table is decimated, the string table is passed through
+    for chunkSize in (1, 13, len(RESPONSE)):
+        output = feed(RESPONSE, factory, chunkSize)
+        lines = output.split("\r\n")
+        assert [line.split(",")[5][17:19] for line in lines[4:8]] == ["00", "01", "06", "07"]
+        assert lines[8:] == RESPONSE.split("\r\n")[10:]
+
+    # Passed through unchanged
+    assert feed(RESPONSE, lambda row : None, 7) == RESPONSE
+
+    # Generated rows take the columns of the first row
+    output = feed(RESPONSE, lambda row : createDecimator(row, "sdt", 0, {("env", "temp") : (100.0, 1e15)}), 50)
+    assert output.split("\r\n")[4:6] == [
+        ",,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:00Z,1.0,temp,env",
+        ",,0,2024-01-01T00:00:00Z,2024-01-01T00:00:10Z,2024-01-01T00:00:08Z,0.0,temp,env"]
+
+    return
+
+def test_create():
+    """Verify decimators are only created for tables which can be decimated."""
+    row = {"_start" : "2024-01-01T00:00:00Z", "_stop" : "2024-01-01T00:00:10Z", "_measurement" : "env", "_field" : "temp"}
+
+    assert isinstance(createDecimator(row, "lttb", 100), LttbDecimator)
+    assert createDecimator(dict(row, _start = ""), "lttb", 100) is None
+    assert createDecimator(row, "deadband", 100, {("env", "other") : (1.0, 1e9)}) is None
+    assert formatTime(1500000000) == "1970-01-01T00:00:01.5Z"
+
+    with pytest.raises(ValueError):
+        createDecimator(row, "mean", 100)
+
+    return
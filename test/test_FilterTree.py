@@ -4,9 +4,13 @@
 # Import built-in modules
 import sys
 
+# Import third-party modules
+from pandas import DataFrame
+import pytest
+
 # Import custom modules
 sys.path.append('../')
-from pydbfilter import FilterTree, SdtFilter, BaseFilter
+from pydbfilter import FilterTree, SdtFilter, DeadbandFilter, BaseFilter
 
 # Authorship information
 __author__ = "James Bott"
@@ -64,3 +68,57 @@ def test_getallchildren():
     
     return
 
+def test_iterchildren():
+    """ Verify iterchildren() method yields the same nodes as getallchildren(). """
+    tree = FilterTree(SdtFilter, 0.1,100)
+
+    filter1 = tree.walk([("location","italy")])
+    filter2 = tree.walk([("location","italy"),("category","a")])
+    filter3 = tree.walk([("category","a")])
+
+    children = tree.iterChildren()
+    assert next(children) == ((("location","italy"),), filter1)
+    assert list(children) == [((("category","a"),), filter3),
+                              ((("category","a"),("location","italy")), filter2)]
+    assert [(list(tags), filter) for tags, filter in tree.iterChildren()] == tree.getAllChildren()
+
+    return
+
+def test_flushall():
+    """ Verify flushall() method returns the last point of each node. """
+    tree = FilterTree(DeadbandFilter, 0.1, 100)
+
+    tree.filterPoint(100, 1)
+    tree.walk([("location","italy")]).filterPoint(100, 2)
+    tree.walk([("location","italy")]).filterPoint(120, 2.05)
+    tree.walk([("location","japan")])
+
+    keys, times, values = tree.flushAll()
+    assert keys == [(), (("location","italy"),)]
+    assert times == [100, 120]
+    assert values == [1, 2.05]
+
+    return
+
+def test_filtergroups():
+    """ Verify filtergroups() method filters each group with its own filter. """
+    tree = FilterTree(DeadbandFilter, 0.1, 100)
+
+    data = DataFrame({
+                    "location" : ["italy", "japan", "italy", "japan", "italy"],
+                    "t" : [100, 100, 120, 120, 140],
+                    "v" : [1, 5, 1.05, 6, 1.5]
+                    })
+    mask = tree.filterGroups(data, "location", "t", "v")
+    assert mask.tolist() == [True, True, False, True, True]
+
+    # Groups are filtered with the filters of the tree
+    assert tree.walk([("location", "japan")]).filterPoint(130, 6) == []
+
+    # Tags are the names of columns of the data frame
+    tree = FilterTree(DeadbandFilter, 0.1, 100)
+    assert tree.filterGroups(data, ["location"], "t", "v").tolist() == mask.tolist()
+    with pytest.raises(ValueError):
+        tree.filterGroups(data, ["country"], "t", "v")
+
+    return
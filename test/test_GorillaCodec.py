@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""test_GorillaCodec.py: unit tests for GorillaCodec module."""
+
+# Import built-in modules
+import io
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter.GorillaCodec import encodeBlock, decodeBlock, GorillaWriter, readBlocks, packBits, unpackBits
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_bits():
+    """Verify fields of 0 to 64 bits are packed across words."""
+    lengths = np.array([0, 1, 64, 3, 63, 0, 17, 64, 5])
+    fields = np.array([0, 1, 2**64 - 1, 5, 2**62 + 3, 0, 65535, 12345, 31], dtype=np.uint64)
+    data = packBits(fields, lengths)
+
+    assert len(data) == (lengths.sum() + 7)//8
+    assert unpackBits(data, lengths).tolist() == fields.tolist()
+
+    return
+
+@pytest.mark.parametrize("kind", ["random", "rounded", "constant", "special"])
+def test_block(kind):
+    """Verify times and values are decoded to the same bits."""
+    rng = np.random.default_rng(0)
+    n = 1000
+    times = 1700000000000000000 + np.cumsum(rng.integers(0, 10**12, n))
+    if(kind == "random"):
+        values = rng.normal(size=n)
+    elif(kind == "rounded"):
+        values = np.round(20 + np.cumsum(rng.normal(0, 0.1, n)), 1)
+    elif(kind == "constant"):
+        values = np.full(n, 21.5)
+    else:
+        values = rng.choice([0.0, -0.0, np.inf, -np.inf, np.nan, 5e-324, 1e308], n)
+    data = encodeBlock(3, times, values)
+    series, decodedTimes, decodedValues, offset = decodeBlock(data)
+
+    assert series == 3 and offset == len(data)
+    assert decodedTimes.tolist() == times.tolist()
+    assert decodedValues.view(np.uint64).tolist() == values.view(np.uint64).tolist()
+
+    # Single point
+    series, decodedTimes, decodedValues, offset = decodeBlock(encodeBlock(0, [-5], [1.5]))
+    assert decodedTimes.tolist() == [-5] and decodedValues.tolist() == [1.5]
+
+    with pytest.raises(ValueError):
+        encodeBlock(0, [], [])
+
+    return
+
+def test_compression():
+    """Verify regular times and rounded values are compressed."""
+    n = 10000
+    times = 1700000000000000000 + np.arange(0, n, dtype=np.int64)*1000000000
+    values = np.round(20 + np.sin(np.arange(0, n)/100.0), 1)
+    data = encodeBlock(0, times, values)
+
+    assert len(data) < 2*n
+
+    return
+
+def test_stream():
+    """Verify series written in pieces are read back in blocks."""
+    stream = io.BytesIO()
+    writer = GorillaWriter(stream, blockSize=100)
+    for i in range(0, 10):
+        writer.write(i%2, np.arange(i*30, i*30 + 30), np.arange(0, 30)*float(i))
+    writer.flush()
+
+    # Blocks of each series are in time order
+    stream.seek(0)
+    blocks = list(readBlocks(stream, bufferSize=7))
+    assert [(series, len(times)) for series, times, values in blocks] == [(0, 100), (1, 100), (0, 50), (1, 50)]
+    for series in (0, 1):
+        times = np.concatenate([times for s, times, values in blocks if s == series])
+        assert times.tolist() == [t for i in range(series, 10, 2) for t in range(i*30, i*30 + 30)]
+
+    # Stream which is truncated or not encoded
+    with pytest.raises(ValueError):
+        list(readBlocks(io.BytesIO(stream.getvalue()[0:-1])))
+    with pytest.raises(ValueError):
+        list(readBlocks(io.BytesIO(b"not encoded")))
+
+    return
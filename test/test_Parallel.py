@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""test_Parallel.py: unit tests for Parallel module."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import SdtFilter, DeadbandFilter, PlaFilter
+from pydbfilter.Parallel import filterParallel
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def createSeries(n):
+    """ Creates a random walk series with nanosecond integer times. """
+    generator = np.random.default_rng(1)
+    times = 1700000000000000000 + np.arange(0, n, dtype=np.int64)*1000000000
+    values = np.cumsum(generator.random(n)*2 - 1)
+    return times, values
+
+def filterSequential(times, values, className, *args):
+    """ Returns the output of a filter run over the whole series. """
+    filter = className(*args)
+    results = filter.filterPoints(list(zip(times.tolist(), values.tolist())))
+    for point in filter.flush():
+        if(len(results) == 0 or results[-1][0] != point[0]):
+            results += [point]
+    return results
+
+@pytest.mark.parametrize("chunks", [1, 2, 5])
+def test_deadband(chunks):
+    """Verify the output of input points matches sequential filtering."""
+    times, values = createSeries(2000)
+
+    assert filterParallel(times, values, DeadbandFilter, 0.5, 1e12, chunks=chunks, processes=2) \
+        == filterSequential(times, values, DeadbandFilter, 0.5, 1e12)
+
+    return
+
+@pytest.mark.parametrize("className", [SdtFilter, PlaFilter])
+def test_generated_points(className):
+    """Verify the output of generated points matches sequential filtering\
+        except for rounding."""
+    times, values = createSeries(5000)
+
+    results = filterParallel(times, values, className, 0.5, 1e12, chunks=4, processes=2)
+    expected = filterSequential(times, values, className, 0.5, 1e12)
+    assert len(results) == len(expected)
+    assert np.abs(np.array([r[0] for r in results]) - np.array([r[0] for r in expected])).max() <= 1000
+    assert np.allclose([r[1] for r in results], [r[1] for r in expected], rtol=0, atol=1e-6)
+
+    return
+
+def test_short_series():
+    """Verify series with fewer points than chunks are filtered."""
+    times, values = createSeries(3)
+
+    assert filterParallel(times, values, SdtFilter, 0.5, 1e12, chunks=8, processes=2) \
+        == filterSequential(times, values, SdtFilter, 0.5, 1e12)
+    assert filterParallel(times[0:0], values[0:0], SdtFilter, 0.5, 1e12, chunks=2) == []
+
+    return
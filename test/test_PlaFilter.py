@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""test_PlaFilter.py: unit tests for PlaFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import PlaFilter, SdtFilter, Analysis
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_filterpoints():
+    """Verify a segment is output for each line."""
+    filter = PlaFilter(0.1, 1000)
+    data = [(100, 1), (110, 1.5), (120, 2), (130, 2.5), (140, 3), (150, 2), (160, 1)]
+
+    assert filter.filterPoints(data) == [(100, pytest.approx(1)), (140, pytest.approx(3))]
+    assert filter.flush() == [(150, pytest.approx(2)), (160, pytest.approx(1))]
+    assert filter.flush() == []
+
+    return
+
+def test_maximum_interval():
+    """Verify segments are no longer than the maximum interval."""
+    filter = PlaFilter(0.1, 20)
+    data = [(100, 1), (110, 1), (120, 1), (130, 1), (140, 1)]
+
+    assert filter.filterPoints(data) + filter.flush() == [(100, 1), (120, 1), (130, 1), (140, 1)]
+
+    return
+
+def test_error_bound():
+    """Verify the linear reconstruction is within the maximum error, with\
+       fewer points than SDT within the same error."""
+    generator = np.random.default_rng(1)
+    times = 1700000000000000000 + np.arange(0, 500, dtype=np.int64)*1000000000
+    values = np.cumsum(generator.random(500)*2 - 1)
+    data = list(zip(times.tolist(), values.tolist()))
+    filter = PlaFilter(0.5, 1e12)
+
+    results = filter.filterPoints(data) + filter.flush()
+    result = Analysis.compareSeries(times, values, [r[0] for r in results], [r[1] for r in results],
+        Analysis.interpolationFor(filter))
+    assert result["maxError"] <= 0.5 + 1e-9
+
+    # SDT with half the deviation is within the same error
+    sdt = SdtFilter(0.25, 1e12)
+    sdtResults = sdt.filterPoints(data) + sdt.flush()
+    assert Analysis.compareSeries(times, values, [r[0] for r in sdtResults], [r[1] for r in sdtResults],
+        Analysis.interpolationFor(sdt))["maxError"] <= 0.5
+    assert len(results) < len(sdtResults)
+
+    return
+
+def test_invalid():
+    """Verify points which are not newer raise exception."""
+    filter = PlaFilter(0.1, 100)
+    filter.filterPoint(100, 1)
+    with pytest.raises(ValueError):
+        filter.filterPoint(90, 1)
+
+    return
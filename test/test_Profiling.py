@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""test_Profiling.py: unit tests for Profiling module."""
+
+# Import built-in modules
+import pstats
+import sys
+import tracemalloc
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import FilterTree, DeadbandFilter
+from pydbfilter import Profiling
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def run():
+    """ Filters points of two series. """
+    tree = FilterTree(DeadbandFilter, 1.0, 1e9)
+    for time in range(0, 10):
+        for host in ("a", "b"):
+            with Profiling.stage("point"):
+                tree.walk([("host", host)]).filterPoint(time, float(time))
+            Profiling.count("points")
+    return
+
+def test_disabled():
+    """Verify the hooks and filter methods are unchanged while disabled."""
+    original = DeadbandFilter.__dict__["filterPoint"]
+    events = list()
+
+    def callback(kind, name, value):
+        events.append((kind, name))
+        return
+
+    Profiling.addCallback(callback)
+    assert DeadbandFilter.__dict__["filterPoint"] is not original
+    run()
+    Profiling.removeCallback(callback)
+    assert ("stage", "point") in events and ("count", "points") in events
+    assert ("call", "DeadbandFilter.filterPoint") in events and ("call", "FilterTree.walk") in events
+
+    # No events once the last callback is removed
+    events.clear()
+    run()
+    assert events == []
+    assert DeadbandFilter.__dict__["filterPoint"] is original
+    assert Profiling.stage is Profiling._disabledStage and Profiling.count is Profiling._disabledCount
+
+    return
+
+def test_profile():
+    """Verify stages, calls and counters are totalled."""
+    profile = Profiling.Profile()
+    profile.start()
+    run()
+    profile.stop()
+
+    assert profile.stages["point"][0] == 20
+    assert profile.calls["DeadbandFilter.filterPoint"][0] == 20
+    # Walk is called for the root and each tag of the tree
+    assert profile.calls["FilterTree.walk"][0] == 40
+    assert profile.counters == {"points" : 20}
+    report = profile.report()
+    assert "DeadbandFilter.filterPoint" in report and "points" in report
+
+    return
+
+def test_dump(tmp_path):
+    """Verify cProfile statistics and a tracemalloc snapshot are written."""
+    prefix = str(tmp_path/"run")
+    profile = Profiling.Profile(prefix)
+    profile.start()
+    with profile.thread():
+        run()
+    profile.stop()
+
+    assert "run" in [function for filename, line, function in pstats.Stats(prefix + ".pstats").stats.keys()]
+    assert len(tracemalloc.Snapshot.load(prefix + ".tracemalloc").traces) > 0
+    assert not tracemalloc.is_tracing()
+
+    return
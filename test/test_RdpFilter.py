@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""test_RdpFilter.py: unit tests for RdpFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import RdpFilter, Analysis
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_filterpoints():
+    """Verify the points of a line are removed and corners kept."""
+    filter = RdpFilter(0.1, 1000)
+    data = [(100, 1), (110, 1.5), (120, 2), (130, 2.5), (140, 3), (150, 2), (160, 1)]
+
+    assert filter.filterPoints(data) == [(100, 1)]
+    assert filter.flush() == [(140, 3), (160, 1)]
+
+    return
+
+def test_maximum_interval():
+    """Verify kept points are no further apart than the maximum interval."""
+    filter = RdpFilter(0.1, 20)
+    data = [(100, 1), (110, 1), (120, 1), (130, 1), (140, 1)]
+
+    assert filter.filterPoints(data) + filter.flush() == [(100, 1), (120, 1), (140, 1)]
+
+    return
+
+@pytest.mark.parametrize("chunkSize", [3, 10, 1000])
+def test_error_bound(chunkSize):
+    """Verify the linear reconstruction is within the maximum error."""
+    generator = np.random.default_rng(1)
+    times = 1700000000000000000 + np.arange(0, 500, dtype=np.int64)*1000000000
+    values = np.cumsum(generator.random(500)*2 - 1)
+    filter = RdpFilter(0.5, 1e12, chunkSize=chunkSize)
+
+    results = filter.filterPoints(list(zip(times.tolist(), values.tolist()))) + filter.flush()
+    result = Analysis.compareSeries(times, values, [r[0] for r in results], [r[1] for r in results],
+        Analysis.interpolationFor(filter))
+    assert result["maxError"] <= 0.5
+    assert result["ratio"] > 1
+
+    # Kept points are input points
+    assert not filter.generatesPoints
+    assert set([r[0] for r in results]) <= set(times.tolist())
+
+    return
+
+def test_invalid():
+    """Verify invalid parameters and points raise exception."""
+    with pytest.raises(ValueError):
+        RdpFilter(0.1, 100, chunkSize=2)
+
+    filter = RdpFilter(0.1, 100)
+    filter.filterPoint(100, 1)
+    with pytest.raises(ValueError):
+        filter.filterPoint(100, 1)
+
+    return
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""test_ReorderFilter.py: unit tests for ReorderFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import ReorderFilter, DeadbandFilter, FilterTree
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_reorder():
+    """Verify late points within the window are filtered in time order."""
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=20)
+
+    assert filter.filterPoint(100, 1) == []
+    assert filter.filterPoint(120, 1.1) == [(100, 1)]
+    assert filter.filterPoint(110, 0.9) == []
+    assert filter.filterPoint(150, 1.2) == []
+    assert filter.filterPoint(140, 1.3) == []
+    assert filter.filterPoint(170, 1.1) == [(140, 1.3)]
+    assert filter.flush() == [(170, 1.1), (170, 1.1)]
+
+    # Output matches the points filtered in time order
+    data = [(100, 1), (120, 1.1), (110, 0.9), (150, 1.2), (140, 1.3), (170, 1.1), (160, 1.0)]
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=20)
+    expected = DeadbandFilter(0.1, 100)
+    assert (filter.filterPoints(data) + filter.flush()
+        == expected.filterPoints(sorted(data)) + expected.flush())
+
+    return
+
+def test_duplicates():
+    """Verify duplicate points are counted and dropped."""
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=10)
+
+    assert filter.filterPoint(100, 1) == []
+    assert filter.filterPoint(100, 2) == []
+    assert filter.filterPoint(110, 1) == [(100, 1)]
+    assert filter.filterPoint(100, 3) == []
+    assert filter.duplicates == 2
+    assert filter.late == 0
+
+    # Duplicates of points before the last released point are late
+    assert filter.filterPoint(120, 1) == []
+    assert filter.filterPoint(100, 4) == []
+    assert filter.duplicates == 2
+    assert filter.late == 1
+
+    return
+
+def test_late_policy():
+    """Verify handling of points older than the reorder window."""
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=10, latePolicy="drop")
+    filter.filterPoints([(100, 1), (120, 1)])
+    assert filter.filterPoint(90, 5) == []
+    assert filter.late == 1
+
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=10, latePolicy="forward")
+    filter.filterPoints([(100, 1), (120, 1)])
+    assert filter.filterPoint(90, 5) == [(90, 5)]
+
+    filter = ReorderFilter(DeadbandFilter, 0.1, 100, reorderWindow=10, latePolicy="raise")
+    filter.filterPoints([(100, 1), (120, 1)])
+    with pytest.raises(ValueError):
+        filter.filterPoint(90, 5)
+
+    with pytest.raises(ValueError):
+        ReorderFilter(DeadbandFilter, 0.1, 100, latePolicy="ignore")
+
+    return
+
+def test_capacity():
+    """Verify the buffer is bounded by its capacity."""
+    filter = ReorderFilter(DeadbandFilter, 0.1, 1000, reorderWindow=1000, reorderCapacity=2)
+
+    assert filter.filterPoint(100, 1) == []
+    assert filter.filterPoint(110, 2) == []
+    assert filter.filterPoint(120, 3) == [(100, 1)]
+    assert filter.maxDepth == 2
+
+    return
+
+def test_filtertree():
+    """Verify reorder filters may be created by a filter tree."""
+    tree = FilterTree(ReorderFilter, DeadbandFilter, 0.1, 100, reorderWindow=20)
+    filter = tree.walk([("location", "italy")])
+
+    assert filter.filterPoint(120, 1) == []
+    assert filter.filterPoint(110, 1) == []
+    assert filter.filterPoint(140, 1) == [(110, 1)]
+    assert filter.generatesPoints is False
+
+    return
@@ -5,7 +5,8 @@
 import sys
 
 # Import third-party modules
-from pandas import DataFrame, testing
+from pandas import DataFrame, Series, testing, to_datetime
+import pytest
 
 # Import custom modules
 sys.path.append('../')
@@ -61,6 +62,60 @@ def test_filterpoints_df():
     
     return
 
+def test_filterpoint_epoch_ns():
+    """Verify integer nanosecond times beyond float precision are exact."""
+    filter = SdtFilter(10, 100)
+    offset = 1700000000000000000
+
+    assert filter.filterPoint(offset + 100, 20) == [(offset + 100, 20)]
+    assert filter.filterPoint(offset + 110, 10) == []
+    assert filter.filterPoint(offset + 120, 20) == []
+    assert filter.filterPoint(offset + 140, 40) == [(offset + 130, 25)]
+    assert filter.filterPoint(offset + 150, 30) == []
+    assert filter.filterPoint(offset + 160, 45) == []
+    assert filter.filterPoint(offset + 180, 5) == [(offset + 166, 33)]
+    assert filter.flush() == [(offset + 180, 5)]
+
+    return
+
+def test_filterpoints_datetime_df():
+    """Verify filterpoints() method with a datetime64 time column."""
+    filter = SdtFilter(10,100)
+    offset = 1700000000000000000
+
+    data = DataFrame({
+                    "t" : to_datetime([offset + t for t in [100,110,120,140,150,160,180]]),
+                    "v" : [20,10,20,40,30,45,5]
+                    })
+    expected = DataFrame({
+                    "t" : to_datetime([offset + t for t in [100, 130, 166]]),
+                    "v" : [20, 25, 33]
+                    })
+    result = filter.filterPoints(data)
+    testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    return
+
+def test_filterpoints_series():
+    """Verify filterpoints() method creates a series of generated points."""
+    filter = SdtFilter(10,100)
+
+    data = Series([20,10,20,40,30,45,5], index=[100,110,120,140,150,160,180])
+    expected = Series([20, 25, 33], index=[100, 130, 166])
+    result = filter.filterPoints(data)
+    testing.assert_series_equal(result, expected, check_dtype=False, check_index_type=False)
+
+    return
+
+def test_filtermask():
+    """Verify filtermask() method is rejected for generated points."""
+    filter = SdtFilter(10,100)
+
+    data = Series([20,10,20], index=[100,110,120])
+    with pytest.raises(ValueError):
+        filter.filterMask(data)
+
+    return
 
 def test_timeout():
     """Verify filter() method timeout functionality."""
@@ -72,6 +127,18 @@ def test_timeout():
     
     return
 
+def test_timeout_window():
+    """Verify the window restarts at the last point after a timeout."""
+    filter = SdtFilter(0.5,20)
+
+    assert filter.filterPoint(0, 0) == [(0, 0)]
+    assert filter.filterPoint(20, 0) == []
+    assert filter.filterPoint(21, 0.1) == [(20, 0)]
+    assert filter.filterPoint(22, 0.2) == []
+    assert len(filter.filterPoint(23, 3)) == 1
+
+    return
+
 def test_flush():
     """Verify flush() method."""
     filter = SdtFilter(10,100)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""test_SerialFilter.py: unit tests for SerialFilter class."""
+
+# Import built-in modules
+import os
+import subprocess
+import sys
+
+# Import third-party modules
+import numpy as np
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import DeadbandFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_import_without_pandas():
+    """Verify the filters are imported without pandas or numpy."""
+    script = ("import sys; import pydbfilter; "
+        "pydbfilter.DeadbandFilter(0.1, 100).filterPoints([(100, 1), (120, 2)]); "
+        "print('pandas' in sys.modules, 'numpy' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", script],
+        cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+        capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["False", "False"]
+
+    return
+
+def test_filtermask_arrays():
+    """Verify filtermask() method with datetime64 and value arrays."""
+    filter = DeadbandFilter(0.1, 100)
+
+    times = np.array([100,120,140,150,160,170,180], dtype="datetime64[ns]")
+    values = np.array([1,1.1,0.9,1.2,1.3,1.1,1])
+    assert filter.filterMask((times, values)).tolist() == [True, False, False, True, False, False, True]
+
+    return
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""test_Spool.py: unit tests for Spool class."""
+
+# Import built-in modules
+import os
+import sys
+import threading
+
+# Import third-party modules
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter.Spool import Spool
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def readAll(spool) -> list:
+    """ Returns the remaining records of a spool without waiting. """
+    records = list()
+    record = spool.next(0)
+    while(record is not None):
+        records += [record]
+        record = spool.next(0)
+    return records
+
+def test_append_next(tmp_path):
+    """Verify records are returned in order across segments."""
+    spool = Spool(str(tmp_path), segmentSize=64)
+    payloads = [bytes([i])*20 for i in range(0, 10)]
+    for payload in payloads:
+        assert spool.append(payload)
+
+    records = readAll(spool)
+    assert [payload for position, payload in records] == payloads
+    assert len(os.listdir(str(tmp_path))) == 5
+
+    # Acknowledged segments are deleted
+    for position, payload in records:
+        spool.acknowledge(position)
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith(".log")] == ["00000000000000000004.log"]
+    spool.close()
+
+    return
+
+def test_replay(tmp_path):
+    """Verify records which were not acknowledged are replayed when reopened."""
+    spool = Spool(str(tmp_path), segmentSize=64)
+    for i in range(0, 6):
+        spool.append(b"record%d" % i)
+    records = readAll(spool)
+
+    # Later records acknowledged out of order are replayed with the earliest
+    spool.acknowledge(records[0][0])
+    spool.acknowledge(records[1][0])
+    spool.acknowledge(records[3][0])
+    spool.close()
+
+    spool = Spool(str(tmp_path), segmentSize=64)
+    assert [payload for position, payload in readAll(spool)] == [b"record2", b"record3", b"record4", b"record5"]
+
+    # Appends continue after the last record
+    spool.append(b"record6")
+    assert [payload for position, payload in readAll(spool)] == [b"record6"]
+    spool.close()
+
+    return
+
+def test_torn_record(tmp_path):
+    """Verify a record with a corrupt payload ends the log."""
+    spool = Spool(str(tmp_path), segmentSize=1024)
+    spool.append(b"complete")
+    spool.append(b"torn")
+    spool.close()
+
+    # Corrupt the payload of the second record
+    path = os.path.join(str(tmp_path), "00000000000000000000.log")
+    with open(path, "r+b") as file:
+        file.seek(8 + 8 + 8)
+        file.write(b"x")
+
+    spool = Spool(str(tmp_path), segmentSize=1024)
+    assert [payload for position, payload in readAll(spool)] == [b"complete"]
+    spool.append(b"next")
+    assert [payload for position, payload in readAll(spool)] == [b"next"]
+    spool.close()
+
+    return
+
+def test_maximum_size(tmp_path):
+    """Verify appends fail while the spool is full."""
+    spool = Spool(str(tmp_path), segmentSize=64, maxSize=128)
+    assert spool.append(b"a"*40)
+    assert spool.append(b"b"*40)
+    assert not spool.append(b"c"*40)
+    assert spool.size == 128
+
+    # Space is freed when segments are acknowledged
+    position, payload = spool.next(0)
+    spool.acknowledge(position)
+    assert spool.append(b"c"*40)
+    spool.close()
+
+    with pytest.raises(ValueError):
+        Spool(str(tmp_path), segmentSize=8)
+
+    return
+
+def test_wait(tmp_path):
+    """Verify next() waits for an append and returns None when closed."""
+    spool = Spool(str(tmp_path))
+    results = list()
+    reader = threading.Thread(target=lambda : results.extend([spool.next(10), spool.next(10)]))
+    reader.start()
+    spool.append(b"record")
+    while(len(spool._inFlight) == 0):
+        pass
+    spool.close()
+    reader.join()
+
+    assert results[0][1] == b"record"
+    assert results[1] is None
+
+    return
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""test_TickFilter.py: unit tests for TickFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import numpy as np
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import TickFilter, SdtFilter, DeadbandFilter, HysteresisFilter, ReorderFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+@pytest.mark.parametrize("className", [SdtFilter, DeadbandFilter, HysteresisFilter])
+def test_filtertick(className):
+    """Verify filterTick() matches a filter object for each series."""
+    generator = np.random.default_rng(1)
+    filter = TickFilter(className, 0.5, 20e9, capacity=4)
+    filters = [className(0.5, 20e9) for i in range(0, 50)]
+    values = np.cumsum(generator.random((100, 50))*2 - 1, axis=0)
+
+    results = [list() for i in range(0, 50)]
+    expected = [list() for i in range(0, 50)]
+    for tick in range(0, 100):
+        # A random subset of the series in each tick
+        series = generator.permutation(50)[0:40]
+        time = 1700000000000000000 + tick*1000000000
+        times = np.full(len(series), time, dtype=np.int64)
+        for i, t, v in zip(*filter.filterTick(series, times, values[tick, series])):
+            results[i] += [(t, v)]
+        for i in series.tolist():
+            expected[i] += filters[i].filterPoint(time, values[tick, i].item())
+
+    # Flush the last point of each series
+    for i, t, v in zip(*filter.flush()):
+        results[i] += [(t, v)]
+    for i in range(0, 50):
+        expected[i] += filters[i].flush()
+
+    assert results == expected
+
+    return
+
+def test_repeated_series():
+    """Verify several points of a series in one tick are filtered in order."""
+    filter = TickFilter(DeadbandFilter, 0.1, 100)
+
+    series, times, values = filter.filterTick([0, 1, 0, 0], [100, 100, 120, 140], [1, 5, 1.05, 1.2])
+    assert series.tolist() == [0, 1, 0]
+    assert times.tolist() == [100, 100, 140]
+    assert values.tolist() == [1, 5, 1.2]
+
+    series, times, values = filter.flush([0])
+    assert series.tolist() == [0]
+    assert times.tolist() == [140]
+
+    return
+
+def test_datetime():
+    """Verify datetime64 times are returned as datetime64."""
+    filter = TickFilter(SdtFilter, 0.1, 100)
+
+    series, times, values = filter.filterTick([0, 1], np.array([100, 100], dtype="datetime64[ns]"), [1, 2])
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert times.view(np.int64).tolist() == [100, 100]
+
+    filter.filterTick([0, 1], np.array([120, 120], dtype="datetime64[ns]"), [1, 2])
+    series, times, values = filter.flush()
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert times.view(np.int64).tolist() == [120, 120]
+
+    return
+
+def test_series_ids():
+    """Verify seriesIds() assigns a number to each new key."""
+    filter = TickFilter(DeadbandFilter, 0.1, 100)
+
+    assert filter.seriesIds([("a", "x"), ("b", "x"), ("a", "x")]).tolist() == [0, 1, 0]
+    assert filter.seriesIds([("c", "x"), ("b", "x")]).tolist() == [2, 1]
+
+    return
+
+def test_unsupported():
+    """Verify a filter class without a kernel raises exception."""
+    with pytest.raises(ValueError):
+        TickFilter(ReorderFilter, DeadbandFilter, 0.1, 100)
+
+    return
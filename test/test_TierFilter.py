@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""test_TierFilter.py: unit tests for TierFilter class."""
+
+# Import built-in modules
+import sys
+
+# Import third-party modules
+import pytest
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import TierFilter, DeadbandFilter, SdtFilter, ReorderFilter, FilterTree
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_filterpoint():
+    """Verify each tier matches a filter with the same parameters."""
+    filter = TierFilter((DeadbandFilter, 0.1, 100), (DeadbandFilter, 0.5, 1000))
+    tight = DeadbandFilter(0.1, 100)
+    loose = DeadbandFilter(0.5, 1000)
+
+    assert len(filter) == 2
+    for time, value in [(100, 1), (120, 1.2), (140, 1.3), (160, 1.7), (180, 1.0)]:
+        assert filter.filterPoint(time, value) == [tight.filterPoint(time, value), loose.filterPoint(time, value)]
+    assert filter.flush() == [tight.flush(), loose.flush()]
+
+    return
+
+def test_filterpoints():
+    """Verify filterpoints() method returns the output of each tier."""
+    filter = TierFilter((SdtFilter, 0.1, 100), (DeadbandFilter, 0.5, 1000))
+    data = [(100, 1), (120, 1.2), (140, 1.3), (160, 1.7), (180, 1.0)]
+
+    assert filter.generatesPoints
+    assert filter.filterPoints(data) == [SdtFilter(0.1, 100).filterPoints(data),
+                                         DeadbandFilter(0.5, 1000).filterPoints(data)]
+
+    return
+
+def test_kwargs():
+    """Verify keyword arguments are passed to every tier."""
+    filter = TierFilter((ReorderFilter, DeadbandFilter, 0.1, 100), (ReorderFilter, DeadbandFilter, 0.5, 1000),
+        reorderWindow=20)
+
+    assert filter.filterPoint(100, 1) == [[], []]
+    assert filter.filterPoint(130, 2) == [[(100, 1)], [(100, 1)]]
+
+    with pytest.raises(ValueError):
+        TierFilter()
+
+    return
+
+def test_filtertree():
+    """Verify a tree of tiers shares the tree walk and flushes each tier."""
+    tree = FilterTree(TierFilter, (DeadbandFilter, 0.1, 100), (DeadbandFilter, 0.5, 1000))
+
+    filter = tree.walk([("location","italy")])
+    filter.filterPoint(100, 1)
+    filter.filterPoint(120, 1.2)
+
+    assert tree.flushAll() == [([(("location","italy"),)], [120], [1.2]),
+                               ([(("location","italy"),)], [120], [1.2])]
+
+    return
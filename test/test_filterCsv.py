@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""test_filterCsv.py: unit tests for filterCsv program."""
+
+# Import built-in modules
+import os
+import subprocess
+import sys
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+import pytest
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def writeExport(filename, times, values):
+    """ Writes the points of a series as an influxdb v2 annotated CSV export. """
+    dfExport = pd.DataFrame({
+        "result" : "",
+        "table" : 0,
+        "_start" : pd.to_datetime(times[0]),
+        "_stop" : pd.to_datetime(times[-1]),
+        "_time" : pd.to_datetime(times),
+        "_value" : values,
+        "_field" : "value",
+        "_measurement" : "load",
+        "host" : "a"
+        })
+    with open(filename, "w") as file:
+        file.write("#group,false,false,true,true,false,false,true,true,true\n")
+        file.write("#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string\n")
+        file.write("#default,_result,,,,,,,,\n")
+        dfExport.to_csv(file, index = False)
+    return
+
+@pytest.mark.parametrize("method", ["rdp", "pla"])
+def test_flush_held_points(tmp_path, method):
+    """Verify points held by offline filters are written without --lastvalue."""
+    times = 1700000000000000000 + np.arange(0, 100, dtype=np.int64)*1000000000
+    values = np.sin(np.arange(0, 100)/10)
+    writeExport(tmp_path / "input.csv", times, values)
+
+    subprocess.run([sys.executable, "filterCsv.py", str(tmp_path / "input.csv"), str(tmp_path / "output.csv"),
+        "--method", method, "--fields", "load", "value", "0.05", "1e12", "--tags", "host"],
+        cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."), check=True)
+    dfOutput = pd.read_csv(tmp_path / "output.csv")
+    assert len(dfOutput) > 2
+    assert dfOutput["_time"].iloc[-1] == times[-1]
+    assert dfOutput["_value"].iloc[-1] == pytest.approx(values[-1], abs=0.05)
+    assert (dfOutput["host"] == "a").all()
+
+    return
+
+def test_split_input(tmp_path):
+    """Verify files filtered in time order match the filtering of a single file."""
+    times = 1700000000000000000 + np.arange(0, 200, dtype=np.int64)*1000000000
+    values = np.sin(np.arange(0, 200)/10)
+    writeExport(tmp_path / "input.csv", times, values)
+
+    # File names are in the reverse of time order
+    (tmp_path / "split").mkdir()
+    writeExport(tmp_path / "split" / "b.csv", times[:100], values[:100])
+    writeExport(tmp_path / "split" / "a.csv", times[100:], values[100:])
+
+    arguments = ["--method", "sdt", "--fields", "load", "value", "0.05", "1e12", "--tags", "host", "--lastvalue"]
+    cwd = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    subprocess.run([sys.executable, "filterCsv.py", str(tmp_path / "input.csv"), str(tmp_path / "output.csv")]
+        + arguments, cwd=cwd, check=True)
+    subprocess.run([sys.executable, "filterCsv.py", str(tmp_path / "split"), str(tmp_path / "sharded")]
+        + arguments, cwd=cwd, check=True)
+
+    # Each input file has its shard, and the shards in time order are the single output
+    assert sorted(os.listdir(tmp_path / "sharded")) == ["a.csv", "b.csv"]
+    dfOutput = pd.read_csv(tmp_path / "output.csv")
+    dfSharded = pd.concat([pd.read_csv(tmp_path / "sharded" / "b.csv"),
+        pd.read_csv(tmp_path / "sharded" / "a.csv")], ignore_index = True)
+    assert len(dfOutput) > 2
+    columns = ["_time", "_value", "host"]
+    pd.testing.assert_frame_equal(dfSharded[columns], dfOutput[columns])
+
+    return
+
+def test_no_input_files(tmp_path):
+    """Verify a directory or glob pattern without CSV files is an error."""
+    cwd = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    for infile in [str(tmp_path), str(tmp_path / "*.csv")]:
+        result = subprocess.run([sys.executable, "filterCsv.py", infile, str(tmp_path / "output"),
+            "--fields", "load", "value", "0.05", "1e12"], cwd=cwd, capture_output=True, text=True)
+        assert result.returncode == 2
+        assert "no CSV files match" in result.stderr
+    assert not os.path.exists(tmp_path / "output")
+
+    return
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""test_influxFilterProxy.py: unit tests for influxFilterProxy program."""
+
+# Import built-in modules
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+# Import custom modules
+sys.path.append('../')
+sys.path.append('../tools')
+from pydbfilter import BoundedFilterTree, DeadbandFilter, FilterTree
+from pydbfilter.Spool import Spool
+from influxFilterProxy import SpoolForwarder, ThreadedTCPServer, encodeBatch, keepFilterState, serveHandover, takeOver
+from influxFilterProxy import tokenId
+from stubInflux import StubInfluxHttpHandler, StubStatistics, startStubServer
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def waitFor(condition, timeout = 10) -> bool:
+    """ Waits for a condition to become true, returning its value. """
+    deadline = time.monotonic() + timeout
+    while(not condition() and time.monotonic() < deadline):
+        time.sleep(0.01)
+    return condition()
+
+def spoolBatches(directory, batches):
+    """ Writes batches of the bucket, token and points to a spool left by a\
+        previous run. """
+    spool = Spool(directory, segmentSize = 256)
+    for bucket, token, points in batches:
+        spool.append(encodeBatch(bucket, "org", tokenId(token), points))
+    spool.close()
+    return
+
+def test_import_without_pandas():
+    """Verify the proxy starts without importing pandas or pyarrow."""
+    script = ("import sys; import influxFilterProxy; "
+        "print('pandas' in sys.modules, 'pyarrow' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", script],
+        cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+        capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["False", "False"]
+
+    return
+
+def test_forward_unknown_token(tmp_path):
+    """Verify batches of an unknown token wait without holding up others."""
+    StubInfluxHttpHandler.statistics = StubStatistics()
+    server = startStubServer("127.0.0.1", 0)
+    url = "http://127.0.0.1:{0}".format(server.server_address[1])
+    points = [{"measurement" : "load", "tags" : {"host" : "a"}, "fields" : {"value" : 1.0}, "time" : 100}]
+    spoolBatches(str(tmp_path), [("old", "rotated", points)]*3 + [("new", "current", points)])
+
+    # Batches of the unknown token are set aside by the only thread
+    spool = Spool(str(tmp_path), segmentSize = 256)
+    forwarder = SpoolForwarder(spool, url, concurrency = 1)
+    forwarder.addToken("current")
+    forwarder.start()
+    assert waitFor(lambda : StubInfluxHttpHandler.statistics.buckets.get("new") == 1)
+    assert forwarder.waiting == 3
+
+    # Batches are forwarded once a request with their token is received
+    forwarder.addToken("rotated")
+    assert waitFor(lambda : StubInfluxHttpHandler.statistics.buckets.get("old") == 3)
+    assert forwarder.waiting == 0
+    forwarder.stop()
+    spool.close()
+
+    spool = Spool(str(tmp_path), segmentSize = 256)
+    assert spool.next(0) is None
+    spool.close()
+    server.shutdown()
+    server.server_close()
+
+    return
+
+def test_expire_unknown_token(tmp_path):
+    """Verify batches of a token which is never received are discarded."""
+    StubInfluxHttpHandler.statistics = StubStatistics()
+    server = startStubServer("127.0.0.1", 0)
+    url = "http://127.0.0.1:{0}".format(server.server_address[1])
+    points = [{"measurement" : "load", "tags" : {}, "fields" : {"value" : 1.0}, "time" : 100}]
+    spoolBatches(str(tmp_path), [("old", "rotated", points)]*3)
+
+    spool = Spool(str(tmp_path), segmentSize = 256)
+    forwarder = SpoolForwarder(spool, url, concurrency = 2, tokenTimeout = 0.1)
+    forwarder.start()
+    assert waitFor(lambda : spool.size == 256 and forwarder.waiting == 0)
+    forwarder.stop()
+    spool.close()
+
+    # Discarded batches are acknowledged, so are not replayed
+    assert StubInfluxHttpHandler.statistics.points == 0
+    spool = Spool(str(tmp_path), segmentSize = 256)
+    assert spool.next(0) is None
+    spool.close()
+    server.shutdown()
+    server.server_close()
+
+    return
+
+def test_handover(tmp_path):
+    """Verify the listening socket, filters and tokens are handed over."""
+    server = ThreadedTCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler)
+    serverThread = threading.Thread(target = server.serve_forever)
+    serverThread.start()
+
+    # Filters of several series, some of which are spilled
+    measurements = {"load" : {
+        "value" : BoundedFilterTree(DeadbandFilter, 0.5, 1e12, maxSeries = 2),
+        "other" : FilterTree(DeadbandFilter, 0.5, 1e12)}}
+    for host in range(0, 5):
+        for field, tree in measurements["load"].items():
+            tree.walk([("host", "h{0}".format(host))]).filterPoint(100, float(host))
+    spool = Spool(str(tmp_path / "spool"))
+    forwarder = SpoolForwarder(spool, "http://127.0.0.1:1")
+    identifier = forwarder.addToken("secret")
+
+    # The old process interrupts its main thread once the state is received
+    interrupted = list()
+    previousHandler = signal.signal(signal.SIGINT, lambda signalNumber, frame : interrupted.append(signalNumber))
+    try:
+        path = str(tmp_path / "handover.sock")
+        handoverThread = threading.Thread(target = serveHandover,
+            args = (path, server, measurements, spool, forwarder, 0.1))
+        handoverThread.start()
+        assert waitFor(lambda : os.path.exists(path))
+        listenSocket, previousMeasurements, tokens = takeOver(path)
+        handoverThread.join()
+        assert waitFor(lambda : len(interrupted) > 0)
+    finally:
+        signal.signal(signal.SIGINT, previousHandler)
+    serverThread.join()
+
+    assert listenSocket.getsockname() == server.server_address
+    assert listenSocket.getsockopt(socket.SOL_SOCKET, socket.SO_ACCEPTCONN) == 1
+    assert tokens == {identifier : "secret"}
+    copy = previousMeasurements["load"]["value"]
+    assert copy.spilled == 4 and copy.resident == 1
+    for field, tree in measurements["load"].items():
+        assert sorted(zip(*previousMeasurements["load"][field].flushAll())) == sorted(zip(*tree.flushAll()))
+
+    # Filters are kept only for fields with the same configuration
+    newMeasurements = {"load" : {
+        "value" : BoundedFilterTree(DeadbandFilter, 0.5, 1e12, maxSeries = 2),
+        "other" : FilterTree(DeadbandFilter, 0.7, 1e12)}}
+    other = newMeasurements["load"]["other"]
+    keepFilterState(newMeasurements, previousMeasurements)
+    assert newMeasurements["load"]["value"] is copy
+    assert newMeasurements["load"]["other"] is other
+
+    listenSocket.close()
+    server.server_close()
+    measurements["load"]["value"].close()
+    copy.close()
+
+    return
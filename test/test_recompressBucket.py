@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""test_recompressBucket.py: unit tests for recompressBucket program."""
+
+# Import built-in modules
+import json
+import sys
+
+# Import custom modules
+sys.path.append('../')
+sys.path.append('../tools')
+from pydbfilter import DeadbandFilter
+from recompressBucket import Recompressor, splitRanges
+from stubInflux import StubInfluxHttpHandler, StubStatistics, startStubServer
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Start of the first day of 2024 and an hour in nanoseconds
+START = 1704067200*10**9
+HOUR = 3600*10**9
+
+def recompress(url, checkpoint) -> Recompressor:
+    """ Returns a recompressor of the load field of the stub with small batches. """
+    return Recompressor(url, "token", "org", "source", "target", {("load", "value") : (0.5, 1e12)},
+        DeadbandFilter, workers = 2, writers = 2, batchSize = 20, retries = 0, checkpoint = checkpoint)
+
+def test_recompress(tmp_path):
+    """Verify ranges are filtered into the target bucket and checkpointed."""
+    StubInfluxHttpHandler.statistics = StubStatistics()
+    StubInfluxHttpHandler.querySeries = 3
+    StubInfluxHttpHandler.queryPoints = 2400
+    StubInfluxHttpHandler.rejectStatus = None
+    server = startStubServer("127.0.0.1", 0)
+    url = "http://127.0.0.1:{0}".format(server.server_address[1])
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+
+    # Each range of an hour has 100 points of each series
+    ranges = splitRanges(START, START + 3*HOUR, HOUR)
+    recompressor = recompress(url, checkpoint)
+    assert recompressor.run(ranges) == 0
+    assert recompressor.pointsIn == 900
+    assert 0 < recompressor.pointsOut < 900
+    assert StubInfluxHttpHandler.statistics.buckets == {"target" : recompressor.pointsOut}
+    assert StubInfluxHttpHandler.statistics.invalid == 0
+    with open(checkpoint) as file:
+        records = [json.loads(line) for line in file]
+    assert sorted([(record["start"], record["stop"]) for record in records]) == ranges
+    assert sum([record["points_out"] for record in records]) == recompressor.pointsOut
+
+    # Completed ranges are skipped, and a rejected range is not checkpointed
+    StubInfluxHttpHandler.rejectStatus = 400
+    recompressor = recompress(url, checkpoint)
+    assert recompressor.run(splitRanges(START, START + 4*HOUR, HOUR)) == 1
+    assert recompressor.pointsIn == 300
+    with open(checkpoint) as file:
+        assert len(file.readlines()) == 3
+
+    StubInfluxHttpHandler.rejectStatus = None
+    server.shutdown()
+    server.server_close()
+
+    return
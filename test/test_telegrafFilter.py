@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""test_telegrafFilter.py: unit tests for TelegrafFilter class."""
+
+# Import built-in modules
+import io
+import sys
+
+# Import custom modules
+sys.path.append('../')
+from pydbfilter import FilterTree, DeadbandFilter
+from telegrafFilter import TelegrafFilter
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def test_repeated_timestamp():
+    """Verify a repeated timestamp is dropped without stopping the processor."""
+    processor = TelegrafFilter({"cpu" : {"usage" : FilterTree(DeadbandFilter, 0.5, 1e12)}}, ["host"])
+    input = io.BytesIO(b"cpu,host=a usage=1 100\n"
+        b"cpu,host=a usage=5,other=1i 100\n"
+        b"cpu,host=a usage=5 200\n")
+    output = io.BytesIO()
+    processor.run(input, output)
+
+    assert processor.rejected == 1
+    assert output.getvalue().decode("UTF-8").split("\n") == [
+        "cpu,host=a usage=1.0 100",
+        "cpu,host=a other=1i 100",
+        "cpu,host=a usage=5.0 200",
+        "cpu,host=a usage=5.0 200",
+        ""]
+
+    return
+
+def test_flush_tags():
+    """Verify the last points are written with all the tags of their series."""
+    processor = TelegrafFilter({"cpu" : {"usage" : FilterTree(DeadbandFilter, 0.5, 1e12)}}, ["cpu"])
+    for line in ["cpu,cpu=c0,host=a usage=1 100", "cpu,cpu=c0,host=a usage=1.1 200", "cpu usage=2 100"]:
+        processor.handleLine(line)
+
+    assert sorted(processor.flush()) == [
+        "cpu usage=2.0 100\n",
+        "cpu,cpu=c0,host=a usage=1.1 200\n"]
+
+    return
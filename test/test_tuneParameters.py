@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""test_tuneParameters.py: unit tests for tuneParameters program."""
+
+# Import built-in modules
+import os
+import subprocess
+import sys
+
+# Import custom modules
+sys.path.append('../tools')
+from tuneParameters import STREAMING_METHODS, recommend, recommendedArguments, writeArguments
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Root directory of the repository
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def test_recommend(tmp_path):
+    """Verify the best setting within the error budget is recommended."""
+    results = [
+        ("sdt", 0.1, 60e9, 5.0, 0.1, 0.05),
+        ("deadband", 0.5, 60e9, 8.0, 0.5, 0.2),
+        ("deadband", 0.2, 60e9, 8.0, 0.2, 0.1),
+        ("hysteresis", 1.0, 60e9, 20.0, 1.0, 0.5)]
+    assert recommend(results) == results[3]
+    assert recommend(results, maxError = 0.5) == results[2]
+    assert recommend(results, rmsError = 0.05) == results[0]
+    assert recommend(results, maxError = 0.01) is None
+
+    # Arguments are written one per line for @file
+    filename = str(tmp_path / "arguments.txt")
+    writeArguments(filename, recommendedArguments(results[2], "load", "value"))
+    with open(filename) as file:
+        assert file.read() == "--method\ndeadband\n--fields\nload\nvalue\n0.2\n60000000000.0\n"
+
+    return
+
+def test_output_streaming(tmp_path):
+    """Verify the @file of the default sweep is accepted by the streaming scripts."""
+    filename = str(tmp_path / "arguments.txt")
+    subprocess.run([sys.executable, "tools/tuneParameters.py", "--generate", "500", "--measurement", "load",
+        "--thresholds", "0.1", "1", "3", "--intervals", "1e12", "--processes", "2", "--maxerror", "0.5", "--output", filename],
+        cwd=ROOT, capture_output=True, check=True)
+    with open(filename) as file:
+        assert file.read().split("\n")[1] in STREAMING_METHODS
+
+    # Processor exits at the end of its empty input once the arguments are accepted
+    output = subprocess.run([sys.executable, "telegrafFilter.py", "@" + filename],
+        cwd=ROOT, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    assert output.returncode == 0, output.stderr
+
+    return
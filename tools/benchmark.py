@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""benchmark.py: Measures throughput and cost of the pydbfilter filters."""
+
+# Import built-in modules
+import argparse
+import io
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Import third-party modules
+import numpy as np
+
+# Import custom modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pydbfilter import SdtFilter, DeadbandFilter, HysteresisFilter, ReorderFilter, TickFilter, RdpFilter, PlaFilter, Analysis
+from pydbfilter import Parallel, GorillaCodec
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Filter classes and the parameters used for the benchmarks
+FILTERS = {
+    "sdt" : (SdtFilter, 0.5, 1e12),
+    "deadband" : (DeadbandFilter, 0.5, 1e12),
+    "hysteresis" : (HysteresisFilter, 0.5, 1e12)
+    }
+
+def createSeries(n):
+    """ Creates a random walk series with nanosecond integer times. """
+    times = 1700000000000000000 + np.arange(0, n, dtype = np.int64)*1000000000
+    values = np.cumsum(np.random.random(n)*2 - 1)
+    return times, values
+
+def timeFilter(filter, points):
+    """ Returns the time taken and number of points output by a filter. """
+    started = time.perf_counter()
+    results = 0
+    for t, v in points:
+        results += len(filter.filterPoint(t, v))
+    results += len(filter.flush())
+    return time.perf_counter() - started, results
+
+def benchmarkFilters(n):
+    """ Measures the throughput of each filter. """
+    times, values = createSeries(n)
+    points = list(zip(times.tolist(), values.tolist()))
+    rows = list()
+    for name, (className, *args) in FILTERS.items():
+        elapsed, results = timeFilter(className(*args), points)
+        rows += [(name, n/elapsed, n/max(results, 1))]
+    return ["filter", "points/s", "ratio"], rows
+
+def benchmarkReorder(n, window = 10, disorder = 5):
+    """ Measures the throughput, memory and delay of the reorder window. """
+    times, values = createSeries(n)
+    interval = int(times[1] - times[0])
+
+    # Displace points by up to the disorder, in points
+    order = np.argsort(np.arange(0, n) + np.random.randint(0, disorder + 1, n), kind = "stable")
+    shuffled = list(zip(times[order].tolist(), values[order].tolist()))
+    ordered = list(zip(times.tolist(), values.tolist()))
+
+    rows = list()
+    for name, (className, *args) in FILTERS.items():
+        elapsed, results = timeFilter(className(*args), ordered)
+
+        # Throughput with the reorder window
+        filter = ReorderFilter(className, *args, reorderWindow = window*interval)
+        elapsedReorder = timeFilter(filter, shuffled)[0]
+
+        # Memory of the buffered points
+        filter = ReorderFilter(className, *args, reorderWindow = window*interval)
+        tracemalloc.start()
+        for t, v in shuffled[0:window]:
+            filter.filterPoint(t, v)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        rows += [(name, n/elapsed, n/elapsedReorder, 1e6*(elapsedReorder - elapsed)/n,
+            memory/window, window*interval/1e9)]
+
+    return ["filter", "points/s", "reorder points/s", "overhead us/point", "bytes/buffered point", "delay s"], rows
+
+def benchmarkTick(n, seriesCount = 1000):
+    """ Measures the throughput of a filter object for each series against\
+        the array state of TickFilter, for ticks of one point per series.\
+        Steps of the random walks are within a fifth of the threshold, so\
+        that most points take the fast path. """
+    ticks = max(n//seriesCount, 1)
+    times = 1700000000000000000 + np.arange(0, ticks, dtype = np.int64)*1000000000
+    values = np.cumsum(np.random.random((ticks, seriesCount))*0.2 - 0.1, axis = 0)
+    series = np.arange(0, seriesCount)
+
+    rows = list()
+    for name, (className, *args) in FILTERS.items():
+
+        # A filter object for each series
+        filters = [className(*args) for i in series]
+        started = time.perf_counter()
+        for tick in range(0, ticks):
+            t = int(times[tick])
+            for filter, v in zip(filters, values[tick].tolist()):
+                filter.filterPoint(t, v)
+        elapsed = time.perf_counter() - started
+
+        # Array state across series
+        filter = TickFilter(className, *args, capacity = seriesCount)
+        started = time.perf_counter()
+        for tick in range(0, ticks):
+            filter.filterTick(series, np.full(seriesCount, times[tick]), values[tick])
+        elapsedTick = time.perf_counter() - started
+
+        rows += [(name, ticks*seriesCount/elapsed, ticks*seriesCount/elapsedTick, elapsed/elapsedTick)]
+
+    return ["filter", "points/s", "tick points/s", "speedup"], rows
+
+def benchmarkAnalysis(n, seriesCount = 100):
+    """ Measures the throughput of rebuilding filtered series and comparing\
+        them with the input, for many series at once. """
+    rows = list()
+    for name, (className, *args) in FILTERS.items():
+        groups = list()
+        times = list()
+        values = list()
+        outputGroups = list()
+        outputTimes = list()
+        outputValues = list()
+        for group in range(0, seriesCount):
+            seriesTimes, seriesValues = createSeries(n//seriesCount)
+            filter = className(*args)
+            results = filter.filterPoints(list(zip(seriesTimes.tolist(), seriesValues.tolist()))) + filter.flush()
+            groups += [np.full(len(seriesTimes), group)]
+            times += [seriesTimes]
+            values += [seriesValues]
+            outputGroups += [group]*len(results)
+            outputTimes += [result[0] for result in results]
+            outputValues += [result[1] for result in results]
+        groups = np.concatenate(groups)
+        times = np.concatenate(times)
+        values = np.concatenate(values)
+
+        started = time.perf_counter()
+        Analysis.compareGroups(groups, times, values, outputGroups, np.array(outputTimes), outputValues,
+            Analysis.interpolationFor(filter))
+        elapsed = time.perf_counter() - started
+
+        rows += [(name, len(times)/elapsed, seriesCount)]
+
+    return ["filter", "points/s", "series"], rows
+
+def benchmarkOffline(n, maximumError = 0.5):
+    """ Measures the point count and runtime of the offline filters against\
+        SDT, with the measured error of each. SDT is also run with half the\
+        deviation, as its error may reach twice the deviation. """
+    times, values = createSeries(n)
+    points = list(zip(times.tolist(), values.tolist()))
+    filters = {
+        "sdt" : SdtFilter(maximumError, 1e15),
+        "sdt/2" : SdtFilter(maximumError/2, 1e15),
+        "rdp" : RdpFilter(maximumError, 1e15),
+        "pla" : PlaFilter(maximumError, 1e15)
+        }
+
+    rows = list()
+    for name, filter in filters.items():
+        started = time.perf_counter()
+        results = filter.filterPoints(points) + filter.flush()
+        elapsed = time.perf_counter() - started
+        error = Analysis.compareSeries(times, values, [result[0] for result in results],
+            [result[1] for result in results], Analysis.interpolationFor(filter))["maxError"]
+        rows += [(name, len(results), n/len(results), error, n/elapsed)]
+
+    return ["filter", "points", "ratio", "max error", "points/s"], rows
+
+def countUnmatched(results, expected, timeTolerance, tolerance):
+    """ Returns the number of points of the results without a point of the\
+        expected output within the time and value tolerances. """
+    times = np.array([point[0] for point in results], dtype = np.int64)
+    values = np.array([point[1] for point in results])
+    expectedTimes = np.array([point[0] for point in expected], dtype = np.int64)
+    expectedValues = np.array([point[1] for point in expected])
+
+    # Nearest expected point before and after each point
+    after = np.clip(np.searchsorted(expectedTimes, times), 0, len(expected) - 1)
+    before = np.clip(after - 1, 0, len(expected) - 1)
+    matched = np.zeros(len(results), dtype = bool)
+    for nearest in (before, after):
+        matched |= ((np.abs(expectedTimes[nearest] - times) <= timeTolerance)
+            & (np.abs(expectedValues[nearest] - values) <= tolerance))
+    return int((~matched).sum())
+
+def countDiffering(results, expected, timeTolerance = 1000, tolerance = 1e-6):
+    """ Returns the number of points of either output without a point of\
+        the other within the time and value tolerances, which allow for\
+        rounding of generated points. """
+    return (countUnmatched(results, expected, timeTolerance, tolerance)
+        + countUnmatched(expected, results, timeTolerance, tolerance))
+
+def benchmarkParallel(n, chunkCounts = (2, 4, 8)):
+    """ Measures the runtime of SDT over one series split into chunks\
+        against sequential filtering, with the number of points which\
+        differ from the sequential output and the measured error. """
+    times, values = createSeries(n)
+    points = list(zip(times.tolist(), values.tolist()))
+    filter = SdtFilter(0.5, 1e15)
+    started = time.perf_counter()
+    sequential = filter.filterPoints(points) + filter.flush()
+    elapsed = time.perf_counter() - started
+    error = Analysis.compareSeries(times, values, [result[0] for result in sequential],
+        [result[1] for result in sequential])["maxError"]
+
+    rows = [("sequential", len(sequential), 0, error, n/elapsed)]
+    for chunks in chunkCounts:
+        started = time.perf_counter()
+        results = Parallel.filterParallel(times, values, SdtFilter, 0.5, 1e15, chunks = chunks)
+        elapsed = time.perf_counter() - started
+        error = Analysis.compareSeries(times, values, [result[0] for result in results],
+            [result[1] for result in results])["maxError"]
+        rows += [("{0} chunks".format(chunks), len(results), countDiffering(results, sequential),
+            error, n/elapsed)]
+
+    return ["mode", "points", "differing", "max error", "points/s"], rows
+
+def benchmarkCodec(n):
+    """ Measures the size and speed of the Gorilla encoding of a sensor\
+        series, before and after deadband filtering, against CSV text. Speeds\
+        are of the 16 bytes of time and value of each point. """
+    times = 1700000000000000000 + np.arange(0, n, dtype = np.int64)*1000000000
+    values = np.round(20 + np.cumsum(np.random.random(n)*2 - 1), 1)
+    filter = DeadbandFilter(0.5, 1e12)
+    filtered = filter.filterPoints(list(zip(times.tolist(), values.tolist()))) + filter.flush()
+    cases = {
+        "raw" : (times, values),
+        "deadband" : (np.array([result[0] for result in filtered], dtype = np.int64),
+            np.array([result[1] for result in filtered]))
+        }
+
+    rows = list()
+    for name, (caseTimes, caseValues) in cases.items():
+        csvSize = sum([len("{0},{1!r}\n".format(t, v)) for t, v in zip(caseTimes.tolist(), caseValues.tolist())])
+        stream = io.BytesIO()
+        started = time.perf_counter()
+        writer = GorillaCodec.GorillaWriter(stream)
+        writer.write(0, caseTimes, caseValues)
+        writer.flush()
+        encodeElapsed = time.perf_counter() - started
+        stream.seek(0)
+        started = time.perf_counter()
+        for block in GorillaCodec.readBlocks(stream):
+            pass
+        decodeElapsed = time.perf_counter() - started
+        size = len(stream.getvalue())
+        rows += [(name, len(caseTimes), csvSize/len(caseTimes), size/len(caseTimes), csvSize/size,
+            16e-6*len(caseTimes)/encodeElapsed, 16e-6*len(caseTimes)/decodeElapsed)]
+
+    return ["series", "points", "csv bytes/point", "bytes/point", "ratio", "encode MB/s", "decode MB/s"], rows
+
+# Script run in a new interpreter to time an import
+IMPORT_SCRIPT = """
+import resource, sys, time
+started = time.perf_counter()
+{0}
+elapsed = time.perf_counter() - started
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "pandas" in sys.modules, "numpy" in sys.modules)
+"""
+
+def benchmarkImport(n, repeats = 5):
+    """ Measures the time and memory to import the package in a new\
+        interpreter, with and without the pandas integration. """
+    cases = {
+        "pydbfilter" : "import pydbfilter",
+        "pydbfilter+pandas" : "import pydbfilter, pydbfilter.PandasSupport",
+        "pandas" : "import pandas"
+        }
+    rows = list()
+    for name, statement in cases.items():
+        results = list()
+        for i in range(0, repeats):
+            output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT.format(statement)],
+                cwd = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+                capture_output = True, text = True, check = True).stdout.split()
+            results += [(float(output[0]), int(output[1]))]
+        rows += [(name, 1000*min([r[0] for r in results]), max([r[1] for r in results])/1024.0,
+            output[2], output[3])]
+    return ["import", "ms", "peak rss MB", "pandas", "numpy"], rows
+
+# Benchmarks which may be run
+BENCHMARKS = {
+    "filters" : benchmarkFilters,
+    "reorder" : benchmarkReorder,
+    "tick" : benchmarkTick,
+    "analysis" : benchmarkAnalysis,
+    "offline" : benchmarkOffline,
+    "parallel" : benchmarkParallel,
+    "codec" : benchmarkCodec,
+    "import" : benchmarkImport
+    }
+
+def printTable(title, header, rows):
+    """ Prints the results of a benchmark as a table. """
+    print(title)
+    print("  ".join(["{0:>20}".format(column) for column in header]))
+    for row in rows:
+        print("  ".join(["{0:>20.6g}".format(value) if isinstance(value, float)
+            else "{0:>20}".format(value) for value in row]))
+    print()
+    return
+
+# If run from command line
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Measures throughput and cost of the pydbfilter filters.")
+    parser.add_argument('benchmarks',
+        nargs="*",
+        default=[],
+        help="Benchmarks to run from {0} (all by default)".format(", ".join(BENCHMARKS.keys())))
+    parser.add_argument('--points',
+        type=int,
+        default=100000,
+        help="Number of points in each benchmark series")
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if(name not in BENCHMARKS.keys()):
+            parser.error("unknown benchmark {0}".format(name))
+
+    for name in args.benchmarks or BENCHMARKS.keys():
+        header, rows = BENCHMARKS[name](args.points)
+        printTable(name, header, rows)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+"""loadGenerator.py: Replays line protocol to the influx filter proxy and\
+ reports throughput, latency percentiles and error rates."""
+
+# Import built-in modules
+import argparse
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse as urlparse
+import zlib
+
+# Import third-party modules
+import numpy as np
+
+# Import custom modules
+from stubInflux import startStubServer, StubInfluxHttpHandler
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+def seriesKey(line):
+    """ Returns the series key (measurement and tag set) of a line. """
+    return line.split(" ", 1)[0]
+
+def readLines(filename):
+    """ Reads line protocol from a file, skipping blank and comment lines. """
+    with open(filename, "r") as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith("#")]
+
+def generateLines(nSeries, nPoints, measurement, field, interval, start = None):
+    """ Generates random walk series as line protocol, ordered by time. """
+    if(start is None):
+        start = time.time_ns() - nPoints*interval
+    values = np.cumsum(np.random.random((nPoints, nSeries))*2 - 1, axis = 0)
+    lines = list()
+    for i in range(0, nPoints):
+        timestamp = start + i*interval
+        for s in range(0, nSeries):
+            lines += ["{0},series=s{1} {2}={3!r} {4}".format(
+                measurement, s, field, float(values[i, s]), timestamp)]
+    return lines
+
+def encodeArrow(lines) -> bytes:
+    """ Encodes lines as an Arrow IPC stream with a row for each field.\
+        Escaped characters in line protocol are not supported. """
+    from pydbfilter import ArrowSupport
+
+    rows = list()
+    for line in lines:
+        key, fieldSet, timestamp = line.split(" ")
+        measurement, *tagSet = key.split(",")
+        tags = dict([tag.split("=", 1) for tag in tagSet])
+        for field in fieldSet.split(","):
+            name, value = field.split("=", 1)
+            rows += [(int(timestamp), float(value.rstrip("i")), measurement, name, tags)]
+
+    tagNames = sorted(set([name for row in rows for name in row[4].keys()]))
+    batch = ArrowSupport.createBatch([row[0] for row in rows], [row[1] for row in rows],
+        [row[2] for row in rows], [row[3] for row in rows],
+        {name : [row[4].get(name) for row in rows] for name in tagNames})
+    return ArrowSupport.encodeBatches([batch])
+
+def createBatches(lines, nConnections, batchSize, compress, arrow = False):
+    """ Partitions lines by series over connections and encodes batches,\
+        as line protocol or Arrow IPC streams.
+
+        Every line of a series is sent over the same connection so that the
+        proxy receives the points of each series in time order.
+    """
+    partitions = [list() for i in range(0, nConnections)]
+    for line in lines:
+        partitions[zlib.crc32(seriesKey(line).encode("UTF-8")) % nConnections] += [line]
+
+    batches = list()
+    for partition in partitions:
+        connectionBatches = list()
+        for i in range(0, len(partition), batchSize):
+            if(arrow):
+                body = encodeArrow(partition[i:i + batchSize])
+            else:
+                body = "\n".join(partition[i:i + batchSize]).encode("UTF-8")
+            if(compress):
+                body = gzip.compress(body, compresslevel = 1)
+            connectionBatches += [(len(partition[i:i + batchSize]), body)]
+        batches += [connectionBatches]
+
+    return batches
+
+class LoadWorker(threading.Thread):
+    """ Sends batches over a single keep-alive connection. """
+
+    def __init__(self, url, path, headers, batches, rate):
+        """ Class constructor. """
+        super().__init__()
+        self.daemon = True
+        self._url = url
+        self._path = path
+        self._headers = headers
+        self._batches = batches
+        self._rate = rate
+        self.latencies = list()
+        self.lines = 0
+        self.errors = 0
+        self.statusCodes = dict()
+        return
+
+    def _connect(self):
+        """ Opens a connection to the proxy. """
+        return http.client.HTTPConnection(self._url.hostname, self._url.port, timeout = 30)
+
+    def run(self):
+        """ Sends each batch, pacing requests to the configured rate. """
+        connection = self._connect()
+        started = time.perf_counter()
+        sent = 0
+
+        for nLines, body in self._batches:
+            # Pace requests to the line rate for this connection
+            if(self._rate):
+                delay = started + sent/self._rate - time.perf_counter()
+                if(delay > 0):
+                    time.sleep(delay)
+            sent += nLines
+
+            requestStart = time.perf_counter()
+            try:
+                connection.request("POST", self._path, body = body, headers = self._headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                if(response.getheader("Connection", "").lower() == "close"):
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                status = None
+                connection.close()
+                connection = self._connect()
+            self.latencies += [time.perf_counter() - requestStart]
+
+            # Count the result
+            self.statusCodes[status] = self.statusCodes.get(status, 0) + 1
+            if(status is None or status >= 300):
+                self.errors += 1
+            else:
+                self.lines += nLines
+
+        connection.close()
+
+        return
+
+def runLoad(proxyUrl, org, bucket, token, lines, nConnections, batchSize, rate, compress, arrow = False):
+    """ Replays lines to the proxy and returns a dictionary of results. """
+    url = urlparse.urlparse(proxyUrl)
+    path = ("/api/v2/write/arrow?" if arrow else "/api/v2/write?") \
+        + urlparse.urlencode({"org" : org, "bucket" : bucket, "precision" : "ns"})
+    headers = {
+        "Authorization" : "Token " + token,
+        "Content-Type" : "application/vnd.apache.arrow.stream" if arrow else "text/plain; charset=utf-8"
+        }
+    if(compress):
+        headers["Content-Encoding"] = "gzip"
+
+    # Prepare the batches ahead of time so encoding is not measured
+    batches = createBatches(lines, nConnections, batchSize, compress, arrow)
+    workers = [LoadWorker(url, path, headers, connectionBatches, rate/nConnections if rate else None)
+        for connectionBatches in batches]
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    # Aggregate results
+    latencies = np.array([latency for worker in workers for latency in worker.latencies])
+    requests = len(latencies)
+    errors = sum([worker.errors for worker in workers])
+    statusCodes = dict()
+    for worker in workers:
+        for status, count in worker.statusCodes.items():
+            statusCodes[str(status)] = statusCodes.get(str(status), 0) + count
+    sentLines = sum([worker.lines for worker in workers])
+    if(requests > 0):
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9])*1000
+    else:
+        p50 = p99 = p999 = float("nan")
+
+    return {
+        "lines" : sentLines,
+        "requests" : requests,
+        "seconds" : elapsed,
+        "lines_per_second" : sentLines/elapsed if elapsed > 0 else 0,
+        "latency_p50_ms" : p50,
+        "latency_p99_ms" : p99,
+        "latency_p999_ms" : p999,
+        "errors" : errors,
+        "error_rate" : errors/requests if requests > 0 else 0,
+        "status_codes" : statusCodes
+        }
+
+# If run from command line
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Replays line protocol to the influx filter proxy and reports throughput and latency.")
+    parser.add_argument('proxy_url',
+        type=str,
+        help="URL of the proxy server in format http://host:port")
+    sourceGroup = parser.add_mutually_exclusive_group(required=True)
+    sourceGroup.add_argument('--file',
+        type=str,
+        help="Line protocol file to replay")
+    sourceGroup.add_argument('--generate',
+        nargs=2,
+        type=int,
+        metavar=("series", "points"),
+        help="Generate random walk series with the given number of points each")
+    parser.add_argument('--measurement',
+        type=str,
+        default="load",
+        help="Measurement name for generated series")
+    parser.add_argument('--field',
+        type=str,
+        default="value",
+        help="Field name for generated series")
+    parser.add_argument('--interval',
+        type=int,
+        default=1000000000,
+        help="Interval between generated points in nanoseconds")
+    parser.add_argument('--connections',
+        type=int,
+        default=8,
+        help="Number of concurrent keep-alive connections")
+    parser.add_argument('--batch',
+        type=int,
+        default=5000,
+        help="Number of lines per write request")
+    parser.add_argument('--rate',
+        type=float,
+        default=None,
+        help="Target total lines per second (unlimited by default)")
+    parser.add_argument('--gzip',
+        action="store_true",
+        help="Compress request bodies with gzip")
+    parser.add_argument('--arrow',
+        action="store_true",
+        help="Send the lines of each request as an Arrow IPC stream to the columnar endpoint of the proxy")
+    parser.add_argument('--org',
+        type=str,
+        default="org",
+        help="Organisation passed to the proxy")
+    parser.add_argument('--bucket',
+        type=str,
+        default="bucket",
+        help="Bucket passed to the proxy")
+    parser.add_argument('--token',
+        type=str,
+        default="token",
+        help="Token passed to the proxy")
+    parser.add_argument('--stub',
+        nargs=2,
+        metavar=("host", "port"),
+        default=None,
+        help="Start a local stub upstream server which counts and validates forwarded points")
+    args = parser.parse_args()
+
+    # Start the stub upstream server
+    stub = None
+    if(args.stub):
+        stub = startStubServer(args.stub[0], int(args.stub[1]))
+
+    # Load or generate the lines to send
+    if(args.file):
+        lines = readLines(args.file)
+    else:
+        lines = generateLines(args.generate[0], args.generate[1], args.measurement, args.field, args.interval)
+
+    results = runLoad(args.proxy_url, args.org, args.bucket, args.token, lines,
+        args.connections, args.batch, args.rate, args.gzip, args.arrow)
+
+    # Report the upstream counts
+    if(stub):
+        # Allow the proxy to finish forwarding
+        time.sleep(1)
+        results["upstream"] = StubInfluxHttpHandler.statistics.toDict()
+        stub.shutdown()
+        stub.server_close()
+
+    print(json.dumps(results, indent=2))
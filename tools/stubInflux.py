@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+"""stubInflux.py: Local stub of the influx DB v2 write API which counts and\
+ validates forwarded points, and of the query API which streams generated\
+ series."""
+
+# Import built-in modules
+import argparse
+import datetime
+import gzip
+import http.server
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse as urlparse
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+class StubStatistics():
+    """ Thread safe counters for the points received by the stub. """
+
+    def __init__(self):
+        """ Class constructor. """
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.lines = 0
+        self.points = 0
+        self.invalid = 0
+        self.bytes = 0
+        self.buckets = dict()
+        return
+
+    def add(self, bucket, nBytes, lines, points, invalid):
+        """ Accumulates the counts for one write request. """
+        with self._lock:
+            self.requests += 1
+            self.bytes += nBytes
+            self.lines += lines
+            self.points += points
+            self.invalid += invalid
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + points
+        return
+
+    def toDict(self):
+        """ Returns a snapshot of the counters. """
+        with self._lock:
+            return {
+                "requests" : self.requests,
+                "bytes" : self.bytes,
+                "lines" : self.lines,
+                "points" : self.points,
+                "invalid" : self.invalid,
+                "buckets" : dict(self.buckets)
+                }
+
+class StubInfluxHttpHandler(http.server.BaseHTTPRequestHandler):
+    # Class variables
+    protocol_version = "HTTP/1.1"
+    _linePattern : re.Pattern = re.compile('^([^, ]+)(,[^ ]+)? ([^ ]+) (-?[0-9]+)$')
+    _fieldPattern : re.Pattern = re.compile(
+        '^[^=]+=(-?[0-9.]+([eE][-+]?[0-9]+)?[iu]?|"[^"]*"|t|T|f|F|true|false|True|False|TRUE|FALSE)$')
+    statistics : StubStatistics = StubStatistics()
+    verbose : bool = False
+    querySeries : int = 4
+    queryPoints : int = 100000
+
+    # Status of a rejected write, or None to accept writes
+    rejectStatus : int = None
+
+    def validateLine(self, line):
+        """ Returns the number of valid fields in a line, or None if the line\
+            is not valid line protocol. """
+        m = re.match(self._linePattern, line)
+        if(m is None):
+            return None
+        fields = m.group(3).split(",")
+        for field in fields:
+            if(re.match(self._fieldPattern, field) is None):
+                return None
+        return len(fields)
+
+    def writeChunk(self, data):
+        """ Writes a chunk of a chunked response. """
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        return
+
+    def queryRange(self, content) -> tuple:
+        """ Returns the start and stop of the range() of a Flux query in\
+            nanoseconds since the epoch, or the first day of 2024. """
+        try:
+            flux = json.loads(content).get("query", "")
+        except ValueError:
+            flux = ""
+        m = re.search(r'range\(\s*start\s*:\s*([^,\s]+)\s*,\s*stop\s*:\s*([^\)\s]+)\s*\)', flux)
+        if(m is None):
+            return 1704067200*10**9, 1704153600*10**9
+
+        # Fraction of a second is parsed separately, as datetime holds microseconds
+        bounds = list()
+        for text in m.groups():
+            whole, fraction = re.match(r'^([^.Z]+)(?:\.([0-9]+))?Z$', text).groups()
+            seconds = datetime.datetime.fromisoformat(whole).replace(tzinfo = datetime.timezone.utc).timestamp()
+            bounds += [int(seconds)*10**9 + int(((fraction or "") + "000000000")[0:9])]
+        return tuple(bounds)
+
+    def formatTime(self, nanoseconds) -> str:
+        """ Formats nanoseconds since the epoch as an RFC3339 time. """
+        return "{0}.{1:09d}Z".format(time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(nanoseconds//10**9)),
+            nanoseconds%10**9)
+
+    def queryResponse(self):
+        """ Streams an annotated CSV response of random walk series over the\
+            range of the query, or the first day of 2024, with the number of\
+            points of each series per day, as a table for each series. """
+        start, stop = self.queryRange(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        interval = max(86400*10**9//self.queryPoints, 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self.writeChunk(b"#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string\r\n"
+            b"#group,false,false,true,true,false,false,true,true,true\r\n"
+            b"#default,_result,,,,,,,,\r\n"
+            b",result,table,_start,_stop,_time,_value,_field,_measurement,series\r\n")
+        bounds = "{0},{1}".format(self.formatTime(start), self.formatTime(stop))
+        for series in range(0, self.querySeries):
+            value = 0.0
+            lines = list()
+            for index in range(0, (stop - start + interval - 1)//interval):
+                value += random.random()*2 - 1
+                lines += [",,{0},{1},{2},{3!r},value,load,{0}\r\n".format(
+                    series, bounds, self.formatTime(start + index*interval), value)]
+                if(len(lines) == 10000):
+                    self.writeChunk("".join(lines).encode("UTF-8"))
+                    lines = list()
+            if(len(lines) > 0):
+                self.writeChunk("".join(lines).encode("UTF-8"))
+        self.writeChunk(b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+        return
+
+    def do_POST(self):
+        """ Handles a write or query request. """
+        # Parse the query string
+        uri = urlparse.urlparse(self.path)
+        query = urlparse.parse_qs(uri.query)
+        if(uri.path == "/api/v2/query"):
+            self.queryResponse()
+            return
+
+        # Read the content
+        nContent = int(self.headers.get('Content-Length', 0))
+        content = self.rfile.read(nContent)
+        if(self.rejectStatus is not None):
+            self.send_error(self.rejectStatus, "Write rejected by stub")
+            return
+        if(self.headers.get('Content-Encoding', '') == 'gzip'):
+            content = gzip.decompress(content)
+
+        # Count the points and validate each line
+        lines = 0
+        points = 0
+        invalid = 0
+        for line in content.decode("UTF-8").split("\n"):
+            if(len(line) == 0):
+                continue
+            lines += 1
+            nFields = self.validateLine(line)
+            if(nFields is None):
+                invalid += 1
+            else:
+                points += nFields
+        self.statistics.add(query.get('bucket', [''])[0], nContent, lines, points, invalid)
+
+        # Reply as influx DB does
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+        return
+
+    def do_GET(self):
+        """ Returns the statistics as JSON. """
+        content = json.dumps(self.statistics.toDict()).encode("UTF-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        return
+
+    def log_message(self, format, *args):
+        """ Suppresses per-request logging unless verbose. """
+        if(self.verbose):
+            super().log_message(format, *args)
+        return
+
+def startStubServer(host, port):
+    """ Starts the stub server on a background thread and returns it. """
+    server = http.server.ThreadingHTTPServer((host, port), StubInfluxHttpHandler)
+    serverThread = threading.Thread(target = server.serve_forever)
+    serverThread.daemon = True
+    serverThread.start()
+    return server
+
+# If run from command line
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Stub influx DB v2 server which counts and validates written points.")
+    parser.add_argument('host',
+        type=str,
+        help="IP address to bind server to.")
+    parser.add_argument('port',
+        type=int,
+        help="TCP port to listen on.")
+    parser.add_argument('--verbose',
+        action="store_true",
+        help="Log each request")
+    parser.add_argument('--queryseries',
+        type=int,
+        default=4,
+        help="Number of series returned by a query")
+    parser.add_argument('--querypoints',
+        type=int,
+        default=100000,
+        help="Number of points of each series per day returned by a query")
+    args = parser.parse_args()
+
+    StubInfluxHttpHandler.verbose = args.verbose
+    StubInfluxHttpHandler.querySeries = args.queryseries
+    StubInfluxHttpHandler.queryPoints = args.querypoints
+    server = startStubServer(args.host, args.port)
+
+    try:
+        # wait for user input
+        input("Press enter or CTRL-C to exit\n")
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        print(json.dumps(StubInfluxHttpHandler.statistics.toDict(), indent=2))
+        server.shutdown()
+        server.server_close()
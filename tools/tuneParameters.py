@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""tuneParameters.py: Sweeps the filter parameters for a sample of a series\
+ and recommends the parameters which meet an error budget."""
+
+# Import built-in modules
+import argparse
+import concurrent.futures
+import itertools
+import os
+import sys
+
+# Import third-party modules
+import numpy as np
+import pandas as pd
+
+# Import custom modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pydbfilter import SdtFilter, DeadbandFilter, HysteresisFilter, RdpFilter, PlaFilter, Analysis
+
+# Authorship information
+__author__ = "James Bott"
+__copyright__ = "Copyright 2024, James Bott"
+__credits__ = ["James Bott"]
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "James Bott"
+__email__ = "https://github.com/bott-j"
+__status__ = "Development"
+
+# Filter classes of each method
+METHODS = {
+    "sdt" : SdtFilter,
+    "deadband" : DeadbandFilter,
+    "hysteresis" : HysteresisFilter,
+    "rdp" : RdpFilter,
+    "pla" : PlaFilter
+    }
+
+# Methods accepted by every script, including the streaming proxy and\
+# Telegraf processor which do not have the offline rdp and pla methods
+STREAMING_METHODS = ["sdt", "deadband", "hysteresis"]
+
+# Series of the sample, set in each worker process
+_series = None
+
+def readSeries(filename, measurement, field, tags):
+    """ Reads the series of a field from an influxdb CSV export, returning a\
+        list of time and value arrays for each combination of the tags. """
+    dfInput = pd.read_csv(filename, header=3)
+    dfInput = dfInput[(dfInput['_measurement'] == measurement) & (dfInput['_field'] == field)]
+    dfInput = dfInput.assign(_time = pd.to_datetime(dfInput['_time']).to_numpy(dtype="datetime64[ns]").view(np.int64))
+
+    # Split the rows by the tags present in the export
+    tags = [tag for tag in tags if tag in dfInput.columns]
+    groups = dfInput.groupby(tags) if len(tags) > 0 else [((), dfInput)]
+
+    series = list()
+    for key, group in groups:
+        group = group.sort_values('_time')
+        series += [(group['_time'].to_numpy(), group['_value'].to_numpy(dtype=np.float64))]
+    return series
+
+def generateSeries(n, interval = 1000000000):
+    """ Creates a random walk series with nanosecond integer times. """
+    times = 1700000000000000000 + np.arange(0, n, dtype = np.int64)*interval
+    values = np.cumsum(np.random.random(n)*2 - 1)
+    return [(times, values)]
+
+def initializeWorker(series):
+    """ Stores the sample in the worker process. """
+    global _series
+    _series = series
+    return
+
+def evaluateSetting(method, threshold, interval) -> tuple:
+    """ Filters each series of the sample, returning the compression ratio\
+        and the maximum and RMS reconstruction error. """
+    groups = list()
+    outputGroups = list()
+    outputTimes = list()
+    outputValues = list()
+
+    for group, (times, values) in enumerate(_series):
+        filter = METHODS[method](threshold, interval)
+        results = filter.filterPoints(list(zip(times.tolist(), values.tolist())))
+
+        # The flushed point may repeat the last output point
+        for time, value in filter.flush():
+            if(len(results) == 0 or results[-1][0] != time):
+                results += [(time, value)]
+
+        groups += [np.full(len(times), group)]
+        outputGroups += [group]*len(results)
+        outputTimes += [result[0] for result in results]
+        outputValues += [result[1] for result in results]
+
+    # Compare the rebuilt series with the input
+    result = Analysis.compareGroups(np.concatenate(groups), np.concatenate([times for times, values in _series]),
+        np.concatenate([values for times, values in _series]), outputGroups, np.array(outputTimes),
+        outputValues, Analysis.interpolationFor(filter))
+    points = result["points"].sum()
+    rmsError = (np.sum(result["rmsError"]**2*result["points"])/points)**0.5
+
+    return (method, threshold, interval, points/result["outputPoints"].sum(), float(np.nanmax(result["maxError"])),
+        float(rmsError))
+
+def sweep(series, methods, thresholds, intervals, processes = None) -> list:
+    """ Evaluates every combination of method, threshold and interval across\
+        a process pool. """
+    settings = list(itertools.product(methods, thresholds, intervals))
+    with concurrent.futures.ProcessPoolExecutor(max_workers = processes,
+        initializer = initializeWorker, initargs = (series,)) as executor:
+        results = list(executor.map(evaluateSetting, *zip(*settings)))
+    return results
+
+def recommend(results, maxError = None, rmsError = None):
+    """ Returns the result with the highest compression ratio which meets the\
+        error budget, or None if no setting meets it. """
+    candidates = [result for result in results
+        if (maxError is None or result[4] <= maxError)
+            and (rmsError is None or result[5] <= rmsError)]
+    if(len(candidates) == 0):
+        return None
+    return max(candidates, key = lambda result : (result[3], -result[5]))
+
+def recommendedArguments(result, measurement, field) -> list:
+    """ Returns the script arguments of the method and parameters of a result. """
+    method, threshold, interval, ratio, maxError, rmsError = result
+    return ["--method", method, "--fields", measurement, field, repr(threshold), repr(interval)]
+
+def writeArguments(filename, arguments):
+    """ Writes arguments one per line, as read by argparse from @file. """
+    with open(filename, "w") as file:
+        file.write("\n".join(arguments) + "\n")
+    return
+
+# If run from command line
+if __name__ == "__main__":
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Sweeps the filter parameters for a sample of a series.")
+    parser.add_argument('--csv',
+        type=str,
+        help="Filename of influxdb CSV export containing the sample")
+    parser.add_argument('--generate',
+        type=int,
+        default=10000,
+        help="Number of points of a random walk sample, when no CSV file is given")
+    parser.add_argument('--measurement',
+        type=str,
+        default="measurement",
+        help="Measurement name of the sample")
+    parser.add_argument('--field',
+        type=str,
+        default="value",
+        help="Field name of the sample")
+    parser.add_argument('--tags',
+        nargs="+",
+        default=[],
+        help="Tags which separate the series of the sample")
+    parser.add_argument('--methods',
+        nargs="+",
+        choices=list(METHODS.keys()),
+        default=STREAMING_METHODS,
+        help="Compression algorithms to sweep, where rdp and pla are only accepted by filterCsv.py and recompressBucket.py")
+    parser.add_argument('--thresholds',
+        nargs=3,
+        type=float,
+        metavar=("minimum", "maximum", "count"),
+        default=[0.01, 10, 31],
+        help="Geometric range of thresholds to sweep")
+    parser.add_argument('--intervals',
+        nargs="+",
+        type=float,
+        default=[60e9, 600e9, 3600e9],
+        help="Maximum intervals to sweep, in the units of the sample times")
+    parser.add_argument('--maxerror',
+        type=float,
+        default=None,
+        help="Largest allowed absolute reconstruction error")
+    parser.add_argument('--rmserror',
+        type=float,
+        default=None,
+        help="Largest allowed RMS reconstruction error")
+    parser.add_argument('--processes',
+        type=int,
+        default=None,
+        help="Number of worker processes (number of CPUs by default)")
+    parser.add_argument('--output',
+        type=str,
+        default=None,
+        help="Write the recommended arguments to this file, for use as @file with the other scripts")
+    args = parser.parse_args()
+
+    # Load the sample
+    if(args.csv is not None):
+        series = readSeries(args.csv, args.measurement, args.field, args.tags)
+    else:
+        series = generateSeries(args.generate)
+
+    # Sweep the parameters
+    thresholds = np.geomspace(args.thresholds[0], args.thresholds[1], int(args.thresholds[2])).tolist()
+    results = sweep(series, args.methods, thresholds, args.intervals, args.processes)
+
+    print("{0:>12}{1:>14}{2:>14}{3:>10}{4:>14}{5:>14}".format(
+        "method", "threshold", "interval", "ratio", "max error", "rms error"))
+    for result in results:
+        print("{0:>12}{1:>14.6g}{2:>14.6g}{3:>10.2f}{4:>14.6g}{5:>14.6g}".format(*result))
+
+    # Recommend the parameters
+    best = recommend(results, args.maxerror, args.rmserror)
+    if(best is None):
+        print("No parameters meet the error budget.")
+        sys.exit(1)
+    arguments = recommendedArguments(best, args.measurement, args.field)
+    print("Recommended: {0} (ratio {1:.2f}, max error {2:.6g}, rms error {3:.6g})".format(
+        " ".join(arguments), *best[3:]))
+    if(args.output is not None):
+        writeArguments(args.output, arguments)